@@ -0,0 +1,78 @@
+"""
+Throughput of /predict-style work on each execution backend.
+
+Fires `--requests` concurrent prediction calls (each `--rows` records) at
+the inline, thread and process backends and reports requests per second.
+Run it on a multi-core box; with one CPU the pools can only add overhead.
+
+    python -m benchmarks.bench_execution_backend --rows 200 --requests 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import structlog
+
+from benchmarks.common import build_artifacts, make_raw_frame
+from src.api.executor import MODES, ExecutionBackend
+from src.inference_pipeline.inference import predict_records, preload_artifacts
+
+
+async def drive(backend, payloads, paths, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(payload):
+        async with sem:
+            await backend.run(predict_records, payload, **paths)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in payloads))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {k: str(v) for k, v in build_artifacts(tmp)["paths"].items()}
+        payloads = [
+            make_raw_frame(args.rows, seed=i).to_dict(orient="records")
+            for i in range(args.requests)
+        ]
+
+        print(f"cpus={os.cpu_count()} workers={args.workers} rows={args.rows}")
+        print(f"{'mode':>8} {'req/s':>9} {'rows/s':>11}")
+        for mode in MODES:
+            backend = ExecutionBackend(
+                mode=mode,
+                max_workers=args.workers,
+                initializer=preload_artifacts,
+                initargs=tuple(paths.values()),
+            )
+            backend.start()
+            try:
+                asyncio.run(drive(backend, payloads[:4], paths, 4))  # warm up
+                elapsed = asyncio.run(drive(backend, payloads, paths, args.concurrency))
+            finally:
+                backend.shutdown()
+            rps = args.requests / elapsed
+            print(f"{mode:>8} {rps:>9.1f} {rps * args.rows:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Latency of single-record and tiny payloads: pandas pipeline vs fast path.
+
+    python -m benchmarks.bench_fast_path --sizes 1,5 --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import logging
+import tempfile
+
+import numpy as np
+import structlog
+
+from benchmarks.common import build_artifacts, make_raw_frame, timeit
+from src.inference_pipeline import inference
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1,5")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        art = build_artifacts(tmp)
+        inference.TRAIN_FEATURE_COLUMNS = art["feature_columns"]
+
+        print(f"{'rows':>5} {'path':>7} {'p50 us':>9} {'p99 us':>9}")
+        for n in [int(s) for s in args.sizes.split(",")]:
+            records = make_raw_frame(n, seed=3).to_dict(orient="records")
+            for name, threshold in (("pandas", 0), ("fast", n)):
+                inference.settings.fast_path_max_rows = threshold
+                run = lambda: inference.predict_records(  # noqa: E731
+                    records, **art["paths"]
+                )
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run()  # warm caches
+                    times = np.array(timeit(run, args.iterations)) * 1e6
+                print(
+                    f"{n:>5} {name:>7} {np.percentile(times, 50):>9.1f} "
+                    f"{np.percentile(times, 99):>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+End-to-end /predict latency per request/response format.
+
+Posts the same rows through the ASGI app (in process, no network) as
+record JSON, column JSON, Arrow IPC and msgpack (if installed), and, as the
+baseline, through a route declared the old way (pydantic-validated
+``List[Dict]`` body, dict response).
+
+    python -m benchmarks.bench_formats --sizes 1,100,10000 --iterations 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import structlog
+from fastapi import Depends, Header
+from fastapi.testclient import TestClient
+
+from benchmarks.common import build_artifacts, make_raw_frame, timeit
+from src.api import codecs
+from src.api import main as api
+from src.inference_pipeline import inference
+
+
+@api.app.post(
+    "/predict_legacy",
+    dependencies=[Depends(api.get_api_key), Depends(api.require_ready)],
+)
+async def predict_legacy(
+    data: List[Dict[str, Any]], x_profile: Optional[str] = Header(default=None)
+) -> Dict[str, Any]:
+    preds, actuals = await api.run_prediction(data)
+    resp = {"predictions": preds.astype(float).tolist()}
+    if actuals is not None:
+        resp["actuals"] = actuals.astype(float).tolist()
+    return resp
+
+
+async def mark_ready() -> None:
+    api.readiness.artifacts = "ready"
+    api.readiness.warmup = "skipped"
+
+
+def arrow_bytes(df) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1,100,10000")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        art = build_artifacts(tmp)
+        inference.TRAIN_FEATURE_COLUMNS = art["feature_columns"]
+        api.ARTIFACT_PATHS = {k: str(v) for k, v in art["paths"].items()}
+        api.MODEL_PATH = art["paths"]["model_path"]
+        api.settings.api_key = "bench"
+        api.sync_artifacts = mark_ready
+        auth = {"X-API-Key": "bench"}
+
+        print(f"{'rows':>6} {'format':>14} {'p50 ms':>9} {'p99 ms':>9}")
+        with TestClient(api.app) as client:
+            for n in [int(s) for s in args.sizes.split(",")]:
+                df = make_raw_frame(n, seed=5)
+                variants = {
+                    "legacy": ("/predict_legacy", codecs.JSON, codecs.JSON,
+                               json.dumps(df.to_dict(orient="records"))),
+                    "json-records": ("/predict", codecs.JSON, codecs.JSON,
+                                     json.dumps(df.to_dict(orient="records"))),
+                    "json-columns": ("/predict", codecs.JSON, codecs.JSON,
+                                     json.dumps(df.to_dict(orient="list"))),
+                    "arrow": ("/predict", codecs.ARROW, codecs.ARROW,
+                              arrow_bytes(df)),
+                }  # fmt: skip
+                if codecs.msgpack is not None:
+                    variants["msgpack"] = (
+                        "/predict",
+                        codecs.MSGPACK,
+                        codecs.MSGPACK,
+                        codecs.msgpack.packb(df.to_dict(orient="list")),
+                    )
+                for name, (path, ctype, accept, body) in variants.items():
+                    headers = {**auth, "Content-Type": ctype, "Accept": accept}
+
+                    def run():
+                        resp = client.post(path, content=body, headers=headers)
+                        assert resp.status_code == 200, resp.text
+
+                    run()  # warm caches
+                    times = np.array(timeit(run, args.iterations)) * 1e3
+                    print(
+                        f"{n:>6} {name:>14} {np.percentile(times, 50):>9.2f} "
+                        f"{np.percentile(times, 99):>9.2f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
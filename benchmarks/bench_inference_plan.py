@@ -0,0 +1,73 @@
+"""
+Compare the step-by-step pandas pipeline with the compiled InferencePlan.
+
+Reports median wall time and peak traced allocation (as a multiple of the
+input frame size) at several batch sizes:
+
+    python -m benchmarks.bench_inference_plan --sizes 1,1000,1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import logging
+import statistics
+import tempfile
+import tracemalloc
+
+import structlog
+
+from benchmarks.common import build_artifacts, make_raw_frame, timeit
+from src.inference_pipeline import inference
+
+
+def peak_bytes(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1,1000,1000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        art = build_artifacts(tmp)
+        inference.TRAIN_FEATURE_COLUMNS = art["feature_columns"]
+        runners = {
+            "stepwise": inference.predict_stepwise,
+            "plan": inference.predict,
+        }
+
+        print(
+            f"{'rows':>9} {'impl':>9} {'median ms':>10} {'peak MB':>9} {'x input':>8}"
+        )
+        for n in [int(s) for s in args.sizes.split(",")]:
+            df = make_raw_frame(n, seed=2)
+            input_bytes = df.memory_usage(deep=True).sum()
+            repeat = args.repeat if n < 100_000 else max(1, args.repeat // 2)
+            for name, fn in runners.items():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run = lambda: fn(df.copy(), **art["paths"])  # noqa: E731
+                    run()  # warm artifact + plan caches
+                    times = timeit(run, repeat)
+                    peak = peak_bytes(run)
+                print(
+                    f"{n:>9} {name:>9} {statistics.median(times) * 1e3:>10.2f} "
+                    f"{peak / 1e6:>9.1f} {peak / input_bytes:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+City normalization: row-wise apply + replace vs normalize_city_series.
+
+    python -m benchmarks.bench_normalize_city --rows 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timeit
+from src.feature_pipeline.preprocess import (
+    CITY_MAPPING,
+    normalize_city,
+    normalize_city_series,
+)
+
+
+def rowwise(s: pd.Series) -> pd.Series:
+    """The original implementation from clean_and_merge."""
+    mapping = {normalize_city(k): normalize_city(v) for k, v in CITY_MAPPING.items()}
+    return s.apply(normalize_city).replace(mapping)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--metros", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = [f"Metro–Area {i}" for i in range(args.metros)] + list(CITY_MAPPING)
+    s = pd.Series(rng.choice(np.array(names, dtype=object), args.rows))
+
+    base = timeit(lambda: rowwise(s), args.repeat)
+    fast = timeit(lambda: normalize_city_series(s), args.repeat)
+    pd.testing.assert_series_equal(rowwise(s), normalize_city_series(s))
+
+    print(f"{'impl':>10} {'rows':>10} {'seconds':>9}")
+    print(f"{'rowwise':>10} {args.rows:>10} {min(base):>9.3f}")
+    print(f"{'vectorized':>10} {args.rows:>10} {min(fast):>9.3f}")
+    print(f"speedup: {min(base) / min(fast):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
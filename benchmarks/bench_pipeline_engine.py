@@ -0,0 +1,130 @@
+"""
+Feature pipeline wall time and peak RSS, pandas vs polars engine.
+
+    python -m benchmarks.bench_pipeline_engine --rows 1000000,50000000
+
+Each (engine, size) runs in a fresh process, so peak RSS is that run's
+alone; a run that dies (e.g. out of memory) is reported instead of ending
+the benchmark. The raw CSV is generated in chunks and never held whole.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_raw_frame
+
+STAGES = ("split", "preprocess", "features")
+CHUNK_ROWS = 1_000_000
+
+
+def write_raw_csv(path: Path, rows: int) -> None:
+    """Synthetic raw CSV spanning 2016–2024, written CHUNK_ROWS at a time."""
+    for i, start in enumerate(range(0, rows, CHUNK_ROWS)):
+        n = min(CHUNK_ROWS, rows - start)
+        chunk = make_raw_frame(n, seed=i, with_latlng=False)
+        rng = np.random.default_rng(i)
+        chunk["date"] = (
+            pd.to_datetime("2016-01-01")
+            + pd.to_timedelta(rng.integers(0, 8 * 365, n), unit="D")
+        ).strftime("%Y-%m-%d")
+        chunk.to_csv(path, mode="a", header=i == 0, index=False)
+
+
+def run_once(raw_path: Path, work: Path, engine: str) -> dict:
+    """Run split → preprocess → features in this process; stage seconds."""
+    import resource
+
+    from src.feature_pipeline.feature_engineering import run_feature_engineering
+    from src.feature_pipeline.load import load_and_split_data
+    from src.feature_pipeline.preprocess import preprocess_split
+    from src.utils.storage import table_path
+
+    processed = work / "processed"
+    timings = {}
+
+    def stage(name, fn):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        timings[name] = time.perf_counter() - start
+
+    stage("split", lambda: load_and_split_data(str(raw_path), work, engine=engine))
+    stage(
+        "preprocess",
+        lambda: [
+            preprocess_split(s, work, processed, metros_path=None, engine=engine)
+            for s in ("train", "eval", "holdout")
+        ],
+    )
+    stage(
+        "features",
+        lambda: run_feature_engineering(
+            table_path(processed / "cleaning_train"),
+            table_path(processed / "cleaning_eval"),
+            table_path(processed / "cleaning_holdout"),
+            output_dir=processed,
+            engine=engine,
+            models_dir=work / "models",
+        ),
+    )
+    timings["total"] = sum(timings.values())
+    timings["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default="1000000,50000000")
+    parser.add_argument("--engines", default="pandas,polars")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:  # raw_path, work_dir, engine
+        raw_path, work, engine = args.child
+        print(json.dumps(run_once(Path(raw_path), Path(work), engine)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(r) for r in args.rows.split(",")):
+            raw_path = Path(tmp) / f"raw_{rows}.csv"
+            write_raw_csv(raw_path, rows)
+            for engine in args.engines.split(","):
+                work = Path(tmp) / f"{engine}_{rows}"
+                proc = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_pipeline_engine"]
+                    + ["--child", str(raw_path), str(work), engine],
+                    capture_output=True,
+                    text=True,
+                    env={**os.environ, "PIPELINE_ENGINE": engine},
+                )
+                if proc.returncode == 0:
+                    results[engine, rows] = json.loads(proc.stdout.splitlines()[-1])
+                else:
+                    results[engine, rows] = {"error": f"exit {proc.returncode}"}
+            raw_path.unlink()
+
+    cols = [*STAGES, "total", "peak_rss_mb"]
+    print(f"{'engine':>8} {'rows':>10} " + " ".join(f"{c:>11}" for c in cols))
+    for (engine, rows), t in results.items():
+        if "error" in t:
+            print(f"{engine:>8} {rows:>10} {t['error']:>11}")
+            continue
+        print(f"{engine:>8} {rows:>10} " + " ".join(f"{t[c]:>11.2f}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+End-to-end feature + training pipeline wall time per storage format.
+
+    python -m benchmarks.bench_storage --rows 500000 --formats csv,parquet,feather
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_raw_frame
+from src.feature_pipeline.feature_engineering import run_feature_engineering
+from src.feature_pipeline.load import load_and_split_data
+from src.feature_pipeline.preprocess import preprocess_split
+from src.model_training.eval import evaluate_model
+from src.model_training.train import train_model
+from src.utils import storage
+from src.utils.storage import table_path
+
+
+def run_pipeline(raw_path: Path, work: Path) -> dict:
+    """Run every stage once in `work`, timing each; returns stage seconds."""
+    timings = {}
+    processed = work / "processed"
+
+    def stage(name, fn):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        timings[name] = time.perf_counter() - start
+
+    stage("split", lambda: load_and_split_data(str(raw_path), output_dir=work))
+    stage(
+        "preprocess",
+        lambda: [
+            preprocess_split(s, raw_dir=work, processed_dir=processed, metros_path=None)
+            for s in ("train", "eval", "holdout")
+        ],
+    )
+    stage(
+        "features",
+        lambda: run_feature_engineering(
+            table_path(processed / "cleaning_train"),
+            table_path(processed / "cleaning_eval"),
+            table_path(processed / "cleaning_holdout"),
+            output_dir=processed,
+        ),
+    )
+    stage(
+        "train",
+        lambda: train_model(
+            table_path(processed / "feature_engineered_train"),
+            table_path(processed / "feature_engineered_eval"),
+            model_output=work / "model.pkl",
+            model_params={"n_estimators": 20},
+        ),
+    )
+    stage(
+        "evaluate",
+        lambda: evaluate_model(
+            work / "model.pkl", table_path(processed / "feature_engineered_eval")
+        ),
+    )
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--formats", default=",".join(storage.FORMATS))
+    args = parser.parse_args()
+
+    raw = make_raw_frame(args.rows, seed=5)
+    rng = np.random.default_rng(5)
+    raw["date"] = (
+        pd.to_datetime("2016-01-01")
+        + pd.to_timedelta(rng.integers(0, 8 * 365, args.rows), unit="D")
+    ).strftime("%Y-%m-%d")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = Path(tmp) / "raw.csv"
+        raw.to_csv(raw_path, index=False)
+        os.chdir(tmp)  # encoders are written to ./models
+        Path("models").mkdir()
+        try:
+            results = {}
+            for fmt in args.formats.split(","):
+                storage.settings.storage_format = fmt
+                results[fmt] = run_pipeline(raw_path, Path(tmp) / fmt)
+        finally:
+            os.chdir(cwd)
+
+    stages = list(next(iter(results.values())))
+    print(f"{'format':>8} " + " ".join(f"{s:>10}" for s in stages))
+    for fmt, t in results.items():
+        print(f"{fmt:>8} " + " ".join(f"{t[s]:>10.3f}" for s in stages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Memory of N API workers with and without preload-then-fork sharing.
+
+Starts ``python -m src.api.serve`` for each worker count, waits until every
+worker is warm, then sums RSS and PSS over the supervisor and its workers.
+RSS counts shared pages once per process; PSS splits them, so the PSS total
+is the memory the server really uses.
+
+    python -m benchmarks.bench_worker_memory --workers 1,2,4 --estimators 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+import pandas as pd
+
+from benchmarks.common import build_artifacts
+from src.utils.feature_schema import record_features
+from src.utils.memory import total_memory
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def children(pid: int) -> List[int]:
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+    return [int(p) for p in path.read_text().split()]
+
+
+def measure(models_dir: Path, workers: int, preload: bool, timeout: float) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        "MODELS_DIR": str(models_dir),
+        "MODEL_NAME": "xgb_model.pkl",
+        "ARTIFACT_SOURCE": "local",
+        "WARMUP_REQUESTS": "2",
+        "EXECUTION_BACKEND": "thread",
+        "LOG_LEVEL": "WARNING",
+    }
+    cmd = [sys.executable, "-m", "src.api.serve", "--workers", str(workers)]
+    cmd += ["--host", "127.0.0.1", "--port", str(port)]
+    if not preload:
+        cmd.append("--no-preload")
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+    try:
+        # Every worker must have answered /health as warm
+        warm = set()
+        deadline = time.monotonic() + timeout
+        while len(warm) < workers:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"only {len(warm)}/{workers} workers warmed up")
+            try:
+                health = httpx.get(f"http://127.0.0.1:{port}/health").json()
+            except httpx.TransportError:
+                time.sleep(0.1)
+                continue
+            if health["readiness"]["warmup"] in ("done", "skipped"):
+                warm.add(health["memory"]["pid"])
+        time.sleep(0.5)
+        return total_memory([proc.pid, *children(proc.pid)])
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--estimators", type=int, default=400)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        art = build_artifacts(tmp, n_train=20000, n_estimators=args.estimators)
+        columns = pd.DataFrame(columns=art["feature_columns"])
+        record_features(Path(tmp) / "feature_schema.json", columns, {})
+        model_mb = art["paths"]["model_path"].stat().st_size / 2**20
+        print(f"model file: {model_mb:.1f} MB")
+        print(f"{'workers':>7} {'preload':>8} {'RSS sum MB':>11} {'PSS sum MB':>11}")
+        for n in [int(s) for s in args.workers.split(",")]:
+            for preload in (False, True):
+                usage = measure(Path(tmp), n, preload, args.timeout)
+                print(
+                    f"{n:>7} {str(preload):>8} {usage['rss_bytes'] / 2**20:>11.1f} "
+                    f"{usage['pss_bytes'] / 2**20:>11.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
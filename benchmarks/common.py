@@ -0,0 +1,103 @@
+"""
+Shared helpers for benchmarks: synthetic raw data and throwaway artifacts.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from joblib import dump
+from xgboost import XGBRegressor
+
+from src.feature_pipeline.feature_engineering import (
+    add_date_features,
+    drop_unused_columns,
+    frequency_encode,
+    target_encode,
+)
+
+CITIES = [
+    "Austin-Round Rock-Georgetown",
+    "Denver–Aurora–Lakewood",
+    "Boise City",
+    "Las Vegas-Henderson-Paradise",
+    "Unknown Metro",
+]
+NUMERIC = [
+    "median_list_price",
+    "median_sale_price",
+    "median_ppsf",
+    "homes_sold",
+    "pending_sales",
+    "inventory",
+    "median_dom",
+    "avg_sale_to_list",
+    "Total Population",
+    "Median Home Value",
+]
+
+
+def make_raw_frame(n: int, seed: int = 0, with_latlng: bool = True) -> pd.DataFrame:
+    """Synthetic raw rows shaped like the Redfin holdout data."""
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime("2022-01-01") + pd.to_timedelta(
+        rng.integers(0, 700, n), unit="D"
+    )
+    df = pd.DataFrame(
+        {
+            "date": dates.strftime("%Y-%m-%d"),
+            "city_full": rng.choice(CITIES, n),
+            "zipcode": rng.integers(10000, 10500, n),
+        }
+    )
+    for col in NUMERIC:
+        df[col] = rng.uniform(1e3, 1e6, n).round(2)
+    if with_latlng:
+        df["lat"] = rng.uniform(30, 45, n).round(4)
+        df["lng"] = rng.uniform(-120, -90, n).round(4)
+    df["price"] = rng.uniform(1e5, 1e6, n).round(2)
+    return df
+
+
+def build_artifacts(
+    out_dir: Path, n_train: int = 5000, n_estimators: int = 100
+) -> Dict:
+    """Fit a small model + encoders and save them like the real pipeline."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    train = make_raw_frame(n_train, seed=1)
+    train["city_full"] = train["city_full"].str.lower()
+    train = add_date_features(train)
+    train, _, freq_map = frequency_encode(train, train.copy(), "zipcode")
+    train, _, te = target_encode(train, train.copy(), "city_full", "price")
+    train, _ = drop_unused_columns(train, train.copy())
+
+    X, y = train.drop(columns=["price"]), train["price"]
+    model = XGBRegressor(
+        n_estimators=n_estimators, max_depth=6, random_state=0, n_jobs=1
+    )
+    model.fit(X, y)
+
+    paths = {
+        "model_path": out_dir / "xgb_model.pkl",
+        "freq_encoder_path": out_dir / "freq_encoder.pkl",
+        "target_encoder_path": out_dir / "target_encoder.pkl",
+    }
+    dump(model, paths["model_path"])
+    dump(freq_map, paths["freq_encoder_path"])
+    dump(te, paths["target_encoder_path"])
+    return {"paths": paths, "feature_columns": list(X.columns)}
+
+
+def timeit(fn: Callable[[], object], repeat: int = 5) -> List[float]:
+    """Wall-clock seconds for `repeat` calls of `fn`."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
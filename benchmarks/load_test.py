@@ -0,0 +1,349 @@
+"""
+Load test for the API: replay a request stream, report latency and errors.
+
+Requests come from a JSONL file, one ``{"method", "path", "headers",
+"json" | "body"}`` object per line, or are generated (/predict bodies of
+1–100 synthetic rows). They are sent in process through httpx's ASGI
+transport (the app's lifespan runs too) or, with --url, to a running
+server such as ``python -m src.api.serve``.
+
+With --rate the test is open loop: requests arrive on a Poisson schedule
+whatever the server does, at most --concurrency are in flight, and latency
+is measured from the scheduled arrival so queueing delay is not hidden.
+Without --rate it is closed loop: --concurrency clients send back to back.
+
+The report (throughput, p50/p95/p99 latency, error rate, per path) is
+printed and optionally saved as JSON. With --baseline the run fails (exit
+code 1) if a latency percentile grew by more than --tolerance or the error
+rate by more than --error-tolerance; --save-baseline stores the report as
+the new baseline.
+
+    python -m benchmarks.load_test --synthetic 2000 --concurrency 16
+    python -m benchmarks.load_test --requests recorded.jsonl --rate 200 \\
+        --baseline benchmarks/baseline.json --out results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+import pandas as pd
+import structlog
+
+from benchmarks.common import build_artifacts, make_raw_frame
+
+PERCENTILES = (50, 95, 99)
+
+
+def load_requests(path: Path | str) -> List[Dict[str, Any]]:
+    """Recorded requests, one JSON object per line (blank lines skipped)."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_requests(
+    n: int, api_key: str = "", sizes=(1, 10, 100), seed: int = 0
+) -> List[Dict[str, Any]]:
+    """`n` /predict requests cycling through `sizes` rows each."""
+    rng = random.Random(seed)
+    pool = make_raw_frame(max(sizes) * 8, seed=seed).to_dict(orient="records")
+    requests = []
+    for i in range(n):
+        rows = sizes[i % len(sizes)]
+        start = rng.randrange(len(pool) - rows + 1)
+        requests.append(
+            {
+                "method": "POST",
+                "path": "/predict",
+                "headers": {"X-API-Key": api_key},
+                "json": pool[start : start + rows],
+            }
+        )
+    return requests
+
+
+async def _send(client: httpx.AsyncClient, req: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        resp = await client.request(
+            req.get("method", "GET"),
+            req["path"],
+            headers=req.get("headers"),
+            json=req.get("json"),
+            content=req.get("body"),
+        )
+        return {"status": resp.status_code, "error": None}
+    except httpx.HTTPError as e:
+        return {"status": None, "error": f"{type(e).__name__}: {e}"}
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    requests: List[Dict[str, Any]],
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Send every request and collect one sample per request.
+
+    Args:
+        client: Client bound to the app or server under test
+        requests: Requests to send, in order
+        concurrency: Requests in flight at most
+        rate: Mean arrivals per second (open loop); None for closed loop
+        seed: Seed for the arrival schedule
+
+    Returns:
+        ``{"samples": [{"path", "status", "error", "latency_s"}], "wall_s"}``
+    """
+    samples: List[Dict[str, Any]] = []
+    sem = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def one(req: Dict[str, Any], arrival: float) -> None:
+        delay = arrival - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with sem:
+            result = await _send(client, req)
+        result.update(path=req["path"], latency_s=loop.time() - arrival)
+        samples.append(result)
+
+    if rate:
+        gaps = np.random.default_rng(seed).exponential(1.0 / rate, len(requests))
+        arrivals = start + np.cumsum(gaps)
+        await asyncio.gather(*(one(r, a) for r, a in zip(requests, arrivals)))
+    else:
+        queue = iter(requests)
+
+        async def client_loop() -> None:
+            for req in queue:
+                await one(req, loop.time())
+
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return {"samples": samples, "wall_s": loop.time() - start}
+
+
+def _latency(latencies_s: List[float]) -> Dict[str, Optional[float]]:
+    if not latencies_s:
+        return {f"p{p}_ms": None for p in PERCENTILES} | {"max_ms": None}
+    ms = np.asarray(latencies_s) * 1e3
+    stats = {f"p{p}_ms": float(np.percentile(ms, p)) for p in PERCENTILES}
+    return stats | {"max_ms": float(ms.max())}
+
+
+def summarize(run: Dict[str, Any], **params: Any) -> Dict[str, Any]:
+    """Throughput, latency percentiles and error rate, overall and per path."""
+    df = pd.DataFrame(run["samples"], columns=["path", "status", "error", "latency_s"])
+    failed = df["error"].notna() | (df["status"].fillna(599) >= 400)
+    by_path = {}
+    for path, group in df.groupby("path"):
+        by_path[path] = {
+            "requests": int(len(group)),
+            "error_rate": float(failed[group.index].mean()),
+            **_latency(group["latency_s"].tolist()),
+        }
+    statuses = df["status"].fillna(-1).astype(int).astype(str).replace("-1", "error")
+    return {
+        "params": params,
+        "requests": int(len(df)),
+        "wall_s": run["wall_s"],
+        "throughput_rps": len(df) / run["wall_s"] if run["wall_s"] else None,
+        "error_rate": float(failed.mean()) if len(df) else 0.0,
+        "status_counts": statuses.value_counts().sort_index().to_dict(),
+        **_latency(df["latency_s"].tolist()),
+        "paths": by_path,
+    }
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2,
+    error_tolerance: float = 0.01,
+) -> List[str]:
+    """
+    Regressions of `report` against `baseline`.
+
+    Args:
+        report: Result of `summarize`
+        baseline: An earlier report
+        tolerance: Allowed relative growth of each latency percentile
+        error_tolerance: Allowed absolute growth of the error rate
+
+    Returns:
+        One message per regression; empty if the run is within bounds
+    """
+    problems = []
+    for key in [f"p{p}_ms" for p in PERCENTILES]:
+        now, then = report.get(key), baseline.get(key)
+        if now is not None and then and now > then * (1 + tolerance):
+            problems.append(
+                f"{key} {now:.1f} ms > baseline {then:.1f} ms (+{tolerance:.0%})"
+            )
+    if report["error_rate"] > baseline.get("error_rate", 0.0) + error_tolerance:
+        problems.append(
+            f"error rate {report['error_rate']:.2%} > baseline "
+            f"{baseline.get('error_rate', 0.0):.2%} (+{error_tolerance:.2%})"
+        )
+    return problems
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 120.0) -> None:
+    """Poll /ready until the app has loaded and warmed up."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError("API did not become ready")
+        await asyncio.sleep(0.1)
+
+
+async def run_in_process(
+    requests: List[Dict[str, Any]], concurrency: int, rate: Optional[float]
+) -> Dict[str, Any]:
+    """`run_load` against ``src.api.main:app`` in this process."""
+    from src.api.main import app
+
+    # The app configures logging on import; per-request logs would dominate
+    logging.getLogger().setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest"
+        ) as client:
+            await wait_ready(client)
+            return await run_load(client, requests, concurrency, rate)
+
+
+async def run_remote(
+    url: str,
+    requests: List[Dict[str, Any]],
+    concurrency: int,
+    rate: Optional[float],
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """`run_load` against a running server at `url`."""
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=url, limits=limits, timeout=timeout
+    ) as client:
+        await wait_ready(client)
+        return await run_load(client, requests, concurrency, rate)
+
+
+def use_synthetic_artifacts(tmp: str) -> None:
+    """Point the in-process app at a throwaway model and encoders."""
+    from src.api import main as api
+    from src.utils.feature_schema import record_features
+
+    art = build_artifacts(tmp)
+    schema_path = Path(tmp) / "feature_schema.json"
+    record_features(schema_path, pd.DataFrame(columns=art["feature_columns"]), {})
+    api.ARTIFACT_PATHS = art["paths"]
+    api.ARTIFACT_SPECS = {**art["paths"], "schema": schema_path}
+    api.SCHEMA_PATH = schema_path
+    api.MODEL_PATH = art["paths"]["model_path"]
+    api.settings.artifact_source = "local"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--requests", help="JSONL file of recorded requests")
+    source.add_argument("--synthetic", type=int, help="Generate N /predict calls")
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, help="Arrivals per second")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--api-key", help="X-API-Key for synthetic requests")
+    parser.add_argument(
+        "--synthetic-artifacts",
+        action="store_true",
+        help="In process: serve a throwaway model instead of models/",
+    )
+    parser.add_argument("--out", help="Write the report here (JSON)")
+    parser.add_argument("--baseline", help="Fail on regression against this report")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--error-tolerance", type=float, default=0.01)
+    args = parser.parse_args()
+
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url is None:
+            from src.config.settings import settings
+
+            if args.synthetic_artifacts:
+                use_synthetic_artifacts(tmp)
+            if not settings.api_key:  # the app rejects every key when unset
+                settings.api_key = args.api_key or "loadtest"
+            api_key = settings.api_key
+        else:
+            api_key = args.api_key or ""
+        if args.requests:
+            requests = load_requests(args.requests)
+        else:
+            requests = synthetic_requests(args.synthetic, api_key=api_key)
+
+        if args.url:
+            run = asyncio.run(
+                run_remote(
+                    args.url, requests, args.concurrency, args.rate, args.timeout
+                )
+            )
+        else:
+            run = asyncio.run(run_in_process(requests, args.concurrency, args.rate))
+
+    report = summarize(
+        run,
+        target=args.url or "in-process",
+        concurrency=args.concurrency,
+        rate=args.rate,
+        source=args.requests or f"synthetic:{args.synthetic}",
+    )
+    print(json.dumps({k: v for k, v in report.items() if k != "paths"}, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if args.save_baseline:
+            baseline_path.write_text(json.dumps(report, indent=2))
+            print(f"Baseline saved to {baseline_path}")
+        elif baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+            if baseline.get("params") != report["params"]:
+                print(f"⚠️  Baseline was run with {baseline.get('params')}")
+            problems = compare(report, baseline, args.tolerance, args.error_tolerance)
+            for problem in problems:
+                print(f"❌ {problem}")
+            if problems:
+                sys.exit(1)
+            print("✅ Within baseline")
+        else:
+            print(f"No baseline at {baseline_path}; use --save-baseline")
+
+
+if __name__ == "__main__":
+    main()
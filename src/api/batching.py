@@ -0,0 +1,155 @@
+"""
+Dynamic micro-batching for concurrent /predict calls.
+
+Requests that arrive within a short window (or until the batch reaches a
+row limit) are stacked into one feature matrix, scored with a single
+vectorized model call, and each caller receives its own slice of the
+results. Feature preparation stays per request, so row filtering
+(duplicates, outliers) never crosses request boundaries.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PredictFn = Callable[[np.ndarray], np.ndarray]
+# Runs a blocking predict function off the event loop
+Runner = Callable[[PredictFn, np.ndarray], Awaitable[np.ndarray]]
+
+# Upper bounds (rows) of the batch-size histogram buckets
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+async def _to_thread(fn: PredictFn, X: np.ndarray) -> np.ndarray:
+    return await asyncio.to_thread(fn, X)
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into vectorized model calls."""
+
+    def __init__(
+        self,
+        window_ms: float = 2.0,
+        max_batch_size: int = 256,
+        runner: Runner = _to_thread,
+    ) -> None:
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.runner = runner
+
+        self._pending: List[Tuple[np.ndarray, PredictFn, asyncio.Future, float]] = []
+        self._pending_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()  # keep running batches referenced
+
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.size_histogram = {b: 0 for b in SIZE_BUCKETS + (float("inf"),)}
+
+    async def submit(self, X: np.ndarray, predict_fn: PredictFn) -> np.ndarray:
+        """
+        Queue `X` for the next batch and wait for its predictions.
+
+        Args:
+            X: Aligned feature rows for one request
+            predict_fn: Model call for those rows (e.g. plan.predict_matrix);
+                requests with different functions are never mixed
+
+        Returns:
+            Predictions for exactly the rows of `X`
+        """
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float32)
+
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        self._pending.append((X, predict_fn, fut, time.perf_counter()))
+        self._pending_rows += len(X)
+
+        if self._pending_rows >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending, self._pending_rows = self._pending, [], 0
+        if not items:
+            return
+
+        groups: Dict[PredictFn, list] = {}
+        for item in items:
+            groups.setdefault(item[1], []).append(item)
+        for predict_fn, group in groups.items():
+            task = asyncio.ensure_future(self._run(predict_fn, group))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, predict_fn: PredictFn, group: list) -> None:
+        now = time.perf_counter()
+        X = group[0][0] if len(group) == 1 else np.vstack([g[0] for g in group])
+        self._record(group, len(X), now)
+
+        try:
+            preds = await self.runner(predict_fn, X)
+        except Exception as e:
+            logger.error("Micro-batch prediction failed", rows=len(X), error=str(e))
+            for _, _, fut, _ in group:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        offset = 0
+        for x, _, fut, _ in group:
+            if not fut.done():  # caller may have been cancelled
+                fut.set_result(preds[offset : offset + len(x)])
+            offset += len(x)
+
+    def _record(self, group: list, n_rows: int, now: float) -> None:
+        self.batches += 1
+        self.requests += len(group)
+        self.rows += n_rows
+        for _, _, _, enqueued in group:
+            wait = now - enqueued
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        bucket = next(b for b in self.size_histogram if n_rows <= b)
+        self.size_histogram[bucket] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue-wait and batch-size statistics since startup."""
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "requests": self.requests,
+            "rows": self.rows,
+            "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+            "mean_requests_per_batch": (
+                self.requests / self.batches if self.batches else 0.0
+            ),
+            "queue_wait_ms_mean": (
+                1000.0 * self.wait_seconds_total / self.requests
+                if self.requests
+                else 0.0
+            ),
+            "queue_wait_ms_max": 1000.0 * self.wait_seconds_max,
+            "batch_rows_histogram": {
+                ("+Inf" if b == float("inf") else str(b)): c
+                for b, c in self.size_histogram.items()
+            },
+        }
@@ -0,0 +1,150 @@
+"""
+Request/response formats for /predict.
+
+Requests are decoded by Content-Type:
+
+- ``application/json``: a list of records (``[{"col": v, ...}, ...]``) or
+  column-oriented (``{"col": [v, ...], ...}``)
+- ``application/vnd.apache.arrow.stream``: an Arrow IPC stream
+- ``application/msgpack``: records or columns, as in JSON
+
+Columnar and Arrow bodies become a DataFrame directly instead of being
+validated record by record and rebuilt into columns; bodies small enough
+for the pandas-free fast path become records instead. Responses are encoded
+by the Accept header: JSON (via orjson), Arrow or msgpack.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+import msgpack
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow as pa
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from src.config.settings import settings
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+Payload = List[Dict[str, Any]] | pd.DataFrame
+
+
+def _media_type(header: Optional[str]) -> str:
+    media = (header or JSON).split(";")[0].strip().lower()
+    return _ALIASES.get(media, media)
+
+
+def available_formats() -> List[str]:
+    return [JSON, ARROW, MSGPACK]
+
+
+def _small(n_rows: int) -> bool:
+    """Small enough for the pandas-free fast path: keep it as records."""
+    return n_rows <= settings.fast_path_max_rows
+
+
+def _from_python(obj: Any) -> Payload:
+    """Records list → as is; columns dict → DataFrame (records if small)."""
+    if isinstance(obj, list) and all(isinstance(r, dict) for r in obj):
+        return obj
+    if isinstance(obj, dict) and all(isinstance(v, list) for v in obj.values()):
+        lengths = {len(v) for v in obj.values()}
+        if len(lengths) == 1 and _small(lengths.pop()):
+            names = list(obj)
+            return [dict(zip(names, row)) for row in zip(*obj.values())]
+        try:
+            return pd.DataFrame(obj)
+        except ValueError as e:  # ragged columns
+            raise HTTPException(status_code=400, detail=f"Invalid columns: {e}")
+    raise HTTPException(
+        status_code=422,
+        detail="Expected a list of records or an object of equal-length columns",
+    )
+
+
+def decode_request(body: bytes, content_type: Optional[str]) -> Payload:
+    """
+    Parse a /predict body.
+
+    Returns:
+        A list of record dicts (record JSON/msgpack) or a DataFrame
+
+    Raises:
+        HTTPException: 415 for unsupported (or unavailable) formats, 400 for
+            bodies that cannot be parsed
+    """
+    media = _media_type(content_type)
+    try:
+        if media == JSON:
+            obj = orjson.loads(body)
+            return _from_python(obj)
+        if media == ARROW:
+            table = pa.ipc.open_stream(body).read_all()
+            return table.to_pylist() if _small(table.num_rows) else table.to_pandas()
+        if media == MSGPACK:
+            return _from_python(msgpack.unpackb(body))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid {media} body: {e}")
+    raise HTTPException(
+        status_code=415,
+        detail=f"Unsupported Content-Type {media!r}; use one of "
+        f"{available_formats()}",
+    )
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """First available media type listed in Accept (JSON by default)."""
+    for part in (accept or "").split(","):
+        media = _media_type(part)
+        if media in available_formats():
+            return media
+    return JSON
+
+
+def encode_response(
+    predictions: np.ndarray,
+    actuals: Optional[np.ndarray],
+    media: str,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Response:
+    """
+    Encode prediction arrays without going through FastAPI's encoder.
+
+    Args:
+        predictions: Predicted prices
+        actuals: Actual prices, if the input carried them
+        media: Response media type (see `negotiate`)
+        extra: Further JSON-able fields (e.g. a trace); Arrow carries them as
+            JSON in the schema metadata
+    """
+    columns = {"predictions": np.asarray(predictions, dtype=np.float64)}
+    if actuals is not None:
+        columns["actuals"] = np.asarray(actuals, dtype=np.float64)
+
+    if media == ARROW:
+        table = pa.table(columns)
+        if extra:
+            table = table.replace_schema_metadata(
+                {k: json.dumps(v) for k, v in extra.items()}
+            )
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), media_type=ARROW)
+
+    if media == MSGPACK:
+        body = {k: v.tolist() for k, v in columns.items()} | (extra or {})
+        return Response(msgpack.packb(body), media_type=MSGPACK)
+
+    body = orjson.dumps({**columns, **(extra or {})}, option=orjson.OPT_SERIALIZE_NUMPY)
+    return Response(body, media_type=JSON)
@@ -0,0 +1,134 @@
+"""
+Execution backends for CPU-heavy request work.
+
+The API hands prediction and batch work to one of three backends instead
+of Starlette's shared default threadpool:
+
+- ``inline``:  run on the event loop (only sensible for tiny payloads)
+- ``thread``:  a bounded thread pool dedicated to model work
+- ``process``: a process pool whose workers preload the model and encoders
+  at start, sidestepping the GIL for pandas-heavy requests
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.exceptions import ConfigurationError
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MODES = ("inline", "thread", "process")
+
+
+class ExecutionBackend:
+    """Run blocking callables asynchronously on the configured backend."""
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 0,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = (),
+    ) -> None:
+        """
+        Args:
+            mode: One of "inline", "thread" or "process"
+            max_workers: Pool size; 0 means one worker per CPU
+            initializer: Called once in every process worker (e.g. to
+                preload artifacts); ignored by the other modes
+            initargs: Arguments for `initializer`
+
+        Raises:
+            ConfigurationError: If `mode` is unknown
+        """
+        if mode not in MODES:
+            raise ConfigurationError(
+                f"Unknown execution backend {mode!r}; expected one of {MODES}"
+            )
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor: Optional[Executor] = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+    def start(self) -> None:
+        """Create the pool; process workers preload artifacts right away."""
+        if self._executor is not None or self.mode == "inline":
+            return
+        if self.mode == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="predict"
+            )
+        else:
+            # spawn: workers must not inherit the server's threads and locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+                initargs=self.initargs,
+            )
+            for _ in range(self.max_workers):
+                self._executor.submit(_noop)  # spawn every worker now
+        logger.info(
+            "Execution backend started", mode=self.mode, max_workers=self.max_workers
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run `fn(*args, **kwargs)` on the backend and await its result.
+
+        For the process backend `fn`, its arguments and its result must be
+        picklable (module-level functions, plain data, numpy arrays).
+        """
+        self.submitted += 1
+        start = time.perf_counter()
+        try:
+            if self.mode == "inline":
+                result = fn(*args, **kwargs)
+            else:
+                if self._executor is None:
+                    self.start()
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._executor, partial(fn, *args, **kwargs)
+                )
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.busy_seconds += time.perf_counter() - start
+        self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.submitted - self.completed - self.failed,
+            "busy_seconds": self.busy_seconds,
+        }
+
+
+def _noop() -> None:
+    return None
@@ -0,0 +1,426 @@
+"""
+Background batch jobs for /run_batch.
+
+POST /run_batch only enqueues a job and returns its id; at most
+`max_concurrent` jobs run at a time and the rest wait as "queued". Each
+job runs the batch target with two hooks:
+
+- ``progress(event)``: a ``{"type": "plan", "months": [...]}`` event up
+  front, then one ``{"type": "month", "period", "rows", "seconds"}`` event
+  per finished month
+- ``cancelled()``: polled between months; the target raises
+  `JobCancelledError` once it returns True
+
+In ``process`` mode every job runs in its own spawned child process, so a
+batch never competes with request handling for the GIL or a backend
+worker, and a job stuck inside a month is terminated once the cancel grace
+period runs out. ``thread`` mode runs the target in the API process.
+
+Job records are saved as JSON under `jobs_dir` on every change; jobs that
+were queued or running when the API stopped are reported as "interrupted"
+after a restart. With several API workers (see src/api/serve.py) each job
+is run and cancelled by the worker that accepted it, but any worker reports
+its status from the saved record.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.exceptions import ConfigurationError, JobCancelledError
+from src.utils.logging_config import get_logger
+from src.utils.metrics import BATCH_JOB_SECONDS, REGISTRY
+
+logger = get_logger(__name__)
+
+MODES = ("thread", "process")
+ACTIVE = ("queued", "running")
+CANCEL_GRACE_SECONDS = 30.0  # process mode: terminate a cancelled job after this
+EXIT_DRAIN_SECONDS = 1.0  # process mode: wait for events still in the pipe on exit
+
+Target = Callable[..., Dict[str, Any]]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {**job, "months": [dict(m) for m in job["months"]]}
+
+
+def _alive(pid: Optional[int]) -> bool:
+    """Whether `pid` is another running process (e.g. a sibling worker)."""
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _run_child(
+    target: Target, events: Any, cancel: Any, options: Dict[str, Any]
+) -> None:
+    """Child process entry point: run `target`, report through `events`."""
+    try:
+        result = target(progress=events.put, cancelled=cancel.is_set, **options)
+        events.put({"type": "done", "result": result})
+    except JobCancelledError:
+        events.put({"type": "cancelled"})
+    except Exception as e:
+        events.put({"type": "error", "error": f"{type(e).__name__}: {e}"})
+
+
+class JobManager:
+    """Queue, run, track and cancel batch jobs."""
+
+    def __init__(
+        self,
+        target: Target,
+        mode: str = "process",
+        max_concurrent: int = 1,
+        jobs_dir: Optional[Path | str] = None,
+    ) -> None:
+        """
+        Args:
+            target: Batch function accepting ``progress`` and ``cancelled``
+                keyword arguments and returning a JSON-able summary; must be
+                module-level in process mode
+            mode: "process" or "thread"
+            max_concurrent: Jobs allowed to run at once
+            jobs_dir: Where job records are saved; None keeps them in memory
+
+        Raises:
+            ConfigurationError: If `mode` is unknown
+        """
+        if mode not in MODES:
+            raise ConfigurationError(
+                f"Unknown batch job mode {mode!r}; expected one of {MODES}"
+            )
+        self.target = target
+        self.mode = mode
+        self.max_concurrent = max(1, max_concurrent)
+        self.jobs_dir = Path(jobs_dir) if jobs_dir is not None else None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._cancel: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        """Load saved job records; active ones did not survive the restart."""
+        if self.jobs_dir is None or not self.jobs_dir.exists():
+            return
+        for path in sorted(self.jobs_dir.glob("*.json")):
+            job = self._read(path)
+            if job is None:
+                logger.warning("Skipping unreadable job record", path=str(path))
+                continue
+            with self._lock:
+                self._jobs[job["id"]] = job
+            if job["status"] in ACTIVE and not _alive(job.get("owner_pid")):
+                self._update(job["id"], status="interrupted", finished_at=_now())
+
+    def shutdown(self) -> None:
+        """Cancel queued and running jobs and stop the runner threads."""
+        with self._lock:
+            events = list(self._cancel.values())
+        for event in events:
+            event.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, **options: Any) -> Dict[str, Any]:
+        """
+        Enqueue a job and return its record.
+
+        Args:
+            **options: Extra keyword arguments for the target (JSON-able)
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "created_at": _now(),
+            "owner_pid": os.getpid(),
+            "options": options,
+            "started_at": None,
+            "finished_at": None,
+            "months_total": None,
+            "months_done": 0,
+            "rows_processed": 0,
+            "elapsed_seconds": 0.0,
+            "throughput_rows_per_s": None,
+            "months": [],
+            "error": None,
+            "result": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._cancel[job_id] = threading.Event()
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent, thread_name_prefix="batch-job"
+                )
+            pool = self._pool
+            self._save(job)
+        pool.submit(self._run, job_id)
+        logger.info("Batch job queued", job_id=job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of one job's record, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and (
+                job_id in self._cancel or job["status"] not in ACTIVE
+            ):
+                return _snapshot(job)
+        # Unknown here or run by another worker: its saved record is current
+        if self.jobs_dir is not None:
+            saved = self._read(self.jobs_dir / f"{job_id}.json")
+            if saved is not None:
+                return saved
+        return job and _snapshot(job)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """All known jobs, newest first, without per-month detail."""
+        with self._lock:
+            ids = set(self._jobs)
+        if self.jobs_dir is not None and self.jobs_dir.exists():
+            ids.update(p.stem for p in self.jobs_dir.glob("*.json"))
+        jobs = [
+            {k: v for k, v in job.items() if k != "months"}
+            for job in map(self.get, ids)
+            if job is not None
+        ]
+        return sorted(jobs, key=lambda j: j["created_at"], reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Request cancellation of a queued or running job.
+
+        A queued job is cancelled at once; a running one stops before its
+        next month. Jobs of another worker are flagged on disk for that
+        worker to pick up. Finished jobs are returned unchanged.
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] not in ACTIVE:
+            return job
+        with self._lock:
+            event = self._cancel.get(job_id)
+        if event is not None:
+            event.set()
+            if job["status"] == "queued":
+                self._update(job_id, status="cancelled", finished_at=_now())
+        elif self.jobs_dir is not None:
+            self._cancel_flag(job_id).touch()
+        logger.info("Batch job cancel requested", job_id=job_id)
+        return self.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+        return {
+            "mode": self.mode,
+            "max_concurrent": self.max_concurrent,
+            **{s: statuses.count(s) for s in ACTIVE},
+        }
+
+    # ------------------------------------------------------------------
+    # Runner
+    # ------------------------------------------------------------------
+
+    def _cancel_flag(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.cancel"
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        """Cancelled through this manager or, via the flag file, another."""
+        event = self._cancel[job_id]
+        if not event.is_set() and self.jobs_dir is not None:
+            if self._cancel_flag(job_id).exists():
+                event.set()
+        return event.is_set()
+
+    def _run(self, job_id: str) -> None:
+        if self._cancel_requested(job_id):  # cancelled while queued
+            self._update(job_id, status="cancelled", finished_at=_now())
+            self._finish(job_id)
+            return
+        self._update(job_id, status="running", started_at=_now())
+        start = time.perf_counter()
+        try:
+            if self.mode == "thread":
+                outcome = self._run_in_thread(job_id, start)
+            else:
+                outcome = self._run_in_process(job_id, start)
+        except Exception as e:  # the runner itself failed
+            outcome = {"type": "error", "error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - start
+
+        if outcome["type"] == "done":
+            self._update(job_id, status="succeeded", result=outcome["result"])
+            if REGISTRY.enabled:
+                BATCH_JOB_SECONDS.observe(elapsed)
+        elif outcome["type"] == "cancelled":
+            self._update(job_id, status="cancelled")
+        else:
+            self._update(job_id, status="failed", error=outcome["error"])
+        self._update(job_id, finished_at=_now(), elapsed_seconds=elapsed)
+        self._finish(job_id)
+        logger.info(
+            "Batch job finished", job_id=job_id, status=self.get(job_id)["status"]
+        )
+
+    def _finish(self, job_id: str) -> None:
+        with self._lock:
+            self._cancel.pop(job_id, None)
+        if self.jobs_dir is not None:
+            self._cancel_flag(job_id).unlink(missing_ok=True)
+
+    def _run_in_thread(self, job_id: str, start: float) -> Dict[str, Any]:
+        try:
+            result = self.target(
+                **self._jobs[job_id]["options"],
+                progress=lambda event: self._on_event(job_id, event, start),
+                cancelled=lambda: self._cancel_requested(job_id),
+            )
+        except JobCancelledError:
+            return {"type": "cancelled"}
+        except Exception as e:
+            logger.exception("Batch job failed", job_id=job_id)
+            return {"type": "error", "error": f"{type(e).__name__}: {e}"}
+        return {"type": "done", "result": result}
+
+    def _run_in_process(self, job_id: str, start: float) -> Dict[str, Any]:
+        # spawn: the child must not inherit the server's threads and locks.
+        # Not a daemon, so it may start its own pool (BATCH_WORKERS > 1)
+        ctx = multiprocessing.get_context("spawn")
+        events = ctx.Queue()
+        child_cancel = ctx.Event()
+        proc = ctx.Process(
+            target=_run_child,
+            args=(self.target, events, child_cancel, self._jobs[job_id]["options"]),
+            name=f"batch-job-{job_id}",
+        )
+        proc.start()
+        cancelled_at = None
+        outcome = None
+        try:
+            while outcome is None:
+                if cancelled_at is None and self._cancel_requested(job_id):
+                    child_cancel.set()
+                    cancelled_at = time.monotonic()
+                if (
+                    cancelled_at is not None
+                    and time.monotonic() - cancelled_at > CANCEL_GRACE_SECONDS
+                ):
+                    proc.terminate()
+                    outcome = {"type": "cancelled"}
+                    break
+                try:
+                    event = events.get(timeout=0.2)
+                except queue.Empty:
+                    if not proc.is_alive():
+                        # Its last events may still be in the pipe
+                        outcome = self._drain_exited(
+                            job_id, events, start, proc.exitcode
+                        )
+                    continue
+                if event["type"] in ("plan", "month"):
+                    self._on_event(job_id, event, start)
+                else:
+                    outcome = event
+        finally:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.kill()
+            events.close()
+        return outcome
+
+    def _drain_exited(
+        self, job_id: str, events: Any, start: float, exitcode: Optional[int]
+    ) -> Dict[str, Any]:
+        """
+        Outcome of a child that has exited: its terminal event if one is
+        still queued, else an error (exit code 0 without one is a protocol
+        error, not a success).
+        """
+        while True:
+            try:
+                event = events.get(timeout=EXIT_DRAIN_SECONDS)
+            except queue.Empty:
+                break
+            if event["type"] in ("plan", "month"):
+                self._on_event(job_id, event, start)
+            else:
+                return event
+        if exitcode == 0:
+            error = "Job process exited without reporting a result"
+        else:
+            error = f"Job process exited with code {exitcode}"
+        return {"type": "error", "error": error}
+
+    def _on_event(self, job_id: str, event: Dict[str, Any], start: float) -> None:
+        """Fold a progress event from the target into the job record."""
+        if event["type"] == "plan":
+            self._update(job_id, months_total=len(event["months"]))
+            return
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            job = self._jobs[job_id]
+            job["months"].append(
+                {
+                    "period": event["period"],
+                    "rows": event["rows"],
+                    "seconds": round(event["seconds"], 3),
+                    "skipped": event.get("skipped", False),
+                }
+            )
+            job["months_done"] += 1
+            job["rows_processed"] += event["rows"]
+            job["elapsed_seconds"] = elapsed
+            job["throughput_rows_per_s"] = (
+                job["rows_processed"] / elapsed if elapsed > 0 else None
+            )
+            self._save(job)
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            self._jobs[job_id].update(fields)
+            self._save(self._jobs[job_id])
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, job: Dict[str, Any]) -> None:
+        """Write a job record atomically (call with the lock held)."""
+        if self.jobs_dir is None:
+            return
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        path = self.jobs_dir / f"{job['id']}.json"
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(job, indent=2))
+        os.replace(tmp, path)
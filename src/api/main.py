@@ -9,20 +9,46 @@ A FastAPI-based REST API for housing price prediction with enterprise-grade feat
 - Health monitoring
 """
 
-import os
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Optional
 
 import boto3
 import pandas as pd
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.security import APIKeyHeader
 
 # Import configuration, logging, and exceptions
-from src.batch.run_batch import run_monthly_predictions
+from src.api import codecs
+from src.api.batching import MicroBatcher
+from src.api.codecs import Payload
+from src.api.executor import ExecutionBackend
+from src.api.jobs import JobManager
+from src.api.readiness import Readiness, warmup_payloads
+from src.batch.catalog import find_entry, load_catalog, read_rows
+from src.batch.run_batch import run_batch_job
 from src.config.settings import settings
-from src.inference_pipeline.inference import predict
+from src.inference_pipeline.inference import (
+    inference_plan,
+    predict_features,
+    predict_records,
+    preload_artifacts,
+    prepare_records,
+    prepare_with_plan,
+)
+from src.inference_pipeline.prediction_cache import prediction_cache
+from src.utils.artifact_fetcher import ArtifactFetcher, FetchResult
+from src.utils.exceptions import InvalidInputError
+from src.utils.feature_schema import load_feature_schema
 from src.utils.logging_config import configure_logging, get_logger
+from src.utils.memory import memory_report
+from src.utils.metrics import HTTP_LATENCY, HTTP_REQUESTS, REGISTRY, REQUEST_ROWS
+from src.utils.storage import read_table, table_path
+from src.utils.tracing import run_traced
 
 # Configure logging
 configure_logging()
@@ -52,42 +78,111 @@ def get_api_key(api_key: str = Depends(api_key_header)) -> str:
 
 
 # ----------------------------
-# Config
+# Paths
 # ----------------------------
-s3 = boto3.client("s3", region_name=settings.aws_region)
-
+MODEL_PATH = settings.model_path
+SCHEMA_PATH = settings.feature_schema_path
+
+# S3 key → local path of everything the worker needs. The feature-schema
+# manifest (a few KB) replaces the engineered training table.
+ARTIFACT_SPECS: Dict[str, Path] = {
+    f"models/{settings.model_name}": settings.model_path,
+    f"models/{settings.freq_encoder_name}": settings.freq_encoder_path,
+    f"models/{settings.target_encoder_name}": settings.target_encoder_path,
+    f"models/{settings.feature_schema_name}": settings.feature_schema_path,
+}
+
+
+def make_s3_client():
+    return boto3.client("s3", region_name=settings.aws_region)
+
+
+def fetch_artifacts() -> Dict[str, FetchResult]:
+    """Fetch all artifacts concurrently into the content-addressed cache."""
+    fetcher = ArtifactFetcher(
+        make_s3_client(),
+        settings.s3_bucket,
+        settings.artifact_cache_path,
+        max_workers=settings.artifact_fetch_workers,
+    )
+    return fetcher.fetch_all(ARTIFACT_SPECS)
 
-# Ensures your app always has the latest model/data locally,
-# but avoids re-downloading every time it starts.
-def load_from_s3(key, local_path):
-    """Download from S3 if not already cached locally."""
-    local_path = Path(local_path)
-    if not local_path.exists():
-        os.makedirs(local_path.parent, exist_ok=True)
-        logger.info("Downloading from S3", key=key, local_path=str(local_path))
-        s3.download_file(settings.s3_bucket, key, str(local_path))
-    return str(local_path)
 
+ARTIFACT_PATHS = {
+    "model_path": settings.model_path,
+    "freq_encoder_path": settings.freq_encoder_path,
+    "target_encoder_path": settings.target_encoder_path,
+}
 
-# ----------------------------
-# Paths
-# ----------------------------
-# Downloads model + training features from S3 if not cached.
-MODEL_PATH = Path(
-    load_from_s3(f"models/{settings.model_name}", str(settings.model_path))
+# Backend that runs all model and batch work for this worker
+backend = ExecutionBackend(
+    mode=settings.execution_backend,
+    max_workers=settings.executor_max_workers,
+    initializer=preload_artifacts,
+    initargs=tuple(ARTIFACT_PATHS.values()),
 )
-TRAIN_FE_PATH = Path(
-    load_from_s3(
-        f"processed/{settings.train_features_file}", str(settings.train_features_path)
+
+# Optional micro-batcher shared by all /predict calls in this worker
+batcher = (
+    MicroBatcher(
+        window_ms=settings.micro_batch_window_ms,
+        max_batch_size=settings.micro_batch_max_size,
+        runner=backend.run,
     )
+    if settings.micro_batching_enabled
+    else None
 )
 
-# Load expected training features for alignment
-if TRAIN_FE_PATH.exists():
-    _train_cols = pd.read_csv(TRAIN_FE_PATH, nrows=1)
-    TRAIN_FEATURE_COLUMNS = [c for c in _train_cols.columns if c != "price"]
-else:
-    TRAIN_FEATURE_COLUMNS = None
+# Background /run_batch jobs, outside the request backend
+jobs = JobManager(
+    run_batch_job,
+    mode=settings.batch_job_mode,
+    max_concurrent=settings.batch_max_concurrent_jobs,
+    jobs_dir=settings.jobs_path,
+)
+
+readiness = Readiness()
+
+
+async def sync_artifacts() -> None:
+    """Fetch artifacts off the event loop, start the backend, warm up."""
+    fetch = fetch_artifacts if settings.artifact_source == "s3" else None
+    await asyncio.to_thread(readiness.sync, fetch, ARTIFACT_SPECS)
+    if not readiness.artifacts_ready:
+        return
+    # Process workers preload artifacts, so start them only now
+    await asyncio.to_thread(backend.start)
+
+    # Exercise both the small-payload fast path and the DataFrame path
+    schema = load_feature_schema(SCHEMA_PATH)
+    payloads = warmup_payloads(
+        settings.warmup_requests,
+        schema.columns if schema is not None else None,
+        sizes=(1, settings.fast_path_max_rows + 1),
+    )
+    await readiness.warm_up(
+        run_warmup,
+        payloads,
+        retries=settings.warmup_retries,
+        backoff_seconds=settings.warmup_backoff_seconds,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve /health and /ready right away; artifacts sync in the background
+    app.state.sync_task = asyncio.create_task(sync_artifacts())
+    jobs.start()
+    yield
+    app.state.sync_task.cancel()
+    jobs.shutdown()
+    backend.shutdown()
+
+
+def require_ready() -> None:
+    """Reject model work until this worker's artifacts are in place."""
+    if not readiness.artifacts_ready:
+        raise HTTPException(status_code=503, detail="Artifacts not ready")
 
 
 # Initialize FastAPI app
@@ -97,8 +192,26 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
+if REGISTRY.enabled:
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template (not raw URL) to bound cardinality
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_LATENCY.observe(time.perf_counter() - start, request.method, path)
+            HTTP_REQUESTS.inc(request.method, path, str(status))
+
 
 @app.get("/")
 def root() -> Dict[str, str]:
@@ -131,30 +244,148 @@ def health() -> Dict[str, Any]:
         logger.error("Health check failed: model not found")
     else:
         logger.info("Health check passed")
-        if TRAIN_FEATURE_COLUMNS:
-            status["n_features_expected"] = len(TRAIN_FEATURE_COLUMNS)
+        schema = load_feature_schema(SCHEMA_PATH)
+        if schema is not None:
+            status["n_features_expected"] = len(schema.columns)
+
+    status["readiness"] = readiness.report()
+    status["execution_backend"] = backend.stats()
+    status["batch_jobs"] = jobs.stats()
+    status["memory"] = memory_report()
+    if batcher is not None:
+        status["micro_batching"] = batcher.stats()
+    if prediction_cache.enabled:
+        status["prediction_cache"] = prediction_cache.stats()
 
     return status
 
 
-@app.post("/predict")
-def predict_batch(
-    data: List[Dict[str, Any]], api_key: str = Depends(get_api_key)
-) -> Dict[str, Any]:
+@app.get("/ready")
+def ready() -> JSONResponse:
+    """
+    Readiness probe: 200 once this worker's artifacts are synced and the
+    warm-up pass has completed, else 503.
+
+    Returns:
+        Readiness report (artifact sync + warm-up status, warm-up latency)
+    """
+    report = readiness.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/metrics")
+def metrics() -> PlainTextResponse:
+    """
+    Prometheus text exposition of this worker's request, stage, batch and
+    artifact-load metrics (404 when ENABLE_METRICS is off).
+    """
+    if not REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+# One callable for every request so the batcher can group them together
+_predict_features = partial(predict_features, **ARTIFACT_PATHS)
+
+
+def _prepare_with_plan(data: Payload):
+    """Resolve the plan once and prepare `data` with it."""
+    plan = inference_plan(**ARTIFACT_PATHS)
+    return plan, prepare_with_plan(plan, data)
+
+
+async def _predict_micro_batched(data: Payload):
+    """
+    Prepare features on the backend, then score them in a shared batch.
+
+    Thread and inline backends resolve the plan once and score with its
+    `predict_matrix`, so a batch never mixes plans across an artifact
+    reload. Process workers each hold their own plan; there the preparing
+    worker and the scoring worker each look up theirs.
+    """
+    if backend.mode == "process":
+        batch = await backend.run(prepare_records, data, **ARTIFACT_PATHS)
+        preds = await batcher.submit(batch.X, _predict_features)
+    else:
+        plan, batch = await backend.run(_prepare_with_plan, data)
+        preds = await batcher.submit(batch.X, plan.predict_matrix)
+    return preds, batch.y_true
+
+
+async def run_prediction(data: Payload):
+    """The /predict model path."""
+    if batcher is not None:
+        return await _predict_micro_batched(data)
+    return await backend.run(predict_records, data, **ARTIFACT_PATHS)
+
+
+async def run_warmup(data: Payload):
+    """
+    The /predict model path for synthetic warm-up payloads: on the same
+    backend and plan, but past the micro-batcher, so it leaves no entries in
+    the prediction cache and no samples in the request/batch row metrics.
+    """
+    return await backend.run(predict_records, data, record=False, **ARTIFACT_PATHS)
+
+
+_PREDICT_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            codecs.JSON: {
+                "schema": {
+                    "oneOf": [
+                        {"type": "array", "items": {"type": "object"}},
+                        {
+                            "type": "object",
+                            "additionalProperties": {"type": "array"},
+                        },
+                    ]
+                }
+            },
+            codecs.ARROW: {"schema": {"type": "string", "format": "binary"}},
+            codecs.MSGPACK: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+@app.post("/predict", openapi_extra=_PREDICT_BODY)
+async def predict_batch(
+    request: Request,
+    api_key: str = Depends(get_api_key),
+    _: None = Depends(require_ready),
+    x_profile: Optional[str] = Header(default=None),
+) -> Response:
     """
     Core ML prediction endpoint for housing price estimation.
 
     Args:
-        data: List of property data dictionaries
+        request: Body as records or columns, in JSON, Arrow IPC or msgpack
+            (by Content-Type); the response format follows Accept
         api_key: Validated API key (dependency injection)
+        x_profile: `X-Profile` header; any value but 0/false adds a per-stage
+            `trace` to the response (only with ENABLE_PROFILING)
 
     Returns:
-        Dict containing predictions and optional actual prices
+        Predictions and optional actual prices
 
     Raises:
-        HTTPException: For invalid input or prediction failures
+        HTTPException: For invalid input (422 for nested field values) or
+            prediction failures, or 403 for `X-Profile` while profiling is
+            disabled
     """
+    profile = x_profile is not None and x_profile.lower() not in ("0", "false", "")
+    if profile and not settings.enable_profiling:
+        raise HTTPException(status_code=403, detail="Profiling disabled")
+
+    data = codecs.decode_request(
+        await request.body(), request.headers.get("content-type")
+    )
+    media = codecs.negotiate(request.headers.get("accept"))
     logger.info("Prediction request received", num_records=len(data))
+    if REGISTRY.enabled:
+        REQUEST_ROWS.observe(len(data))
 
     if not MODEL_PATH.exists():
         logger.error("Model not found", model_path=str(MODEL_PATH))
@@ -162,56 +393,105 @@ def predict_batch(
             status_code=500, detail=f"Model not found at {str(MODEL_PATH)}"
         )
 
-    df = pd.DataFrame(data)
-    if df.empty:
+    if data.empty if isinstance(data, pd.DataFrame) else not any(data):
         logger.warning("Empty data provided")
         raise HTTPException(status_code=400, detail="No data provided")
 
     try:
-        preds_df = predict(
-            df,
-            model_path=settings.model_path,
-            freq_encoder_path=settings.freq_encoder_path,
-            target_encoder_path=settings.target_encoder_path,
+        trace = None
+        if profile:
+            # Traced requests bypass micro-batching so the trace is theirs alone
+            (preds, actuals), trace = await backend.run(
+                run_traced, predict_records, data, **ARTIFACT_PATHS
+            )
+        else:
+            preds, actuals = await run_prediction(data)
+
+        logger.info("Prediction completed", num_predictions=len(preds))
+        return codecs.encode_response(
+            preds, actuals, media, extra={"trace": trace} if trace else None
         )
 
-        resp = {"predictions": preds_df["predicted_price"].astype(float).tolist()}
-        if "actual_price" in preds_df.columns:
-            resp["actuals"] = preds_df["actual_price"].astype(float).tolist()
-
-        logger.info("Prediction completed", num_predictions=len(resp["predictions"]))
-        return resp
-
+    except InvalidInputError as e:
+        logger.warning("Invalid prediction input", error=str(e))
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error("Prediction failed", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail="Prediction failed")
 
 
-# Trigger a monthly batch job via API.
-@app.post("/run_batch")
-def run_batch():
-    preds = run_monthly_predictions()
-    return {
-        "status": "success",
-        "rows_predicted": int(len(preds)),
-        "output_dir": "data/predictions/",
-    }
+# Queue a monthly batch job; poll /jobs/{job_id} for progress.
+@app.post("/run_batch", status_code=202, dependencies=[Depends(require_ready)])
+def run_batch(force: bool = Query(default=False)) -> Dict[str, Any]:
+    job = jobs.submit(force=force)
+    return {"job_id": job["id"], "status": job["status"], "url": f"/jobs/{job['id']}"}
+
+
+@app.get("/jobs")
+def list_jobs() -> Dict[str, Any]:
+    return {"jobs": jobs.list(), **jobs.stats()}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict[str, Any]:
+    """Status, per-month progress, rows processed, throughput and errors."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str) -> Dict[str, Any]:
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
 
 
 # Returns a preview of the most recent batch predictions.
 @app.get("/latest_predictions")
-def latest_predictions(limit: int = 5):
+def latest_predictions(
+    limit: int = Query(default=5, ge=0, le=10_000),
+    offset: int = Query(default=0, ge=0),
+    month: Optional[str] = Query(default=None, pattern=r"^\d{4}-\d{2}$"),
+):
+    """
+    Page through batch predictions of the latest (or a given) month.
+
+    Uses the output catalog to read only the requested rows; outputs written
+    before the catalog existed are read whole.
+
+    Args:
+        limit: Rows to return
+        offset: First row to return
+        month: ``YYYY-MM``; defaults to the most recent month
+    """
     pred_dir = settings.predictions_path
-    files = sorted(pred_dir.glob("preds_*.csv"))
-    if not files:
-        return {"error": "No predictions found"}
+    catalog = load_catalog(pred_dir)
+    if catalog:
+        entry = find_entry(catalog, month)
+        if entry is None:
+            raise HTTPException(status_code=404, detail=f"No predictions for {month}")
+        df = read_rows(pred_dir, entry, offset, limit)
+        name, period, rows = entry["file"], entry["period"], entry["rows"]
+    else:
+        pattern = f"preds_{month.replace('-', '_')}" if month else "preds_*"
+        files = sorted(pred_dir.glob(table_path(pattern).name))
+        if not files:
+            return {"error": "No predictions found"}
+        latest_file = files[-1]
+        full = read_table(latest_file)
+        df = full.iloc[offset : offset + limit]
+        name, period, rows = latest_file.name, month, int(len(full))
 
-    latest_file = files[-1]
-    df = pd.read_csv(latest_file)
     return {
-        "file": latest_file.name,
-        "rows": int(len(df)),
-        "preview": df.head(limit).to_dict(orient="records"),
+        "file": name,
+        "period": period,
+        "rows": rows,
+        "offset": offset,
+        "limit": limit,
+        "preview": df.to_dict(orient="records"),
     }
 
 
@@ -219,10 +499,15 @@ def latest_predictions(limit: int = 5):
 🔹 Execution Order / Module Flow
 
 1. Imports (FastAPI, pandas, boto3, your inference function).
-2. Config setup (env vars → bucket/region).
-3. S3 utility (load_from_s3).
-4. Download + load model/artifacts (MODEL_PATH, TRAIN_FE_PATH).
-5. Infer schema (TRAIN_FEATURE_COLUMNS).
-6. Create FastAPI app (app = FastAPI).
-7. Declare endpoints (/, /health, /predict, /run_batch, /latest_predictions).
+2. Config setup (env vars → bucket/region, ARTIFACT_SPECS: S3 key → local path).
+3. Execution backend, optional micro-batcher, batch job manager, Readiness.
+4. Create FastAPI app (app = FastAPI) with the lifespan hook.
+5. Declare endpoints (/, /health, /ready, /metrics, /predict, /run_batch,
+   /jobs, /latest_predictions).
+6. At startup the lifespan starts `sync_artifacts` in the background:
+   `ArtifactFetcher` downloads the model, encoders and feature-schema
+   manifest concurrently into its content-addressed cache (ARTIFACT_SOURCE=s3),
+   then the backend starts and warm-up predictions run. `Readiness` tracks
+   both steps: model endpoints answer 503 until the artifacts are synced
+   (`require_ready`), /ready until the warm-up has completed as well.
 """
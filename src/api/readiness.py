@@ -0,0 +1,200 @@
+"""
+Startup readiness for the API worker.
+
+The app starts serving (/, /health, /ready) immediately while artifacts
+are synced in the background; prediction endpoints report "not ready"
+until the sync has finished. A warm-up pass then pushes synthetic
+payloads through the real prediction path so model loading, encoder
+unpickling and first-call allocations happen before traffic arrives; a
+failed pass is retried with backoff. /ready only turns 200 once the
+worker is warm.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+Payload = List[Dict[str, Any]]
+
+# Feature columns computed from raw inputs rather than sent by clients
+_DERIVED = {"year", "quarter", "month", "zipcode_freq", "city_full_encoded"}
+
+
+def warmup_payloads(
+    n_requests: int,
+    feature_columns: Optional[Sequence[str]],
+    sizes: Sequence[int] = (1,),
+) -> List[Payload]:
+    """
+    Synthetic raw /predict payloads, cycling through `sizes` rows each.
+
+    Rows differ from each other so duplicate filtering keeps them all.
+    """
+    raw = [c for c in feature_columns or () if c not in _DERIVED]
+    payloads = []
+    for i in range(n_requests):
+        rows = sizes[i % len(sizes)]
+        payloads.append(
+            [
+                {
+                    "date": "2022-01-01",
+                    "zipcode": 0,
+                    "city_full": "warm-up",
+                    **{c: float(j) for c in raw},
+                }
+                for j in range(rows)
+            ]
+        )
+    return payloads
+
+
+class Readiness:
+    """Tracks the background artifact sync and warm-up of one worker."""
+
+    def __init__(self) -> None:
+        self.artifacts = "pending"  # pending | fetching | ready | stale | failed
+        self.warmup = (
+            "pending"  # pending | running | retrying | done | skipped | failed
+        )
+        self.warmup_attempts = 0
+        self.error: Optional[str] = None
+        self.fetched: Dict[str, Any] = {}
+        self.sync_seconds: Optional[float] = None
+        self.warmup_ms: List[float] = []
+
+    @property
+    def artifacts_ready(self) -> bool:
+        """Artifacts are in place: requests can be served (maybe slowly)."""
+        return self.artifacts in ("ready", "stale")
+
+    @property
+    def ready(self) -> bool:
+        """Artifacts are in place and the worker is warm."""
+        return self.artifacts_ready and self.warmup in ("done", "skipped")
+
+    def sync(
+        self,
+        fetch: Optional[Callable[[], Dict[str, Any]]],
+        local_paths: Dict[str, Path],
+    ) -> None:
+        """
+        Run the (blocking) artifact fetch and record the outcome.
+
+        Args:
+            fetch: Fetches every artifact and returns per-key results; None
+                serves the local files as they are
+            local_paths: Artifact files the worker needs; if the fetch fails
+                but all of them exist, the worker serves them as "stale"
+        """
+        start = time.perf_counter()
+        self.artifacts = "fetching"
+        try:
+            if fetch is not None:
+                self.fetched = {
+                    k: {"sha256": r.sha256, "downloaded": r.downloaded}
+                    for k, r in fetch().items()
+                }
+            missing = [str(p) for p in local_paths.values() if not Path(p).exists()]
+            if missing:
+                raise FileNotFoundError(f"Missing artifacts: {missing}")
+            self.artifacts = "ready"
+        except Exception as e:
+            self.error = str(e)
+            if all(Path(p).exists() for p in local_paths.values()):
+                self.artifacts = "stale"
+                logger.warning(
+                    "Artifact sync failed; serving local copies", error=str(e)
+                )
+            else:
+                self.artifacts = "failed"
+                logger.error("Artifact sync failed", error=str(e))
+        finally:
+            self.sync_seconds = time.perf_counter() - start
+        logger.info(
+            "Artifact sync finished",
+            status=self.artifacts,
+            seconds=round(self.sync_seconds, 3),
+        )
+
+    async def warm_up(
+        self,
+        predict: Callable[[Payload], Awaitable[Any]],
+        payloads: List[Payload],
+        retries: int = 0,
+        backoff_seconds: float = 0.5,
+    ) -> None:
+        """
+        Run `payloads` through `predict` one by one, recording latencies.
+
+        A failed pass (e.g. a transient backend error right after startup)
+        is retried from the start after `backoff_seconds`, doubling each
+        time; only when all `retries` are used up is the warm-up "failed".
+
+        Args:
+            predict: The /predict model path, without cache and row metrics
+            payloads: Synthetic request bodies (see `warmup_payloads`)
+            retries: Extra passes after a failed one
+            backoff_seconds: Wait before the first retry
+        """
+        if not payloads:
+            self.warmup = "skipped"
+            return
+        self.warmup = "running"
+        for attempt in range(retries + 1):
+            self.warmup_attempts = attempt + 1
+            self.warmup_ms = []
+            try:
+                for payload in payloads:
+                    start = time.perf_counter()
+                    await predict(payload)
+                    self.warmup_ms.append(1000.0 * (time.perf_counter() - start))
+                self.warmup = "done"
+                self.error = None
+                break
+            except Exception as e:
+                self.error = f"Warm-up failed: {e}"
+                if attempt == retries:
+                    self.warmup = "failed"
+                    logger.error("Warm-up failed", error=str(e), attempts=attempt + 1)
+                    break
+                delay = backoff_seconds * 2**attempt
+                self.warmup = "retrying"
+                logger.warning(
+                    "Warm-up failed; retrying", error=str(e), delay_seconds=delay
+                )
+                await asyncio.sleep(delay)
+        logger.info("Warm-up finished", status=self.warmup, **self.warmup_stats())
+
+    def warmup_stats(self) -> Dict[str, Any]:
+        """Count and first/p50/p99/max latency (ms) of warm-up requests."""
+        if not self.warmup_ms:
+            return {"requests": 0}
+        ms = np.asarray(self.warmup_ms)
+        return {
+            "requests": len(ms),
+            "first_ms": float(ms[0]),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()),
+        }
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "artifacts": self.artifacts,
+            "warmup": self.warmup,
+            "warmup_attempts": self.warmup_attempts,
+            "error": self.error,
+            "fetched": self.fetched,
+            "sync_seconds": self.sync_seconds,
+            "warmup_latency": self.warmup_stats(),
+        }
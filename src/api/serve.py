@@ -0,0 +1,181 @@
+"""
+Preload-then-fork server for running several API workers.
+
+``uvicorn --workers N`` starts N fresh interpreters that each import the app
+and load the model, encoders and feature schema on their own, so memory
+grows linearly with the worker count. This supervisor syncs and loads the
+artifacts once, then forks the workers, which inherit the loaded objects
+copy-on-write: pages nobody writes to (booster buffers, encoder tables,
+imported modules) stay shared between all workers. `gc.freeze()` moves the
+preloaded objects out of the collector's reach so GC passes in the workers
+do not touch, and thereby copy, their pages.
+
+    python -m src.api.serve --workers 4               # preload, then fork
+    python -m src.api.serve --workers 4 --no-preload  # each worker loads its own
+
+Every worker still runs the normal lifespan: it re-checks its artifacts (no
+download while they are unchanged), keeps the inherited objects because
+their file fingerprints still match, and warms up. Warm-up runs in the
+workers, never in the supervisor, so no OpenMP thread pool exists at fork
+time. Sharing covers the ``inline`` and ``thread`` execution backends;
+``EXECUTION_BACKEND=process`` pools spawn fresh processes that load their
+own copies.
+
+Each worker reports its own memory under ``memory`` in /health; send SIGUSR1
+to the supervisor to log a report for all workers. Workers that die are
+restarted; SIGTERM/SIGINT stop them all gracefully.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+import traceback
+import warnings
+from typing import Dict
+
+import uvicorn
+
+from src.config.settings import settings
+from src.utils.logging_config import configure_logging, get_logger
+from src.utils.memory import total_memory
+
+logger = get_logger(__name__)
+
+APP = "src.api.main:app"
+RESTART_DELAY_SECONDS = 1.0  # between a worker crash and its replacement
+
+
+def preload() -> None:
+    """Sync and load the API's artifacts in this (the supervisor) process."""
+    from src.api import main
+    from src.inference_pipeline.inference import preload_artifacts
+
+    fetch = main.fetch_artifacts if settings.artifact_source == "s3" else None
+    main.readiness.sync(fetch, main.ARTIFACT_SPECS)
+    if main.readiness.artifacts_ready:
+        preload_artifacts(*main.ARTIFACT_PATHS.values())
+    else:
+        logger.warning("Artifacts not ready; workers will load their own")
+    gc.collect()
+    gc.freeze()
+
+
+class Supervisor:
+    """Fork `workers` uvicorn servers that share one listening socket."""
+
+    def __init__(
+        self, workers: int, host: str, port: int, preload: bool = True
+    ) -> None:
+        """
+        Args:
+            workers: Number of worker processes
+            host: Interface to bind
+            port: Port to bind
+            preload: Load artifacts before forking so workers share them
+        """
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.preload = preload
+        self.children: Dict[int, int] = {}  # pid → worker index
+        self.stopping = False
+        self.sock: socket.socket | None = None
+
+    def run(self) -> None:
+        if self.preload:
+            preload()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(2048)
+        self.sock.set_inheritable(True)
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGUSR1, self._report)
+        for index in range(self.workers):
+            self._fork(index)
+        logger.info(
+            "Workers started",
+            workers=self.workers,
+            preload=self.preload,
+            pids=sorted(self.children),
+            address=f"{self.host}:{self.port}",
+        )
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self.children.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            logger.warning(
+                "Worker exited; restarting",
+                pid=pid,
+                exit_code=os.waitstatus_to_exitcode(status),
+            )
+            time.sleep(RESTART_DELAY_SECONDS)
+            self._fork(index)
+        self.sock.close()
+
+    def _fork(self, index: int) -> None:
+        # The only other threads at this point are jemalloc's background
+        # threads (pyarrow), which its own fork handlers take care of
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            pid = os.fork()
+        if pid:
+            self.children[pid] = index
+            return
+        # Worker: uvicorn installs its own SIGTERM/SIGINT handlers
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+        code = 0
+        try:
+            config = uvicorn.Config(APP, log_level=settings.log_level.lower())
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _report(self, signum, frame) -> None:
+        usage = total_memory([os.getpid(), *self.children])
+        logger.info("Worker memory", **usage)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=settings.api_workers)
+    parser.add_argument("--host", default=settings.api_host)
+    parser.add_argument("--port", type=int, default=settings.api_port)
+    parser.add_argument(
+        "--no-preload",
+        dest="preload",
+        action="store_false",
+        default=settings.api_preload,
+        help="Let every worker load its own artifacts",
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    Supervisor(args.workers, args.host, args.port, preload=args.preload).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Catalog of batch prediction outputs.
+
+The batch runner records every file it writes in ``catalog.json`` next to
+the outputs: period, row count, schema, creation time and a row index —
+byte offsets every `stride` rows for CSV, row groups for Parquet, record
+batches for Feather. Readers use the catalog to find the latest (or a
+given) month and to read only the rows a page needs, so the cost of a
+page does not grow with the file.
+
+Example entry::
+
+    {
+      "file": "year=2024/month=01/preds.parquet",
+      "period": "2024-01",
+      "format": "parquet",
+      "rows": 48211,
+      "columns": ["median_list_price", ..., "predicted_price"],
+      "dtypes": {"median_list_price": "float64", ...},
+      "bytes": 2211840,
+      "created_at": "2024-02-01T03:00:12+00:00",
+      "stride": 1024,
+      "index": [1024, 1024, ..., 83]   # rows per row group
+    }
+
+For CSV files ``index`` holds the byte offset of every `stride`-th row.
+Entries are keyed by ``file``, the path relative to the output directory
+(``year=YYYY/month=MM/preds.<fmt>`` for the batch runner's partitions).
+
+Entries written by the batch runner also carry a ``fingerprint`` of what
+produced the file (a hash of the input rows and of the model and encoder
+files); a later run skips partitions whose fingerprint is unchanged and
+whose file is intact, which also resumes a run that stopped partway.
+After a complete run, entries and files of periods the run did not produce
+(months no longer in the holdout) are pruned (`prune_periods`).
+
+Updates lock ``.catalog.json.lock`` next to the catalog (``flock``), so
+batch jobs running in separate processes never lose each other's entries.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import uuid
+from bisect import bisect_right
+from datetime import datetime, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.artifact_cache import artifact_cache, file_fingerprint
+from src.utils.storage import table_format
+
+CATALOG_NAME = "catalog.json"
+INDEX_STRIDE = 1024  # rows per CSV offset / Parquet row group / Arrow batch
+
+_lock = threading.Lock()  # flock is per open file, so threads also take this
+
+
+@contextlib.contextmanager
+def _locked(output_dir: Path | str) -> Iterator[Path]:
+    """
+    Hold the catalog's thread and file lock; yields the catalog path.
+
+    Read-modify-write of catalog.json must happen inside, reading the file
+    itself rather than the (mtime-keyed) cache.
+    """
+    catalog_path = Path(output_dir) / CATALOG_NAME
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock, open(catalog_path.with_name(f".{CATALOG_NAME}.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield catalog_path
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _save(catalog_path: Path, catalog: Dict[str, Dict[str, Any]]) -> None:
+    tmp = catalog_path.with_name(f".{CATALOG_NAME}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(json.dumps(catalog, indent=2))
+    os.replace(tmp, catalog_path)
+
+
+def write_indexed(
+    df: pd.DataFrame, path: Path | str, stride: int = INDEX_STRIDE
+) -> List[int]:
+    """
+    Write `df` (without its index) so it can be read back `stride` rows
+    at a time.
+
+    The file is written to a temporary name in the same directory and
+    moved into place with `os.replace`, so readers (and the catalog entry
+    `record_output` adds afterwards) never see a partly written file.
+
+    Returns:
+        CSV: byte offset where each block of `stride` rows starts;
+        Parquet/Feather: the row count of each row group / record batch
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        index = _write_blocks(df, tmp, table_format(path), stride)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return index
+
+
+def _write_blocks(df: pd.DataFrame, path: Path, fmt: str, stride: int) -> List[int]:
+    if fmt == "csv":
+        offsets = []
+        with open(path, "w", newline="") as f:
+            df.head(0).to_csv(f, index=False)
+            for start in range(0, len(df), stride):
+                offsets.append(f.tell())
+                df.iloc[start : start + stride].to_csv(f, header=False, index=False)
+        return offsets
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        pq.write_table(table, path, row_group_size=stride)
+        meta = pq.ParquetFile(path).metadata
+        return [meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=stride):
+                writer.write_batch(batch)
+    return [b.num_rows for b in table.to_batches(max_chunksize=stride)]
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """SHA-256 over the column names and row values of `df` (not its index)."""
+    h = hashlib.sha256(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def files_hash(paths: List[Path | str]) -> str:
+    """SHA-256 over the contents of `paths` (missing files hash as absent)."""
+    h = hashlib.sha256()
+    for path in paths:
+        digest = (
+            file_fingerprint(path, hash_contents=True)[2]
+            if Path(path).exists()
+            else "absent"
+        )
+        h.update(f"{Path(path).name}:{digest};".encode())
+    return h.hexdigest()
+
+
+def is_current(
+    output_dir: Path | str,
+    entry: Optional[Dict[str, Any]],
+    fingerprint: Dict[str, str],
+) -> bool:
+    """Whether `entry`'s file exists intact and was built from `fingerprint`."""
+    if entry is None or entry.get("fingerprint") != fingerprint:
+        return False
+    path = Path(output_dir) / entry["file"]
+    return path.exists() and path.stat().st_size == entry["bytes"]
+
+
+def _load(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def load_catalog(output_dir: Path | str) -> Dict[str, Dict[str, Any]]:
+    """Relative path → entry (cached until catalog.json changes); {} if absent."""
+    path = Path(output_dir) / CATALOG_NAME
+    if not path.exists():
+        return {}
+    return artifact_cache.get(path, loader=_load)
+
+
+def record_output(
+    output_dir: Path | str,
+    path: Path | str,
+    period: str,
+    df: pd.DataFrame,
+    index: List[int],
+    stride: int = INDEX_STRIDE,
+    fingerprint: Optional[Dict[str, str]] = None,
+    rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Add (or replace) the entry for one output file and save the catalog.
+
+    Args:
+        output_dir: Directory holding the outputs and catalog.json
+        path: Output file written by `write_indexed`, inside `output_dir`
+        period: ``"YYYY-MM"``
+        df: The frame that was written, or just its columns (``head(0)``)
+            when `rows` is given
+        index: What `write_indexed` returned
+        stride: Rows per index block
+        fingerprint: What the file was built from (see `is_current`)
+        rows: Rows written (default: ``len(df)``)
+    """
+    path = Path(path)
+    name = path.relative_to(output_dir).as_posix()
+    entry = {
+        "file": name,
+        "period": period,
+        "format": table_format(path),
+        "rows": int(len(df)) if rows is None else rows,
+        "columns": [str(c) for c in df.columns],
+        "dtypes": {str(c): str(t) for c, t in df.dtypes.items()},
+        "bytes": path.stat().st_size,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "stride": stride,
+        "index": index,
+    }
+    if fingerprint is not None:
+        entry["fingerprint"] = fingerprint
+    with _locked(output_dir) as catalog_path:
+        catalog = _load(catalog_path) if catalog_path.exists() else {}
+        catalog[name] = entry
+        _save(catalog_path, catalog)
+    return entry
+
+
+def prune_periods(output_dir: Path | str, keep: Iterable[str]) -> List[str]:
+    """
+    Drop the entries (and delete the files) of periods not in `keep`.
+
+    The batch runner calls this after a complete run with the periods it
+    produced, so months that left the holdout stop being served as the
+    latest (or a requested) period.
+
+    Returns:
+        Relative paths of the removed files
+    """
+    keep = set(keep)
+    with _locked(output_dir) as catalog_path:
+        if not catalog_path.exists():
+            return []
+        catalog = _load(catalog_path)
+        stale = [name for name, e in catalog.items() if e["period"] not in keep]
+        if not stale:
+            return []
+        for name in stale:
+            del catalog[name]
+        _save(catalog_path, catalog)
+    for name in stale:
+        _remove_output(Path(output_dir), name)
+    return stale
+
+
+def _remove_output(output_dir: Path, name: str) -> None:
+    """Delete one output file and the partition directories it leaves empty."""
+    path = output_dir / name
+    path.unlink(missing_ok=True)
+    for parent in path.parents:
+        if parent == output_dir or not parent.is_relative_to(output_dir):
+            break
+        try:
+            parent.rmdir()
+        except OSError:  # not empty
+            break
+
+
+def find_entry(
+    catalog: Dict[str, Dict[str, Any]], period: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Entry for `period` (``"YYYY-MM"``), or the latest period if None."""
+    entries = catalog.values()
+    if period is not None:
+        return next((e for e in entries if e["period"] == period), None)
+    return max(entries, key=lambda e: (e["period"], e["created_at"]), default=None)
+
+
+def read_rows(
+    output_dir: Path | str, entry: Dict[str, Any], offset: int, limit: int
+) -> pd.DataFrame:
+    """
+    Rows ``[offset, offset + limit)`` of a cataloged file, reading only the
+    index blocks that contain them.
+    """
+    path = Path(output_dir) / entry["file"]
+    stop = min(offset + limit, entry["rows"])
+    if offset >= stop:
+        return pd.DataFrame(columns=entry["columns"])
+
+    if entry["format"] == "csv":
+        block = offset // entry["stride"]
+        with open(path, newline="") as f:
+            f.seek(entry["index"][block])
+            return pd.read_csv(
+                f,
+                header=None,
+                names=entry["columns"],
+                dtype={
+                    c: t
+                    for c, t in entry["dtypes"].items()
+                    if not t.startswith("datetime")
+                },
+                skiprows=offset - block * entry["stride"],
+                nrows=stop - offset,
+            )
+
+    # Row groups / batches overlapping [offset, stop)
+    starts = [0, *accumulate(entry["index"])]
+    first = bisect_right(starts, offset) - 1
+    last = bisect_right(starts, stop - 1) - 1
+    groups = range(first, last + 1)
+    if entry["format"] == "parquet":
+        table = pq.ParquetFile(path).read_row_groups(list(groups))
+        return table.slice(offset - starts[first], stop - offset).to_pandas()
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        table = pa.Table.from_batches([reader.get_batch(i) for i in groups])
+        return table.slice(offset - starts[first], stop - offset).to_pandas()
@@ -3,51 +3,320 @@ Batch runner for monthly predictions.
 
 - Loads holdout data
 - Splits by year/month
-- Runs inference
-- Saves predictions per month to data/predictions/
+- Runs inference, optionally one month per process-pool worker
+- Writes each month's predictions as soon as it is done, as a partitioned
+  dataset (data/predictions/year=YYYY/month=MM/preds.<fmt>), and records
+  each file in the output catalog (see src/batch/catalog.py)
+- Skips months whose input rows and artifacts are unchanged since their
+  file was written, so an interrupted run resumes where it stopped
+  (``--force`` rebuilds every month)
+- After a complete run, removes the outputs of months no longer in the
+  holdout
 """
 
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
-from src.inference_pipeline.inference import predict
+from src.batch.catalog import (
+    files_hash,
+    frame_hash,
+    is_current,
+    load_catalog,
+    prune_periods,
+    record_output,
+    write_indexed,
+)
+from src.config.settings import settings
+from src.inference_pipeline.inference import predict, preload_artifacts
+from src.utils.exceptions import JobCancelledError
+from src.utils.feature_schema import SCHEMA_FILENAME, read_with_schema
+from src.utils.storage import read_table, table_path
 
 # -------------------
 # Paths
 # -------------------
 DATA_DIR = Path("data/processed")
-HOLDOUT_PATH = DATA_DIR / "cleaning_holdout.csv"
+HOLDOUT_PATH = table_path(DATA_DIR / "cleaning_holdout")
 OUTPUT_DIR = Path("data/predictions")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def run_monthly_predictions():
-    # Load holdout
-    df = pd.read_csv(HOLDOUT_PATH)
+Progress = Callable[[Dict[str, Any]], None]
+
+
+def default_artifact_paths() -> Dict[str, Path]:
+    return {
+        "model_path": settings.model_path,
+        "freq_encoder_path": settings.freq_encoder_path,
+        "target_encoder_path": settings.target_encoder_path,
+    }
+
+
+def partition_path(output_dir: Path | str, period: str) -> Path:
+    """Output file of one month: ``<output_dir>/year=YYYY/month=MM/preds.<fmt>``."""
+    year, month = period.split("-")
+    return table_path(Path(output_dir) / f"year={year}" / f"month={month}" / "preds")
+
+
+def predict_partition(
+    period: str,
+    group: pd.DataFrame,
+    output_dir: Path | str,
+    artifact_paths: Dict[str, Path],
+    keep_frame: bool = False,
+) -> Dict[str, Any]:
+    """
+    Predict one month and write its output file (runs in pool workers too).
+
+    Returns:
+        ``period``, ``path``, ``rows``, ``schema`` (an empty frame with the
+        output columns), ``index`` (see `write_indexed`), ``seconds``, the
+        ``pid`` that did the work and, if `keep_frame`, the ``frame``
+    """
+    start = time.perf_counter()
+    preds_df = predict(group, **artifact_paths)
+    out_path = partition_path(output_dir, period)
+    index = write_indexed(preds_df, out_path)
+    return {
+        "period": period,
+        "path": out_path,
+        "rows": int(len(preds_df)),
+        "schema": preds_df.head(0),
+        "frame": preds_df if keep_frame else None,
+        "index": index,
+        "seconds": time.perf_counter() - start,
+        "pid": os.getpid(),
+    }
+
+
+def _partition_results(
+    partitions: List[Tuple[str, pd.DataFrame]],
+    workers: int,
+    artifact_paths: Dict[str, Path],
+    cancelled: Optional[Callable[[], bool]],
+    keep_frames: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """`predict_partition` results in partition order, serially or pooled."""
+
+    def check(period: str) -> None:
+        if cancelled is not None and cancelled():
+            raise JobCancelledError(f"Cancelled before {period}")
+
+    if workers <= 1 or len(partitions) <= 1:
+        for period, group in partitions:
+            check(period)
+            print(f"📅 Running predictions for {period} ({len(group)} rows)")
+            yield predict_partition(
+                period, group, OUTPUT_DIR, artifact_paths, keep_frames
+            )
+        return
+
+    # spawn: workers start clean and load the artifacts once each
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(partitions)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=preload_artifacts,
+        initargs=tuple(artifact_paths.values()),
+    ) as pool:
+        futures = [
+            pool.submit(
+                predict_partition,
+                period,
+                group,
+                OUTPUT_DIR,
+                artifact_paths,
+                keep_frames,
+            )
+            for period, group in partitions
+        ]
+        try:
+            for (period, group), future in zip(partitions, futures):
+                check(period)
+                print(f"📅 Collecting predictions for {period} ({len(group)} rows)")
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def artifacts_hash(artifact_paths: Dict[str, Path]) -> str:
+    """Content hash of the model, encoders and feature-schema manifest."""
+    model_dir = Path(artifact_paths["model_path"]).parent
+    return files_hash([*artifact_paths.values(), model_dir / SCHEMA_FILENAME])
+
+
+def run_monthly_predictions(
+    progress: Optional[Progress] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    workers: Optional[int] = None,
+    artifact_paths: Optional[Dict[str, Path]] = None,
+    force: bool = False,
+    keep_outputs: bool = False,
+) -> Dict[str, Any] | pd.DataFrame:
+    """
+    Predict the holdout month by month and save one output per month.
+
+    Each month is written as soon as it is predicted and then dropped, so
+    peak memory is bounded by the holdout and one month of output (per pool
+    worker), not by the total output.
+
+    Months can be predicted in parallel on a process pool whose workers load
+    the artifacts once each. Output files and catalog entries are the same
+    as for a serial run and are recorded in month order either way.
+
+    A month is skipped (its saved output is reused) when the catalog shows
+    its file was built from the same input rows and artifact files and the
+    file is intact. Once every month is saved, catalog entries and files of
+    months that are no longer in the holdout are removed.
+
+    Args:
+        progress: Receives ``{"type": "plan", "months": [...]}`` up front and
+            ``{"type": "month", "period", "rows", "seconds", "pid",
+            "skipped"}`` per month
+        cancelled: Polled before each month; stop when it returns True
+        workers: Months predicted at once (default: ``settings.batch_workers``;
+            1 runs serially in this process)
+        artifact_paths: model/encoder paths (default: the configured ones)
+        force: Recompute every month, even unchanged ones
+        keep_outputs: Also collect every month's predictions and return them
+            as one DataFrame (the former behavior; memory grows with the
+            output)
+
+    Returns:
+        Summary with ``rows_predicted``, ``output_dir``, per-month
+        ``partitions`` (``period``, ``file``, ``rows``, ``seconds``, ``pid``,
+        ``skipped``) and the ``pruned`` files of months no longer in the
+        holdout; the concatenated predictions if `keep_outputs`
+
+    Raises:
+        JobCancelledError: If `cancelled` returned True
+    """
+    workers = settings.batch_workers if workers is None else workers
+    artifact_paths = artifact_paths or default_artifact_paths()
+    artifacts = artifacts_hash(artifact_paths)
+
+    # Load holdout: every column (drop_duplicates compares them all), with
+    # the manifest's float dtypes declared
+    model_dir = Path(artifact_paths["model_path"]).parent
+    df = read_with_schema(HOLDOUT_PATH, model_dir / SCHEMA_FILENAME, project=False)
     df["date"] = pd.to_datetime(df["date"])
 
     # Group by year + month
     years = pd.DatetimeIndex(df["date"]).year
     months = pd.DatetimeIndex(df["date"]).month
-    grouped = df.groupby([years, months])
+    partitions = [
+        (f"{year}-{month:02d}", group)
+        for (year, month), group in df.groupby([years, months])
+    ]
+    if progress is not None:
+        progress({"type": "plan", "months": [period for period, _ in partitions]})
+
+    catalog = load_catalog(OUTPUT_DIR)
+    fingerprints, todo = {}, []
+    for period, group in partitions:
+        fingerprints[period] = {"input": frame_hash(group), "artifacts": artifacts}
+        key = partition_path(OUTPUT_DIR, period).relative_to(OUTPUT_DIR).as_posix()
+        if force or not is_current(OUTPUT_DIR, catalog.get(key), fingerprints[period]):
+            todo.append((period, group))
+    del df, partitions[:]  # the groups now live in `todo` only
+    todo_periods = {period for period, _ in todo}
+    results = _partition_results(todo, workers, artifact_paths, cancelled, keep_outputs)
 
+    summary: Dict[str, Any] = {
+        "rows_predicted": 0,
+        "output_dir": str(OUTPUT_DIR),
+        "partitions": [],
+    }
     all_outputs = []
-    for (year, month), group in grouped:
-        print(f"📅 Running predictions for {year}-{month:02d} ({len(group)} rows)")
+    for period in fingerprints:
+        path = partition_path(OUTPUT_DIR, period)
+        if period in todo_periods:
+            result = next(results)
+            record_output(
+                OUTPUT_DIR,
+                path,
+                period,
+                result["schema"],
+                result["index"],
+                fingerprint=fingerprints[period],
+                rows=result["rows"],
+            )
+            print(f"✅ Saved predictions to {path}")
+            rows, seconds, pid = result["rows"], result["seconds"], result["pid"]
+            if keep_outputs:
+                all_outputs.append(result["frame"])
+        else:
+            print(f"⏭️  {period} unchanged; reusing {path}")
+            key = path.relative_to(OUTPUT_DIR).as_posix()
+            rows, seconds, pid = catalog[key]["rows"], 0.0, None
+            if keep_outputs:
+                all_outputs.append(read_table(path))
+        partition = {
+            "period": period,
+            "file": str(path),
+            "rows": rows,
+            "seconds": seconds,
+            "pid": pid,
+            "skipped": period not in todo_periods,
+        }
+        summary["partitions"].append(partition)
+        summary["rows_predicted"] += rows
+        if progress is not None:
+            progress({"type": "month", **partition})
 
-        preds_df = predict(group)
+    summary["pruned"] = prune_periods(OUTPUT_DIR, fingerprints)
+    for name in summary["pruned"]:
+        print(f"🗑️  Removed {name} (month no longer in the holdout)")
 
-        out_path = OUTPUT_DIR / f"preds_{year}_{month:02d}.csv"
-        preds_df.to_csv(out_path, index=False)
-        print(f"✅ Saved predictions to {out_path}")
+    if keep_outputs:
+        return pd.concat(all_outputs, ignore_index=True)
+    return summary
 
-        all_outputs.append(preds_df)
 
-    return pd.concat(all_outputs, ignore_index=True)
+def run_batch_job(
+    progress: Optional[Progress] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> dict:
+    """Run the monthly batch and return a small, picklable summary."""
+    start = time.perf_counter()
+    summary = run_monthly_predictions(progress, cancelled, workers, force=force)
+    return {
+        "rows_predicted": summary["rows_predicted"],
+        "partitions_skipped": sum(p["skipped"] for p in summary["partitions"]),
+        "partitions_pruned": len(summary["pruned"]),
+        "output_dir": summary["output_dir"],
+        "workers": settings.batch_workers if workers is None else workers,
+        "seconds": time.perf_counter() - start,
+        "partitions": summary["partitions"],
+    }
 
 
 if __name__ == "__main__":
-    all_preds = run_monthly_predictions()
-    print("🎉 Batch inference complete.")
-    print(all_preds.head())
+    parser = argparse.ArgumentParser(description="Monthly batch predictions")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Months predicted in parallel (default: BATCH_WORKERS)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute every month, even those whose inputs are unchanged",
+    )
+    args = parser.parse_args()
+
+    summary = run_monthly_predictions(workers=args.workers, force=args.force)
+    print(
+        f"🎉 Batch inference complete: {summary['rows_predicted']} rows in "
+        f"{len(summary['partitions'])} partitions under {summary['output_dir']}"
+    )
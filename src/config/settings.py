@@ -16,6 +16,9 @@ from pathlib import Path
 from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# File suffix of each supported table storage format
+STORAGE_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
 
 class Settings(BaseSettings):
     """Application settings with environment variable support."""
@@ -29,10 +32,20 @@ class Settings(BaseSettings):
     aws_region: str = Field(default="ap-south-1", alias="AWS_REGION")
     s3_bucket: str = Field(default="housing-data-artifacts", alias="S3_BUCKET")
 
+    # Where the API gets its artifacts: s3 (fetched at startup) | local
+    artifact_source: str = Field(default="s3", alias="ARTIFACT_SOURCE")
+    artifact_cache_dir: str = Field(
+        default="models/.cache", alias="ARTIFACT_CACHE_DIR"
+    )  # content-addressed store for fetched artifacts
+    artifact_fetch_workers: int = Field(default=4, alias="ARTIFACT_FETCH_WORKERS")
+
     # API Configuration
     api_host: str = Field(default="0.0.0.0", alias="API_HOST")
     api_port: int = Field(default=8000, alias="API_PORT")
     api_workers: int = Field(default=1, alias="API_WORKERS")
+    api_preload: bool = Field(
+        default=True, alias="API_PRELOAD"
+    )  # src.api.serve: load artifacts once, then fork workers that share them
 
     # Model Configuration
     model_name: str = Field(default="xgb_best_model.pkl", alias="MODEL_NAME")
@@ -42,6 +55,9 @@ class Settings(BaseSettings):
     target_encoder_name: str = Field(
         default="target_encoder.pkl", alias="TARGET_ENCODER_NAME"
     )
+    feature_schema_name: str = Field(
+        default="feature_schema.json", alias="FEATURE_SCHEMA_NAME"
+    )
     train_features_file: str = Field(
         default="feature_engineered_train.csv", alias="TRAIN_FEATURES_FILE"
     )
@@ -52,6 +68,12 @@ class Settings(BaseSettings):
     data_dir: str = Field(default="data")
     predictions_dir: str = Field(default="data/predictions")
 
+    # Pipeline intermediates: csv | parquet | feather
+    storage_format: str = Field(default="csv", alias="STORAGE_FORMAT")
+    pipeline_engine: str = Field(
+        default="pandas", alias="PIPELINE_ENGINE"
+    )  # feature pipeline stages: pandas (eager) | polars (lazy, multi-threaded)
+
     # MLflow Configuration
     mlflow_tracking_uri: str = Field(
         default="http://localhost:5000", alias="MLFLOW_TRACKING_URI"
@@ -69,6 +91,58 @@ class Settings(BaseSettings):
 
     # Monitoring
     enable_metrics: bool = Field(default=True, alias="ENABLE_METRICS")
+    enable_profiling: bool = Field(
+        default=False, alias="ENABLE_PROFILING"
+    )  # honour X-Profile on /predict (turns on process-wide tracemalloc)
+
+    # Inference
+    artifact_hash_contents: bool = Field(
+        default=False, alias="ARTIFACT_HASH_CONTENTS"
+    )  # fingerprint artifacts by SHA-256 in addition to mtime/size
+    fast_path_max_rows: int = Field(
+        default=8, alias="FAST_PATH_MAX_ROWS"
+    )  # payloads up to this many records skip pandas; 0 disables
+    prediction_cache_size: int = Field(
+        default=0, alias="PREDICTION_CACHE_SIZE"
+    )  # cached feature rows → predictions per process (LRU); 0 disables
+    prediction_cache_ttl_seconds: float = Field(
+        default=0.0, alias="PREDICTION_CACHE_TTL_SECONDS"
+    )  # 0 = entries live until evicted or the artifacts change
+
+    warmup_requests: int = Field(
+        default=20, alias="WARMUP_REQUESTS"
+    )  # synthetic predictions per worker before /ready turns 200; 0 skips
+    warmup_retries: int = Field(
+        default=3, alias="WARMUP_RETRIES"
+    )  # extra warm-up passes after a failure before /ready reports "failed"
+    warmup_backoff_seconds: float = Field(
+        default=0.5, alias="WARMUP_BACKOFF_SECONDS"
+    )  # wait before the first retry; doubles for each further one
+
+    # Micro-batching of concurrent /predict calls
+    micro_batching_enabled: bool = Field(default=False, alias="MICRO_BATCHING")
+    micro_batch_window_ms: float = Field(default=2.0, alias="MICRO_BATCH_WINDOW_MS")
+    micro_batch_max_size: int = Field(
+        default=256, alias="MICRO_BATCH_MAX_SIZE"
+    )  # rows; a full batch is scored without waiting for the window
+
+    # Where /predict work runs: inline | thread | process
+    execution_backend: str = Field(default="thread", alias="EXECUTION_BACKEND")
+    executor_max_workers: int = Field(
+        default=0, alias="EXECUTOR_MAX_WORKERS"
+    )  # 0 = one worker per CPU
+
+    # Background /run_batch jobs
+    batch_job_mode: str = Field(
+        default="process", alias="BATCH_JOB_MODE"
+    )  # process: one child process per job; thread: in the API process
+    batch_max_concurrent_jobs: int = Field(
+        default=1, alias="BATCH_MAX_CONCURRENT_JOBS"
+    )  # further jobs wait in the queue
+    jobs_dir: str = Field(default="data/jobs", alias="JOBS_DIR")
+    batch_workers: int = Field(
+        default=1, alias="BATCH_WORKERS"
+    )  # months predicted in parallel; 1 = serially in the job's process
 
     @computed_field
     @property
@@ -88,13 +162,26 @@ class Settings(BaseSettings):
         """Full path to the target encoder."""
         return self.project_root / self.models_dir / self.target_encoder_name
 
+    @computed_field
+    @property
+    def feature_schema_path(self) -> Path:
+        """Full path to the feature-schema manifest."""
+        return self.project_root / self.models_dir / self.feature_schema_name
+
+    @computed_field
+    @property
+    def artifact_cache_path(self) -> Path:
+        """Local content-addressed artifact cache."""
+        return self.project_root / self.artifact_cache_dir
+
     @computed_field
     @property
     def train_features_path(self) -> Path:
-        """Full path to the training features file."""
-        return (
-            self.project_root / self.data_dir / "processed" / self.train_features_file
+        """Full path to the training features file (in the storage format)."""
+        name = Path(self.train_features_file).with_suffix(
+            STORAGE_SUFFIXES.get(self.storage_format, ".csv")
         )
+        return self.project_root / self.data_dir / "processed" / name
 
     @computed_field
     @property
@@ -102,9 +189,11 @@ class Settings(BaseSettings):
         """Directory for predictions."""
         return self.project_root / self.predictions_dir
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    @computed_field
+    @property
+    def jobs_path(self) -> Path:
+        """Directory for batch job records."""
+        return self.project_root / self.jobs_dir
 
 
 # Global settings instance
@@ -0,0 +1,34 @@
+"""
+Which implementation runs the feature pipeline stages.
+
+- ``pandas``: the eager implementation in load/preprocess/feature_engineering
+- ``polars``: lazy query plans (see polars_pipeline.py); the same outputs,
+  with projection/predicate pushdown and multi-threaded execution
+
+Selected per run with the `engine` argument of each stage, or globally
+with PIPELINE_ENGINE.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from src.config.settings import settings
+from src.utils.exceptions import ConfigurationError
+
+ENGINES = ("pandas", "polars")
+
+
+def resolve_engine(engine: Optional[str] = None) -> str:
+    """
+    The engine to run with: `engine`, or the configured one if None.
+
+    Raises:
+        ConfigurationError: If the engine is unknown
+    """
+    engine = engine or settings.pipeline_engine
+    if engine not in ENGINES:
+        raise ConfigurationError(
+            f"Unknown pipeline engine {engine!r}; expected one of {ENGINES}"
+        )
+    return engine
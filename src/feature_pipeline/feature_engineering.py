@@ -1,18 +1,23 @@
 """
 Feature engineering: date parts, frequency encoding, target encoding, drop leakage.
 
-- Reads cleaned train/eval CSVs
+- Reads cleaned train/eval tables (CSV/Parquet/Feather, see utils.storage)
 - Applies feature engineering
-- Saves feature-engineered CSVs
-- ALSO saves fitted encoders for inference
+- Saves feature-engineered tables
+- ALSO saves fitted encoders + the feature-schema manifest for inference
 """
 
 from pathlib import Path
+from typing import Optional
 
 import pandas as pd
 from category_encoders import TargetEncoder
 from joblib import dump  # joblib.dump saves encoders/mappings to disk
 
+from src.feature_pipeline.engine import resolve_engine
+from src.utils.feature_schema import SCHEMA_FILENAME, record_features
+from src.utils.storage import read_table, table_path, write_table
+
 PROCESSED_DIR = Path("data/processed")
 MODELS_DIR = Path("models")
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
@@ -56,13 +61,16 @@ def target_encode(train: pd.DataFrame, eval: pd.DataFrame, col: str, target: str
     return train, eval, te
 
 
+# Leakage / raw categoricals, removed before training
+DROP_COLUMNS = ["date", "city_full", "city", "zipcode", "median_sale_price"]
+
+
 def drop_unused_columns(train: pd.DataFrame, eval: pd.DataFrame):
-    drop_cols = ["date", "city_full", "city", "zipcode", "median_sale_price"]
     train = train.drop(
-        columns=[c for c in drop_cols if c in train.columns], errors="ignore"
+        columns=[c for c in DROP_COLUMNS if c in train.columns], errors="ignore"
     )
     eval = eval.drop(
-        columns=[c for c in drop_cols if c in eval.columns], errors="ignore"
+        columns=[c for c in DROP_COLUMNS if c in eval.columns], errors="ignore"
     )
     return train, eval
 
@@ -70,33 +78,10 @@ def drop_unused_columns(train: pd.DataFrame, eval: pd.DataFrame):
 # ---------- pipeline ----------
 
 
-# Handles full pipeline:
-# reads cleaned CSVs → applies feature engineering → saves engineered data + encoders.
-def run_feature_engineering(
-    in_train_path: Path | str | None = None,
-    in_eval_path: Path | str | None = None,
-    in_holdout_path: Path | str | None = None,
-    output_dir: Path | str = PROCESSED_DIR,
+def _engineer_features(
+    train_df: pd.DataFrame, eval_df: pd.DataFrame, holdout_df: pd.DataFrame
 ):
-    """
-    Run feature engineering and write outputs + encoders to disk.
-    Applies the same transformations to train, eval, and holdout.
-    """
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Defaults for inputs
-    if in_train_path is None:
-        in_train_path = PROCESSED_DIR / "cleaning_train.csv"
-    if in_eval_path is None:
-        in_eval_path = PROCESSED_DIR / "cleaning_eval.csv"
-    if in_holdout_path is None:
-        in_holdout_path = PROCESSED_DIR / "cleaning_holdout.csv"
-
-    train_df = pd.read_csv(in_train_path)
-    eval_df = pd.read_csv(in_eval_path)
-    holdout_df = pd.read_csv(in_holdout_path)
-
+    """The pandas engine: (train, eval, holdout, freq_map, target_encoder)."""
     print("Train date range:", train_df["date"].min(), "to", train_df["date"].max())
     print("Eval date range:", eval_df["date"].min(), "to", eval_df["date"].max())
     print(
@@ -113,7 +98,6 @@ def run_feature_engineering(
     if "zipcode" in train_df.columns:
         train_df, eval_df, freq_map = frequency_encode(train_df, eval_df, "zipcode")
         holdout_df["zipcode_freq"] = holdout_df["zipcode"].map(freq_map).fillna(0)
-        dump(freq_map, MODELS_DIR / "freq_encoder.pkl")  # save mapping
 
     # Target encode city_full (fit on train only)
     target_encoder = None
@@ -124,25 +108,82 @@ def run_feature_engineering(
         holdout_df["city_full_encoded"] = target_encoder.transform(
             holdout_df["city_full"]
         )
-        dump(target_encoder, MODELS_DIR / "target_encoder.pkl")  # save encoder
 
     # Drop leakage / raw categoricals
     train_df, eval_df = drop_unused_columns(train_df, eval_df)
     holdout_df, _ = drop_unused_columns(holdout_df.copy(), holdout_df.copy())
+    return train_df, eval_df, holdout_df, freq_map, target_encoder
+
+
+# Handles full pipeline:
+# reads cleaned CSVs → applies feature engineering → saves engineered data + encoders.
+def run_feature_engineering(
+    in_train_path: Path | str | None = None,
+    in_eval_path: Path | str | None = None,
+    in_holdout_path: Path | str | None = None,
+    output_dir: Path | str = PROCESSED_DIR,
+    engine: Optional[str] = None,
+    models_dir: Path | str | None = None,
+):
+    """
+    Run feature engineering and write outputs + encoders to disk.
+    Applies the same transformations to train, eval, and holdout.
+    `engine` picks the implementation (pandas | polars, see engine.py).
+    Encoders and the feature-schema manifest go to `models_dir` (default
+    MODELS_DIR), where training reads the manifest next to its model.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    models_dir = Path(models_dir) if models_dir is not None else MODELS_DIR
+    models_dir.mkdir(parents=True, exist_ok=True)
+
+    # Defaults for inputs
+    if in_train_path is None:
+        in_train_path = table_path(PROCESSED_DIR / "cleaning_train")
+    if in_eval_path is None:
+        in_eval_path = table_path(PROCESSED_DIR / "cleaning_eval")
+    if in_holdout_path is None:
+        in_holdout_path = table_path(PROCESSED_DIR / "cleaning_holdout")
+
+    if resolve_engine(engine) == "polars":
+        from src.feature_pipeline import polars_pipeline
+
+        train_df, eval_df, holdout_df, freq_map, target_encoder = (
+            polars_pipeline.engineer_features(
+                in_train_path, in_eval_path, in_holdout_path
+            )
+        )
+    else:
+        train_df, eval_df, holdout_df, freq_map, target_encoder = _engineer_features(
+            read_table(in_train_path),
+            read_table(in_eval_path),
+            read_table(in_holdout_path),
+        )
+
+    encoders = {}  # name → (path, fitted object) for the schema manifest
+    if freq_map is not None:
+        dump(freq_map, models_dir / "freq_encoder.pkl")  # save mapping
+        encoders["freq_encoder"] = (models_dir / "freq_encoder.pkl", freq_map)
+    if target_encoder is not None:
+        dump(target_encoder, models_dir / "target_encoder.pkl")  # save encoder
+        encoders["target_encoder"] = (
+            models_dir / "target_encoder.pkl",
+            target_encoder,
+        )
 
     # Save engineered data
-    out_train_path = output_dir / "feature_engineered_train.csv"
-    out_eval_path = output_dir / "feature_engineered_eval.csv"
-    out_holdout_path = output_dir / "feature_engineered_holdout.csv"
-    train_df.to_csv(out_train_path, index=False)
-    eval_df.to_csv(out_eval_path, index=False)
-    holdout_df.to_csv(out_holdout_path, index=False)
+    write_table(train_df, table_path(output_dir / "feature_engineered_train"))
+    write_table(eval_df, table_path(output_dir / "feature_engineered_eval"))
+    write_table(holdout_df, table_path(output_dir / "feature_engineered_holdout"))
+
+    # Serving reads the feature schema from here, not from the training table
+    record_features(models_dir / SCHEMA_FILENAME, train_df, encoders)
 
     print("✅ Feature engineering complete.")
     print("   Train shape:", train_df.shape)
     print("   Eval  shape:", eval_df.shape)
     print("   Holdout shape:", holdout_df.shape)
-    print("   Encoders saved to models/")
+    print(f"   Encoders + feature schema saved to {models_dir}/")
 
     return train_df, eval_df, holdout_df, freq_map, target_encoder
 
@@ -3,41 +3,77 @@ Load & time-split the raw dataset.
 
 - Production default writes to data/raw/
 - Tests can pass a temp `output_dir` so nothing in data/ is touched.
+- ``chunksize`` streams the raw CSV instead of loading it whole (see
+  `split_data_stream`); the split files are the same.
 """
 
+import argparse
+import pickle
+import tempfile
+import time
 from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set
 
+import numpy as np
 import pandas as pd
 
+from src.feature_pipeline.engine import resolve_engine
+from src.utils.exceptions import ConfigurationError
+from src.utils.storage import (
+    TableWriter,
+    read_table,
+    table_format,
+    table_path,
+    write_table,
+)
+
 DATA_DIR = Path("data/raw")
 
+# Cutoffs
+CUTOFF_DATE_EVAL = pd.Timestamp("2020-01-01")  # eval starts
+CUTOFF_DATE_HOLDOUT = pd.Timestamp("2022-01-01")  # holdout starts
+
 
 def load_and_split_data(
     raw_path: str = "data/raw/untouched_raw_original.csv",
     output_dir: Path | str = DATA_DIR,
+    engine: Optional[str] = None,
+    chunksize: Optional[int] = None,
 ):
-    """split into train/eval/holdout"""
-    df = pd.read_csv(raw_path)
+    """
+    split into train/eval/holdout (engine: pandas | polars, see engine.py)
+
+    With `chunksize` the raw CSV is streamed in chunks of that many rows
+    and the summary of `split_data_stream` is returned instead of the
+    three frames.
+    """
+    if chunksize:
+        return split_data_stream(raw_path, output_dir, chunksize)
+
+    if resolve_engine(engine) == "polars":
+        from src.feature_pipeline import polars_pipeline
 
-    # Ensure datetime + sort
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date")
+        train_df, eval_df, holdout_df = polars_pipeline.split(raw_path)
+    else:
+        df = read_table(raw_path)
 
-    # Cutoffs
-    cutoff_date_eval = pd.Timestamp("2020-01-01")  # eval starts
-    cutoff_date_holdout = pd.Timestamp("2022-01-01")  # holdout starts
+        # Ensure datetime + sort (stable: rows of one date keep file order)
+        df["date"] = pd.to_datetime(df["date"])
+        df = df.sort_values("date", kind="stable")
 
-    # Splits
-    train_df = df[df["date"] < cutoff_date_eval]
-    eval_df = df[(df["date"] >= cutoff_date_eval) & (df["date"] < cutoff_date_holdout)]
-    holdout_df = df[df["date"] >= cutoff_date_holdout]
+        # Splits
+        train_df = df[df["date"] < CUTOFF_DATE_EVAL]
+        eval_df = df[
+            (df["date"] >= CUTOFF_DATE_EVAL) & (df["date"] < CUTOFF_DATE_HOLDOUT)
+        ]
+        holdout_df = df[df["date"] >= CUTOFF_DATE_HOLDOUT]
 
     # Save
     outdir = Path(output_dir)
     outdir.mkdir(parents=True, exist_ok=True)
-    train_df.to_csv(outdir / "train.csv", index=False)
-    eval_df.to_csv(outdir / "eval.csv", index=False)
-    holdout_df.to_csv(outdir / "holdout.csv", index=False)
+    write_table(train_df, table_path(outdir / "train"))
+    write_table(eval_df, table_path(outdir / "eval"))
+    write_table(holdout_df, table_path(outdir / "holdout"))
 
     print(f"✅ Data split completed (saved to {outdir}).")
     print(
@@ -49,5 +85,142 @@ def load_and_split_data(
     return train_df, eval_df, holdout_df
 
 
+# ---------- streaming split ----------
+
+SPLITS = ("train", "eval", "holdout")
+
+
+def _merged_dtype(dtypes: Set[np.dtype]) -> np.dtype:
+    """The dtype reading the whole column at once would have inferred."""
+    if len(dtypes) == 1:
+        return next(iter(dtypes))
+    if all(t.kind in "iuf" for t in dtypes):
+        return np.dtype("float64")  # ints in some chunks, floats/NaN in others
+    return np.dtype(object)
+
+
+def _read_spool(path: Path) -> Iterator[pd.DataFrame]:
+    """Frames appended to a spool file, in the order they were written."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def split_data_stream(
+    raw_path: Path | str = "data/raw/untouched_raw_original.csv",
+    output_dir: Path | str = DATA_DIR,
+    chunksize: int = 100_000,
+) -> Dict[str, Any]:
+    """
+    Time-split a raw CSV in one streaming pass with bounded memory.
+
+    Each chunk's rows are routed by the cutoffs to their split and spooled
+    by month to a temporary directory inside `output_dir`. Every split is
+    then written month by month, so memory is bounded by a chunk or the
+    largest month, not by the file. A month is sorted by date (stably,
+    like `load_and_split_data`) only if the input was not already in date
+    order. Column dtypes inferred per chunk are reconciled as one read of
+    the whole file would, so the split files are the same as
+    `load_and_split_data` writes.
+
+    Args:
+        raw_path: Raw input CSV
+        output_dir: Where train/eval/holdout are written
+        chunksize: Rows per chunk
+
+    Returns:
+        Summary with ``rows_in``, ``chunks``, ``rows`` per split,
+        ``sorted`` (whether months had to be sorted) and ``seconds``
+
+    Raises:
+        ConfigurationError: If `raw_path` is not a CSV
+    """
+    if table_format(raw_path) != "csv":
+        raise ConfigurationError(f"Streaming split reads CSV input, got {raw_path}")
+    start = time.perf_counter()
+    outdir = Path(output_dir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    columns = list(pd.read_csv(raw_path, nrows=0).columns)
+    chunk_dtypes: Dict[str, Set[np.dtype]] = {c: set() for c in columns}
+    in_order, last, has_times = True, None, False
+    summary: Dict[str, Any] = {"rows_in": 0, "chunks": 0}
+
+    with tempfile.TemporaryDirectory(dir=outdir, prefix=".split-") as spool_dir:
+        spool: Dict[str, Dict[str, Path]] = {s: {} for s in SPLITS}
+
+        # One pass over the raw file: route every row to (split, month)
+        for chunk in pd.read_csv(raw_path, chunksize=chunksize):
+            summary["chunks"] += 1
+            summary["rows_in"] += len(chunk)
+            for c, t in chunk.dtypes.items():
+                chunk_dtypes[c].add(t)
+
+            chunk["date"] = pd.to_datetime(chunk["date"])
+            chunk = chunk[chunk["date"].notna()]  # NaT is in no split
+            dates = chunk["date"]
+            if len(chunk):
+                if in_order:
+                    in_order = dates.is_monotonic_increasing and (
+                        last is None or dates.iloc[0] >= last
+                    )
+                    last = dates.iloc[-1]
+                has_times = has_times or bool((dates != dates.dt.normalize()).any())
+
+            split = np.where(
+                dates < CUTOFF_DATE_EVAL,
+                "train",
+                np.where(dates < CUTOFF_DATE_HOLDOUT, "eval", "holdout"),
+            )
+            month = dates.dt.strftime("%Y-%m").to_numpy()
+            for (s, m), part in chunk.groupby([split, month], sort=False):
+                path = spool[s].setdefault(m, Path(spool_dir) / f"{s}_{m}.pkl")
+                with open(path, "ab") as f:
+                    pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        dtypes = {c: _merged_dtype(t) for c, t in chunk_dtypes.items() if t}
+        dtypes["date"] = np.dtype("datetime64[ns]")
+        empty = pd.DataFrame(
+            {c: pd.Series(dtype=dtypes.get(c, object)) for c in columns}
+        )
+        # Written whole, a datetime column is dates-only or full throughout
+        date_format = "%Y-%m-%d %H:%M:%S" if has_times else None
+
+        # Write each split month by month
+        summary["rows"] = {}
+        for s in SPLITS:
+            with TableWriter(table_path(outdir / s), date_format=date_format) as out:
+                for m in sorted(spool[s]):
+                    part = pd.concat(_read_spool(spool[s][m])).astype(dtypes)
+                    if not in_order:
+                        part = part.sort_values("date", kind="stable")
+                    out.write(part)
+                if not out.rows:
+                    out.write(empty)
+            summary["rows"][s] = out.rows
+
+    summary["sorted"] = not in_order
+    summary["seconds"] = time.perf_counter() - start
+    print(f"✅ Data split completed (saved to {outdir}).")
+    print(
+        f"   Train: {summary['rows']['train']} rows, "
+        f"Eval: {summary['rows']['eval']} rows, "
+        f"Holdout: {summary['rows']['holdout']} rows "
+        f"({summary['chunks']} chunks)"
+    )
+    return summary
+
+
 if __name__ == "__main__":
-    load_and_split_data()
+    parser = argparse.ArgumentParser(description="Time-split the raw dataset")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the raw CSV in chunks of this many rows (bounded memory)",
+    )
+    args = parser.parse_args()
+    load_and_split_data(chunksize=args.chunksize)
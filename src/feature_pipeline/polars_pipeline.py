@@ -0,0 +1,298 @@
+"""
+Polars engine for the feature pipeline (PIPELINE_ENGINE=polars).
+
+Each stage is built as a LazyFrame query over `scan_table` and collected
+once at the end, so Polars can prune unused columns at the scan
+(projection pushdown), filter early (predicate pushdown), share common
+subplans between the train/eval/holdout outputs (`pl.collect_all`) and run
+on all cores. Outputs match the pandas engine: stages return pandas frames
+and the fitted encoders are the same objects, so files, encoders and the
+feature-schema manifest are written by the shared code in load.py,
+preprocess.py and feature_engineering.py.
+
+Encoders that need a fit (frequency, target) cost one extra pass: the fit
+is collected first (only the columns it needs), then applied as a lookup
+expression.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+import polars as pl
+from category_encoders import TargetEncoder
+
+from src.feature_pipeline.feature_engineering import DROP_COLUMNS
+from src.feature_pipeline.load import CUTOFF_DATE_EVAL, CUTOFF_DATE_HOLDOUT
+from src.feature_pipeline.preprocess import (
+    _DASHES,
+    _SPACES,
+    NORMALIZED_CITY_MAPPING,
+    load_metros_index,
+    log_enrichment,
+)
+from src.utils.storage import table_format
+
+# Rows sampled to infer CSV column types (pandas reads the whole file)
+CSV_INFER_ROWS = 100_000
+
+
+def scan_table(path: Path | str) -> pl.LazyFrame:
+    """Lazy scan of a table file, dispatching on its suffix like `read_table`."""
+    fmt = table_format(path)
+    if fmt == "csv":
+        return pl.scan_csv(path, infer_schema_length=CSV_INFER_ROWS)
+    if fmt == "parquet":
+        return pl.scan_parquet(path)
+    return pl.scan_ipc(path)
+
+
+def _columns(lf: pl.LazyFrame) -> List[str]:
+    return lf.collect_schema().names()
+
+
+def _to_pandas(df: pl.DataFrame) -> pd.DataFrame:
+    """`df` as pandas, with missing strings as NaN (not None) like read_csv."""
+    out = df.to_pandas()
+    for c in out.columns[out.dtypes == object]:
+        out[c] = out[c].mask(out[c].isna(), np.nan)
+    return out
+
+
+def _to_datetime(lf: pl.LazyFrame, col: str = "date") -> pl.Expr:
+    """`col` as Datetime[ns] (what pd.to_datetime gives), parsed if text."""
+    if lf.collect_schema()[col] == pl.String:
+        return pl.col(col).str.to_datetime(time_unit="ns")
+    return pl.col(col).cast(pl.Datetime("ns"))
+
+
+# ---------- load ----------
+
+
+def split(raw_path: Path | str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Train/eval/holdout by the load.py cutoffs; one scan and one sort."""
+    lf = scan_table(raw_path)
+    lf = lf.with_columns(_to_datetime(lf)).sort("date", maintain_order=True)
+    date = pl.col("date")
+    eval_start = CUTOFF_DATE_EVAL.to_pydatetime()
+    holdout_start = CUTOFF_DATE_HOLDOUT.to_pydatetime()
+    frames = pl.collect_all(
+        [
+            lf.filter(date < eval_start),
+            lf.filter((date >= eval_start) & (date < holdout_start)),
+            lf.filter(date >= holdout_start),
+        ]
+    )
+    train, eval_, holdout = (_to_pandas(f) for f in frames)
+    return train, eval_, holdout
+
+
+# ---------- preprocess ----------
+
+
+def normalize_city_expr(expr: pl.Expr, apply_mapping: bool = True) -> pl.Expr:
+    """`normalize_city_series` as an expression; nulls stay null."""
+    out = (
+        expr.cast(pl.String)
+        .str.strip_chars()
+        .str.to_lowercase()
+        .str.replace_all(_DASHES.pattern, "-")
+        .str.replace_all(_SPACES.pattern, " ")
+    )
+    if apply_mapping:
+        out = out.replace(NORMALIZED_CITY_MAPPING)
+    return out
+
+
+def clean_and_merge(
+    lf: pl.LazyFrame, metros_path: str | None = "data/raw/usmetros.csv"
+) -> pl.LazyFrame:
+    """Lazy `preprocess.clean_and_merge`; skips the same way it does."""
+    columns = _columns(lf)
+    if "city_full" not in columns:
+        print("⚠️ Skipping city merge: no 'city_full' column present.")
+        return lf
+
+    lf = lf.with_columns(normalize_city_expr(pl.col("city_full")))
+
+    if {"lat", "lng"}.issubset(columns):
+        print("⚠️ Skipping lat/lng merge: already present in DataFrame.")
+        return lf
+
+    if not metros_path or not Path(metros_path).exists():
+        print("⚠️ Skipping lat/lng merge: metros file not provided or not found.")
+        return lf
+
+    index = load_metros_index(metros_path)
+    if index is None:
+        print("⚠️ Skipping lat/lng merge: metros file missing required columns.")
+        return lf
+    names = pl.Series(list(index.names), dtype=pl.String)
+    city = pl.col("city_full")
+    return lf.with_columns(
+        lat=city.replace_strict(names, pl.Series(index.lat), default=None),
+        lng=city.replace_strict(names, pl.Series(index.lng), default=None),
+    )
+
+
+def drop_duplicates(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy `preprocess.drop_duplicates`: drop every copy, ignoring date/year."""
+    subset = [c for c in _columns(lf) if c not in ("date", "year")]
+    return lf.unique(subset=subset, keep="none", maintain_order=True)
+
+
+def remove_outliers(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy `preprocess.remove_outliers` (median_list_price > 19M)."""
+    if "median_list_price" not in _columns(lf):
+        return lf
+    return lf.filter(pl.col("median_list_price") <= 19_000_000)
+
+
+def preprocess(
+    path: Path | str, metros_path: str | None = "data/raw/usmetros.csv"
+) -> pd.DataFrame:
+    """
+    Clean one split: city normalization, lat/lng, duplicates, outliers.
+
+    The lat/lng match rate is logged for the rows that are kept.
+    """
+    lf = scan_table(path)
+    had_lat = "lat" in _columns(lf)
+    lf = remove_outliers(drop_duplicates(clean_and_merge(lf, metros_path)))
+    df = _to_pandas(lf.collect())
+    if not had_lat and "lat" in df.columns:
+        log_enrichment(df["city_full"], df["lat"].to_numpy(dtype=np.float64))
+    return df
+
+
+# ---------- feature engineering ----------
+
+
+def add_date_features(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy `feature_engineering.add_date_features` (same column order/dtypes)."""
+    date = pl.col("date")
+    rest = [c for c in _columns(lf) if c not in ("year", "quarter", "month")]
+    return (
+        lf.with_columns(_to_datetime(lf))
+        .with_columns(
+            year=date.dt.year().cast(pl.Int32),
+            quarter=date.dt.quarter().cast(pl.Int32),
+            month=date.dt.month().cast(pl.Int32),
+        )
+        .select(rest[:1] + ["year", "quarter", "month"] + rest[1:])
+    )
+
+
+def frequency_map(counts: pl.DataFrame, col: str) -> pd.Series:
+    """`value_counts()`-shaped Series from a `group_by(col).len()` result."""
+    counts = counts.drop_nulls(col).sort("len", descending=True, maintain_order=True)
+    return pd.Series(
+        counts["len"].cast(pl.Int64).to_numpy(),
+        index=pd.Index(counts[col].to_numpy(), name=col),
+        name="count",
+    )
+
+
+def frequency_expr(freq_map: pd.Series, col: str) -> pl.Expr:
+    """`<col>_freq` looked up in `freq_map` (Int64; null where unseen)."""
+    keys = pl.Series(freq_map.index.to_numpy())
+    values = pl.Series(freq_map.to_numpy(), dtype=pl.Int64)
+    return pl.col(col).replace_strict(keys, values, default=None).alias(f"{col}_freq")
+
+
+def fill_unseen(df: pl.DataFrame, col: str, fill: float = 0.0) -> pl.DataFrame:
+    """
+    `map(freq_map).fillna(fill)` on a collected frame.
+
+    Like pandas, the column only becomes float if some value was unseen;
+    otherwise it stays integer.
+    """
+    if df[col].null_count() == 0:
+        return df
+    return df.with_columns(pl.col(col).cast(pl.Float64).fill_null(fill))
+
+
+def target_expr(te: TargetEncoder, col: str, uniques: Iterable) -> pl.Expr:
+    """
+    `te.transform` of `col` as a lookup expression.
+
+    The encoder is applied once per distinct value in `uniques` (those of
+    the frame being encoded), then broadcast; nulls get its missing value.
+    """
+    keys = [u for u in uniques if pd.notna(u)]
+    missing = te.transform(pd.Series([np.nan], name=col, dtype=object))[col].iloc[0]
+    values = (
+        te.transform(pd.Series(keys, name=col, dtype=object))[col].to_numpy()
+        if keys
+        else np.array([], dtype=np.float64)
+    )
+    encoded_col = f"{col}_encoded" if col != "city_full" else "city_full_encoded"
+    return (
+        pl.col(col)
+        .replace_strict(
+            pl.Series(keys, dtype=pl.String),
+            pl.Series(values, dtype=pl.Float64),
+            default=None,
+        )
+        .fill_null(float(missing))
+        .alias(encoded_col)
+    )
+
+
+def engineer_features(
+    train_path: Path | str, eval_path: Path | str, holdout_path: Path | str
+):
+    """
+    The polars engine for `run_feature_engineering`.
+
+    Returns:
+        (train, eval, holdout, freq_map, target_encoder) like the pandas
+        engine; the encoders are None when their column is absent
+    """
+    paths = (train_path, eval_path, holdout_path)
+    frames = [add_date_features(scan_table(p)) for p in paths]
+    columns = _columns(frames[0])
+
+    # Pass 1: what the encoders are fit on, plus the values they must map
+    fits = {}
+    if "zipcode" in columns:
+        fits["zipcode"] = frames[0].group_by("zipcode").len()
+    if "city_full" in columns:
+        fits["city_fit"] = frames[0].select("city_full", "price")
+        fits["city_eval"] = frames[1].select(pl.col("city_full").unique())
+        fits["city_holdout"] = frames[2].select(pl.col("city_full").unique())
+    fitted = dict(zip(fits, pl.collect_all(list(fits.values()))))
+
+    # Frequency encode zipcode (fit on train only)
+    freq_map = None
+    if "zipcode" in columns:
+        freq_map = frequency_map(fitted["zipcode"], "zipcode")
+        frames = [lf.with_columns(frequency_expr(freq_map, "zipcode")) for lf in frames]
+
+    # Target encode city_full (fit on train only)
+    target_encoder = None
+    if "city_full" in columns:
+        fit = _to_pandas(fitted["city_fit"])
+        target_encoder = TargetEncoder(cols=["city_full"])
+        target_encoder.fit(fit["city_full"], fit["price"])
+        uniques = (
+            fit["city_full"].unique(),
+            fitted["city_eval"]["city_full"].to_list(),
+            fitted["city_holdout"]["city_full"].to_list(),
+        )
+        frames = [
+            lf.with_columns(target_expr(target_encoder, "city_full", u))
+            for lf, u in zip(frames, uniques)
+        ]
+
+    # Drop leakage / raw categoricals; pass 2 builds all three outputs
+    frames = [lf.drop(DROP_COLUMNS, strict=False) for lf in frames]
+    train, eval_, holdout = pl.collect_all(frames)
+    if freq_map is not None:  # eval/holdout fill unseen zipcodes with 0
+        eval_ = fill_unseen(eval_, "zipcode_freq")
+        holdout = fill_unseen(holdout, "zipcode_freq")
+    train, eval_, holdout = (_to_pandas(f) for f in (train, eval_, holdout))
+    return train, eval_, holdout, freq_map, target_encoder
@@ -1,5 +1,5 @@
 """
-Preprocessing: city normalization + (optional) lat/lng merge, duplicate drop,
+Preprocessing: city normalization + (optional) lat/lng lookup, duplicate drop,
 outlier removal.
 
 - Production defaults read from data/raw/ and write to data/processed/
@@ -8,10 +8,21 @@ outlier removal.
 """
 
 import re
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from src.feature_pipeline.engine import resolve_engine
+from src.utils.artifact_cache import artifact_cache
+from src.utils.logging_config import get_logger
+from src.utils.storage import read_table, table_path, write_table
+
+logger = get_logger(__name__)
+
 RAW_DIR = Path("data/raw")
 PROCESSED_DIR = Path("data/processed")
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
@@ -29,21 +40,159 @@ CITY_MAPPING = {
 }
 
 
+_DASHES = re.compile(r"[–—-]")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_str(s: str) -> str:
+    s = s.strip().lower()
+    s = _DASHES.sub("-", s)  # unify dashes
+    s = _SPACES.sub(" ", s)  # collapse spaces
+    return s
+
+
 def normalize_city(s: str) -> str:
     """Lowercase, strip, unify dashes. Safe for NA."""
     if pd.isna(s):
         return s
-    s = str(s).strip().lower()
-    s = re.sub(r"[–—-]", "-", s)  # unify dashes
-    s = re.sub(r"\s+", " ", s)  # collapse spaces
-    return s
+    return _normalize_str(str(s))
+
+
+# CITY_MAPPING in normalized form, built once at import
+NORMALIZED_CITY_MAPPING = {
+    normalize_city(k): normalize_city(v) for k, v in CITY_MAPPING.items()
+}
+
+
+def canonical_city(s: str) -> str:
+    """normalize_city + the manual CITY_MAPPING fixes, for a single value."""
+    s = normalize_city(s)
+    return NORMALIZED_CITY_MAPPING.get(s, s) if isinstance(s, str) else s
+
+
+def normalize_city_series(s: pd.Series, apply_mapping: bool = True) -> pd.Series:
+    """
+    Vectorized normalize_city (+ CITY_MAPPING) for a whole column.
+
+    Normalizes each distinct value once and broadcasts the result back via
+    factorize codes, so cost scales with the number of metros rather than
+    the number of rows. NA values are passed through unchanged.
+    """
+    codes, uniques = pd.factorize(s)
+    if len(uniques) == 0:
+        return s.copy()
+    fn = canonical_city if apply_mapping else normalize_city
+    values = np.array([fn(u) for u in uniques], dtype=object).take(codes)
+    missing = codes < 0
+    if missing.any():
+        values[missing] = s.to_numpy(dtype=object)[missing]
+    return pd.Series(values, index=s.index, name=s.name)
+
+
+@dataclass(frozen=True)
+class MetrosIndex:
+    """Normalized metro name → (lat, lng), stored as parallel arrays."""
+
+    names: pd.Index
+    lat: np.ndarray
+    lng: np.ndarray
+
+    @classmethod
+    def from_csv(cls, path: Path | str) -> Optional["MetrosIndex"]:
+        """
+        Build the index from a metros CSV.
+
+        Returns:
+            The index, or None if the file lacks metro_full/lat/lng columns
+        """
+        metros = pd.read_csv(path)
+        if "metro_full" not in metros.columns or not {"lat", "lng"}.issubset(
+            metros.columns
+        ):
+            return None
+        metros["metro_full"] = normalize_city_series(
+            metros["metro_full"], apply_mapping=False
+        )
+        # A left merge would fan out on duplicate metro names; keep the first
+        metros = metros.drop_duplicates("metro_full")
+        return cls(
+            names=pd.Index(metros["metro_full"]),
+            lat=metros["lat"].to_numpy(dtype=np.float64),
+            lng=metros["lng"].to_numpy(dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def lookup(self, cities: pd.Series | np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized lat/lng for already-normalized city names.
+
+        Returns:
+            (lat, lng) float64 arrays; NaN where the city is unknown
+        """
+        pos = self.names.get_indexer(cities)
+        unmatched = pos < 0
+        lat, lng = self.lat.take(pos), self.lng.take(pos)
+        lat[unmatched] = np.nan
+        lng[unmatched] = np.nan
+        return lat, lng
+
+    def as_dict(self) -> Dict[str, Tuple[float, float]]:
+        """Plain dict for per-record lookups."""
+        return {
+            name: (float(lat), float(lng))
+            for name, lat, lng in zip(self.names, self.lat, self.lng)
+        }
+
+
+def load_metros_index(
+    path: Path | str | None = "data/raw/usmetros.csv",
+) -> Optional[MetrosIndex]:
+    """
+    Return the process-wide MetrosIndex for `path`.
+
+    Loaded once and reused until the file changes; None if `path` is
+    unset, missing or malformed.
+    """
+    if not path or not Path(path).exists():
+        return None
+    return artifact_cache.get(path, loader=MetrosIndex.from_csv)
+
+
+def enrich_lat_lng(df: pd.DataFrame, index: MetrosIndex) -> pd.DataFrame:
+    """
+    Add lat/lng columns to `df` by looking up its normalized city_full.
+
+    Keeps the input index and row order (unlike a merge) and logs the
+    match rate.
+    """
+    lat, lng = index.lookup(df["city_full"])
+    df = df.assign(lat=lat, lng=lng)
+    log_enrichment(df["city_full"], lat)
+    return df
+
+
+def log_enrichment(cities: pd.Series, lat: np.ndarray) -> None:
+    """Log how many of `cities` got a lat/lng (NaN `lat` = unmatched)."""
+    unmatched = np.isnan(lat)
+    missing = cities[unmatched].dropna().unique()
+    logger.info(
+        "Metros lat/lng enrichment",
+        rows=len(cities),
+        matched=int(len(cities) - unmatched.sum()),
+        match_rate=float(1.0 - unmatched.mean()) if len(cities) else 1.0,
+        unmatched_cities=[str(c) for c in missing[:20]],
+        unmatched_city_count=len(missing),
+    )
 
 
 def clean_and_merge(
     df: pd.DataFrame, metros_path: str | None = "data/raw/usmetros.csv"
 ) -> pd.DataFrame:
     """
-    Normalize city names, optionally merge lat/lng from metros dataset.
+    Normalize city names, optionally add lat/lng from metros dataset.
     If `city_full` column or `metros_path` is missing, skip gracefully.
     """
 
@@ -51,13 +200,8 @@ def clean_and_merge(
         print("⚠️ Skipping city merge: no 'city_full' column present.")
         return df
 
-    # Normalize city_full
-    df["city_full"] = df["city_full"].apply(normalize_city)
-    # Apply mapping
-    norm_mapping = {
-        normalize_city(k): normalize_city(v) for k, v in CITY_MAPPING.items()
-    }
-    df["city_full"] = df["city_full"].replace(norm_mapping)
+    # Normalize city_full + apply mapping (once per distinct city)
+    df["city_full"] = normalize_city_series(df["city_full"])
 
     # If lat/lng already present, skip merge
     if {"lat", "lng"}.issubset(df.columns):
@@ -69,29 +213,12 @@ def clean_and_merge(
         print("⚠️ Skipping lat/lng merge: metros file not provided or not found.")
         return df
 
-    # Merge lat/lng
-    metros = pd.read_csv(metros_path)
-    if "metro_full" not in metros.columns or not {"lat", "lng"}.issubset(
-        metros.columns
-    ):
+    # Look up lat/lng in the cached metros index
+    index = load_metros_index(metros_path)
+    if index is None:
         print("⚠️ Skipping lat/lng merge: metros file missing required columns.")
         return df
-
-    metros["metro_full"] = metros["metro_full"].apply(normalize_city)
-    df = df.merge(
-        metros[["metro_full", "lat", "lng"]],
-        how="left",
-        left_on="city_full",
-        right_on="metro_full",
-    )
-    df.drop(columns=["metro_full"], inplace=True, errors="ignore")
-
-    missing = df[df["lat"].isnull()]["city_full"].unique()
-    if len(missing) > 0:
-        print("⚠️ Still missing lat/lng for:", missing)
-    else:
-        print("✅ All cities matched with metros dataset.")
-    return df
+    return enrich_lat_lng(df, index)
 
 
 def drop_duplicates(df: pd.DataFrame) -> pd.DataFrame:
@@ -119,21 +246,30 @@ def preprocess_split(
     raw_dir: Path | str = RAW_DIR,
     processed_dir: Path | str = PROCESSED_DIR,
     metros_path: str | None = "data/raw/usmetros.csv",
+    engine: Optional[str] = None,
 ) -> pd.DataFrame:
-    """Run preprocessing for a split and save to processed_dir."""
+    """
+    Run preprocessing for a split and save to processed_dir.
+
+    `engine` picks the implementation (pandas | polars, see engine.py).
+    """
     raw_dir = Path(raw_dir)
     processed_dir = Path(processed_dir)
     processed_dir.mkdir(parents=True, exist_ok=True)
 
-    path = raw_dir / f"{split}.csv"
-    df = pd.read_csv(path)
+    path = table_path(raw_dir / split)
+    if resolve_engine(engine) == "polars":
+        from src.feature_pipeline import polars_pipeline
+
+        df = polars_pipeline.preprocess(path, metros_path=metros_path)
+    else:
+        df = read_table(path)
 
-    df = clean_and_merge(df, metros_path=metros_path)
-    df = drop_duplicates(df)
-    df = remove_outliers(df)
+        df = clean_and_merge(df, metros_path=metros_path)
+        df = drop_duplicates(df)
+        df = remove_outliers(df)
 
-    out_path = processed_dir / f"cleaning_{split}.csv"
-    df.to_csv(out_path, index=False)
+    out_path = write_table(df, table_path(processed_dir / f"cleaning_{split}"))
     print(f"✅ Preprocessed {split} saved to {out_path} ({df.shape})")
     return df
 
@@ -143,10 +279,15 @@ def run_preprocess(
     raw_dir: Path | str = RAW_DIR,
     processed_dir: Path | str = PROCESSED_DIR,
     metros_path: str | None = "data/raw/usmetros.csv",
+    engine: Optional[str] = None,
 ):
     for s in splits:
         preprocess_split(
-            s, raw_dir=raw_dir, processed_dir=processed_dir, metros_path=metros_path
+            s,
+            raw_dir=raw_dir,
+            processed_dir=processed_dir,
+            metros_path=metros_path,
+            engine=engine,
         )
 
 
@@ -13,10 +13,18 @@ The pipeline ensures consistent preprocessing between training and inference.
 from __future__ import annotations
 
 import argparse
+import json
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
-from joblib import load
 
 # Import configuration, logging, and exceptions
 from src.config.settings import settings
@@ -27,10 +35,20 @@ from src.feature_pipeline.feature_engineering import (
 from src.feature_pipeline.preprocess import (
     clean_and_merge,
     drop_duplicates,
+    normalize_city_series,
     remove_outliers,
 )
+from src.inference_pipeline.plan import (
+    DEDUP_EXCLUDE,
+    FeatureBatch,
+    InferencePlan,
+    get_inference_plan,
+)
+from src.utils.artifact_cache import artifact_cache
 from src.utils.exceptions import ModelNotFoundError, PredictionError
+from src.utils.feature_schema import SCHEMA_FILENAME, load_feature_schema
 from src.utils.logging_config import get_logger
+from src.utils.tracing import merge_reports, run_traced, tracing
 
 logger = get_logger(__name__)
 
@@ -40,18 +58,43 @@ logger = get_logger(__name__)
 DEFAULT_MODEL = settings.model_path
 DEFAULT_FREQ_ENCODER = settings.freq_encoder_path
 DEFAULT_TARGET_ENCODER = settings.target_encoder_path
-TRAIN_FE_PATH = settings.train_features_path
 DEFAULT_OUTPUT = settings.predictions_path / "predictions.csv"
 
+# Explicit training feature order; None means "read the schema manifest"
+TRAIN_FEATURE_COLUMNS: Optional[List[str]] = None
+
 
-# Load training feature columns (strict schema from training dataset)
-if TRAIN_FE_PATH.exists():
-    _train_cols = pd.read_csv(TRAIN_FE_PATH, nrows=1)
-    TRAIN_FEATURE_COLUMNS = [
-        c for c in _train_cols.columns if c != "price"
-    ]  # excluding price column
-else:
-    TRAIN_FEATURE_COLUMNS = None
+def _feature_columns(model_path: Path | str) -> Optional[List[str]]:
+    """
+    Training feature order for the model at `model_path`.
+
+    Taken from the feature-schema manifest saved next to the model (cached,
+    reloaded when it changes). None lets the plan fall back to the feature
+    names stored in the model itself.
+    """
+    if TRAIN_FEATURE_COLUMNS is not None:
+        return TRAIN_FEATURE_COLUMNS
+    schema = load_feature_schema(Path(model_path).parent / SCHEMA_FILENAME)
+    return schema.columns if schema is not None else None
+
+
+def inference_plan(
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str = DEFAULT_TARGET_ENCODER,
+) -> InferencePlan:
+    """
+    The cached plan for these artifacts, in the manifest's feature order.
+
+    Every call re-checks the artifact files and the manifest, so resolve it
+    once per request and reuse it for preparing and scoring.
+    """
+    return get_inference_plan(
+        model_path,
+        freq_encoder_path,
+        target_encoder_path,
+        feature_columns=_feature_columns(model_path),
+    )
 
 
 # ----------------------------
@@ -66,6 +109,305 @@ def predict(
     """
     Execute the complete inference pipeline for housing price prediction.
 
+    Runs a compiled `InferencePlan` (cached per artifact set) that builds the
+    aligned feature matrix in one pass instead of copying the frame at every
+    step. Predictions are identical to `predict_stepwise`.
+
+    Args:
+        input_df: Raw input data as pandas DataFrame
+        model_path: Path to trained model file
+        freq_encoder_path: Path to frequency encoder pickle
+        target_encoder_path: Path to target encoder pickle
+
+    Returns:
+        DataFrame with predictions and optional actual prices
+
+    Raises:
+        ModelNotFoundError: If model file cannot be loaded
+        PredictionError: If prediction fails
+    """
+    logger.info("Starting inference", input_shape=input_df.shape)
+
+    plan = inference_plan(model_path, freq_encoder_path, target_encoder_path)
+    out = plan.predict(input_df)
+
+    logger.info("Inference completed", num_predictions=len(out))
+    return out
+
+
+def prepare_records(
+    records: List[Dict[str, Any]] | pd.DataFrame,
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str = DEFAULT_TARGET_ENCODER,
+) -> FeatureBatch:
+    """
+    Turn raw JSON records (the `/predict` payload) into model-ready features.
+
+    Payloads of at most `settings.fast_path_max_rows` records skip pandas:
+    they are converted straight into float32 rows. Larger payloads go
+    through the DataFrame plan, as do column-oriented payloads that already
+    arrive as a DataFrame (unless they are small enough for the fast path).
+
+    Returns:
+        Aligned feature batch (picklable, so it can cross process pools)
+
+    Raises:
+        ModelNotFoundError: If model file cannot be loaded
+        PredictionError: If a feature value is invalid
+    """
+    plan = inference_plan(model_path, freq_encoder_path, target_encoder_path)
+    return prepare_with_plan(plan, records)
+
+
+def prepare_with_plan(
+    plan: InferencePlan, records: List[Dict[str, Any]] | pd.DataFrame
+) -> FeatureBatch:
+    """`prepare_records` with an already resolved plan."""
+    small = len(records) <= settings.fast_path_max_rows and plan.supports_records
+    if isinstance(records, pd.DataFrame):
+        if small:
+            return plan.transform_records(records.to_dict(orient="records"))
+        return plan.transform(records)
+    if small:
+        return plan.transform_records(records)
+    return plan.transform(pd.DataFrame(records))
+
+
+def predict_features(
+    X: np.ndarray,
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str = DEFAULT_TARGET_ENCODER,
+) -> np.ndarray:
+    """Score an aligned feature matrix with the cached model."""
+    plan = inference_plan(model_path, freq_encoder_path, target_encoder_path)
+    return plan.predict_matrix(X)
+
+
+def preload_artifacts(
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str = DEFAULT_TARGET_ENCODER,
+) -> None:
+    """Load model + encoders and compile the plan (e.g. in a pool worker)."""
+    inference_plan(model_path, freq_encoder_path, target_encoder_path)
+
+
+def predict_records(
+    records: List[Dict[str, Any]] | pd.DataFrame,
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str = DEFAULT_TARGET_ENCODER,
+    record: bool = True,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Predict for a list of raw JSON records (see `prepare_records`).
+
+    Small payloads are scored with the booster's in-place predict without
+    ever building a DataFrame.
+
+    Args:
+        records: Raw input rows as dicts, or a DataFrame of them
+        model_path: Path to trained model file
+        freq_encoder_path: Path to frequency encoder pickle
+        target_encoder_path: Path to target encoder pickle
+        record: False for synthetic (warm-up) traffic, which then skips the
+            prediction cache and the rows-per-model-call metric
+
+    Returns:
+        Tuple of (predicted prices, actual prices or None)
+
+    Raises:
+        ModelNotFoundError: If model file cannot be loaded
+        PredictionError: If prediction fails
+    """
+    plan = inference_plan(model_path, freq_encoder_path, target_encoder_path)
+    batch = prepare_with_plan(plan, records)
+    return plan.predict_matrix(batch.X, record=record), batch.y_true
+
+
+# ----------------------------
+# Streaming (chunked) inference
+# ----------------------------
+DEDUP_SCOPES = ("chunk", "global")
+
+
+def _dedup_hashes(chunk: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hash of each row's duplicate key (all columns but date/year).
+
+    Cities are normalized and numbers cast to float64 first, so the hash
+    agrees with what `drop_duplicates` compares on the whole frame even when
+    chunks infer different dtypes (e.g. int in one chunk, float in another).
+    """
+    keys = {}
+    for c in chunk.columns.difference(list(DEDUP_EXCLUDE)):
+        col = chunk[c]
+        if c == "city_full":
+            col = normalize_city_series(col)
+        elif pd.api.types.is_numeric_dtype(col):
+            col = col.astype("float64")
+        keys[c] = col
+    frame = pd.DataFrame(keys, index=chunk.index)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _global_duplicates(chunks: Iterator[pd.DataFrame]) -> np.ndarray:
+    """First pass: hashes of duplicate keys that occur more than once."""
+    hashes = np.concatenate([_dedup_hashes(c) for c in chunks] or [np.empty(0)])
+    uniques, counts = np.unique(hashes.astype(np.uint64), return_counts=True)
+    return uniques[counts > 1]
+
+
+def _predict_chunk(
+    chunk: pd.DataFrame,
+    feature_columns: Optional[Sequence[str]],
+    model_path: Path | str,
+    freq_encoder_path: Path | str,
+    target_encoder_path: Path | str,
+) -> pd.DataFrame:
+    """Predict one chunk (module-level so process workers can run it)."""
+    plan = get_inference_plan(
+        model_path,
+        freq_encoder_path,
+        target_encoder_path,
+        feature_columns=feature_columns,
+    )
+    return plan.predict(chunk)
+
+
+def predict_csv_stream(
+    input_path: Path | str,
+    output_path: Path | str,
+    chunksize: int = 100_000,
+    workers: int = 1,
+    dedup: str = "chunk",
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str = DEFAULT_TARGET_ENCODER,
+    profile: bool = False,
+) -> Dict[str, Any]:
+    """
+    Predict a (possibly huge) raw CSV in chunks, appending to `output_path`.
+
+    At most `2 * workers` chunks are in flight and results are written in
+    input order, so memory stays bounded by a few chunks regardless of the
+    input size.
+
+    Duplicate handling (`drop_duplicates` drops every row whose key appears
+    more than once):
+
+    - ``"chunk"``:  duplicates are detected within each chunk only; rows
+      duplicated across chunks are kept. Single pass.
+    - ``"global"``: an extra read-only pass hashes every row's key (8 bytes
+      per row) so duplicates are dropped across the whole file, matching
+      `predict()` on the full frame.
+
+    Args:
+        input_path: Raw input CSV
+        output_path: Predictions CSV (overwritten)
+        chunksize: Rows per chunk
+        workers: Process workers; 1 predicts in the calling process
+        dedup: Duplicate scope, "chunk" or "global"
+        model_path: Path to trained model file
+        freq_encoder_path: Path to frequency encoder pickle
+        target_encoder_path: Path to target encoder pickle
+        profile: Trace every chunk's pipeline stages and add the summed
+            per-stage report under ``"trace"``
+
+    Returns:
+        Summary with rows read/written, chunks and elapsed seconds
+
+    Raises:
+        ValueError: If `dedup` is unknown
+        ModelNotFoundError: If model file cannot be loaded
+        PredictionError: If prediction fails
+    """
+    if dedup not in DEDUP_SCOPES:
+        raise ValueError(f"dedup must be one of {DEDUP_SCOPES}, got {dedup!r}")
+    start = time.perf_counter()
+    paths = (model_path, freq_encoder_path, target_encoder_path)
+    columns = _feature_columns(model_path)
+    args = (columns, *paths)
+
+    duplicates = None
+    if dedup == "global":
+        duplicates = _global_duplicates(pd.read_csv(input_path, chunksize=chunksize))
+        logger.info("Global duplicate keys hashed", duplicate_keys=len(duplicates))
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=get_inference_plan,  # load artifacts in each worker
+            initargs=(*paths, columns),
+        )
+
+    summary = {"rows_in": 0, "rows_out": 0, "chunks": 0, "cross_chunk_dropped": 0}
+    pending: deque = deque()
+    header = True
+    traces: List[Dict[str, Any]] = []
+    # Traced chunks run (in whichever process) under their own trace
+    task = partial(run_traced, _predict_chunk) if profile else _predict_chunk
+
+    def write(result: Any) -> None:
+        nonlocal header
+        if profile:
+            result, trace = result
+            traces.append(trace)
+        result.to_csv(
+            output_path, mode="w" if header else "a", header=header, index=False
+        )
+        header = False
+        summary["rows_out"] += len(result)
+
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            summary["chunks"] += 1
+            summary["rows_in"] += len(chunk)
+            if duplicates is not None and len(duplicates):
+                dup = np.isin(_dedup_hashes(chunk).astype(np.uint64), duplicates)
+                summary["cross_chunk_dropped"] += int(dup.sum())
+                chunk = chunk[~dup]
+
+            if pool is None:
+                write(task(chunk, *args))
+                continue
+            pending.append(pool.submit(task, chunk, *args))
+            while len(pending) >= 2 * workers:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    if header:  # empty input: still leave a (header-less) file behind
+        Path(output_path).write_text("")
+    summary["seconds"] = time.perf_counter() - start
+    logger.info("Streaming inference completed", dedup=dedup, **summary)
+    if profile:
+        summary["trace"] = merge_reports(traces)
+    return summary
+
+
+# ----------------------------
+# Reference (step-by-step) pipeline
+# ----------------------------
+def predict_stepwise(
+    input_df: pd.DataFrame,
+    model_path: Path | str = DEFAULT_MODEL,
+    freq_encoder_path: Path | str = DEFAULT_FREQ_ENCODER,
+    target_encoder_path: Path | str = DEFAULT_TARGET_ENCODER,
+) -> pd.DataFrame:
+    """
+    Step-by-step pandas version of `predict`.
+
+    Kept as the reference implementation for parity tests and benchmarks;
+    every step materializes a new DataFrame.
+
     Args:
         input_df: Raw input data as pandas DataFrame
         model_path: Path to trained model file
@@ -95,14 +437,14 @@ def predict(
     # Step 3: Encodings ----------------
     # Frequency encoding (zipcode)
     if Path(freq_encoder_path).exists() and "zipcode" in df.columns:
-        freq_map = load(freq_encoder_path)
+        freq_map = artifact_cache.get(freq_encoder_path)
         df["zipcode_freq"] = df["zipcode"].map(freq_map).fillna(0)
         df = df.drop(columns=["zipcode"], errors="ignore")
         logger.info("Frequency encoding applied")
 
     # Target encoding (city_full → city_full_encoded)
     if Path(target_encoder_path).exists() and "city_full" in df.columns:
-        target_encoder = load(target_encoder_path)
+        target_encoder = artifact_cache.get(target_encoder_path)
         df["city_full_encoded"] = target_encoder.transform(df["city_full"])
         df = df.drop(columns=["city_full"], errors="ignore")
         logger.info("Target encoding applied")
@@ -117,16 +459,14 @@ def predict(
         df = df.drop(columns=["price"])
 
     # Step 5: Align columns with training schema
-    if TRAIN_FEATURE_COLUMNS is not None:
-        df = df.reindex(columns=TRAIN_FEATURE_COLUMNS, fill_value=0)
-        logger.info(
-            "Features aligned with training schema",
-            num_features=len(TRAIN_FEATURE_COLUMNS),
-        )
+    columns = _feature_columns(model_path)
+    if columns is not None:
+        df = df.reindex(columns=columns, fill_value=0)
+        logger.info("Features aligned with training schema", num_features=len(columns))
 
-    # Step 6: Load model & predict
+    # Step 6: Load model (cached per process) & predict
     try:
-        model = load(model_path)
+        model = artifact_cache.get(model_path)
         preds = model.predict(df)
         logger.info("Predictions generated", num_predictions=len(preds))
     except FileNotFoundError:
@@ -149,6 +489,13 @@ def predict(
 # ----------------------------
 # CLI entrypoint
 # ----------------------------
+def _trace_path(value: str) -> str:
+    """argparse type for --profile: a non-empty file path."""
+    if not value.strip():
+        raise argparse.ArgumentTypeError("trace path must not be empty")
+    return value
+
+
 # Allows running inference directly from terminal.
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -182,15 +529,64 @@ if __name__ == "__main__":
         help="Path to target encoder pickle",
     )
 
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the input in chunks of this many rows (bounded memory)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Process workers for chunked mode (default: 1, in-process)",
+    )
+    parser.add_argument(
+        "--dedup",
+        choices=DEDUP_SCOPES,
+        default="chunk",
+        help="Duplicate scope in chunked mode: per chunk or whole file",
+    )
+    parser.add_argument(
+        "--profile",
+        type=_trace_path,
+        default=None,
+        metavar="TRACE_JSON",
+        help="Write a per-stage trace (wall/CPU time, rows, bytes) to this file",
+    )
+
     args = parser.parse_args()
+    profile = args.profile is not None
+    trace = None
 
-    raw_df = pd.read_csv(args.input)
-    preds_df = predict(
-        raw_df,
-        model_path=args.model,
-        freq_encoder_path=args.freq_encoder,
-        target_encoder_path=args.target_encoder,
-    )
+    if args.chunksize:
+        summary = predict_csv_stream(
+            args.input,
+            args.output,
+            chunksize=args.chunksize,
+            workers=args.workers,
+            dedup=args.dedup,
+            model_path=args.model,
+            freq_encoder_path=args.freq_encoder,
+            target_encoder_path=args.target_encoder,
+            profile=profile,
+        )
+        trace = summary.pop("trace", None)
+        print(f"✅ {summary['rows_out']} predictions saved to {args.output}")
+    else:
+        raw_df = pd.read_csv(args.input)
+        with tracing() if profile else nullcontext() as t:
+            preds_df = predict(
+                raw_df,
+                model_path=args.model,
+                freq_encoder_path=args.freq_encoder,
+                target_encoder_path=args.target_encoder,
+            )
+        trace = t.report() if t is not None else None
+
+        preds_df.to_csv(args.output, index=False)
+        print(f"✅ Predictions saved to {args.output}")
 
-    preds_df.to_csv(args.output, index=False)
-    print(f"✅ Predictions saved to {args.output}")
+    if profile:
+        Path(args.profile).write_text(json.dumps(trace, indent=2))
+        print(f"⏱️  Trace written to {args.profile}")
@@ -0,0 +1,582 @@
+"""
+Compiled inference plan.
+
+`InferencePlan` is built once from the saved artifacts (model, frequency
+encoder, target encoder) and the training schema. It precomputes the output
+column order, the encoder lookup tables and the drop list, then turns a raw
+input frame into the final feature matrix in a single pass: row filters are
+computed as masks and every feature column is written straight into one
+preallocated float32 array.
+
+Small JSON payloads can skip pandas entirely: `transform_records` applies
+the same cleaning, filtering and encodings with plain dict lookups and
+writes straight into the float32 matrix handed to the booster.
+
+Predictions match the step-by-step pandas pipeline (`predict_stepwise`).
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import threading
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.feature_pipeline.preprocess import (
+    MetrosIndex,
+    canonical_city,
+    load_metros_index,
+    normalize_city_series,
+)
+from src.inference_pipeline.prediction_cache import prediction_cache
+from src.utils.artifact_cache import artifact_cache
+from src.utils.exceptions import (
+    InvalidInputError,
+    ModelNotFoundError,
+    PredictionError,
+)
+from src.utils.logging_config import get_logger
+from src.utils.metrics import PREDICT_BATCH_ROWS, REGISTRY, stage_stopwatch
+
+logger = get_logger(__name__)
+
+# Mirrors feature_engineering.drop_unused_columns
+DROP_COLUMNS = ("date", "city_full", "city", "zipcode", "median_sale_price")
+# Mirrors preprocess.drop_duplicates / remove_outliers
+DEDUP_EXCLUDE = ("date", "year")
+OUTLIER_COLUMN = "median_list_price"
+OUTLIER_MAX = 19_000_000
+DEFAULT_METROS_PATH = "data/raw/usmetros.csv"
+
+# Every compiled plan gets a new generation; prediction cache entries are
+# scoped to it, so they never outlive the artifacts that produced them
+_generations = itertools.count()
+
+
+@dataclass
+class FeatureBatch:
+    """Aligned feature matrix for the rows that survived preprocessing."""
+
+    X: np.ndarray
+    columns: List[str]
+    y_true: Optional[np.ndarray] = None
+    index: Optional[pd.Index] = None
+    # Column values in their own dtypes (transform(keep_features=True));
+    # columns the input lacks are absent and read as 0
+    features: Optional[Dict[str, np.ndarray]] = None
+
+
+class _LookupTable:
+    """
+    Vectorized value lookup with defaults for unknown/missing.
+
+    Like `Series.map(...).fillna(...)`, integer values stay integer unless
+    some value needs a default.
+    """
+
+    def __init__(
+        self, keys: pd.Index, values: np.ndarray, unknown: float, missing: float
+    ) -> None:
+        self.keys = keys
+        self.values = np.asarray(values)
+        self.unknown = unknown
+        self.missing = missing
+
+    def __call__(self, col: pd.Series) -> np.ndarray:
+        pos = self.keys.get_indexer(col)
+        out = self.values.take(pos)
+        miss = pos < 0
+        if miss.any():
+            out = out.astype(np.float64)
+            out[miss] = np.where(
+                col.isna().to_numpy()[miss], self.missing, self.unknown
+            )
+        return out
+
+    def as_scalar_lookup(self) -> "_ScalarLookup":
+        """Dict-backed equivalent for per-record lookups."""
+        table = {}
+        missing = self.missing
+        for key, value in zip(self.keys, self.values):
+            if _is_missing(key):
+                missing = float(value)  # NaN seen during fit has its own code
+            else:
+                table[key] = float(value)
+        return _ScalarLookup(table, self.unknown, missing)
+
+
+class _ScalarLookup:
+    def __init__(self, table: Dict[Any, float], unknown: float, missing: float):
+        self.table = table
+        self.unknown = unknown
+        self.missing = missing
+
+    def __call__(self, value: Any) -> float:
+        if _is_missing(value):
+            return self.missing
+        return self.table.get(value, self.unknown)
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _check_scalar(value: Any, name: str) -> None:
+    """Reject nested values (JSON arrays/objects, Arrow lists/structs)."""
+    if isinstance(value, (list, dict, np.ndarray)):
+        raise InvalidInputError(
+            f"Field {name!r} must be a scalar, got {type(value).__name__}"
+        )
+
+
+def _to_float(value: Any, name: str) -> float:
+    """Coerce a JSON scalar to float; numeric strings like "3" are accepted."""
+    if _is_missing(value):
+        return math.nan
+    if isinstance(value, (int, float)):  # bool is an int subclass
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    raise PredictionError(f"Non-numeric feature column {name!r}: {value!r}")
+
+
+def _as_float(values: Any, name: str) -> np.ndarray:
+    """
+    A column as numbers, with `_to_float`'s rule for object columns.
+
+    Both the DataFrame and the record path convert values this way, so a
+    payload is accepted or rejected the same on either.
+    """
+    values = values.to_numpy() if isinstance(values, pd.Series) else values
+    if values.dtype != object:
+        return values
+    return np.fromiter(
+        (_to_float(v, name) for v in values), dtype=np.float64, count=len(values)
+    )
+
+
+def _date_parts(value: Any) -> tuple:
+    """(year, quarter, month) for a date string, NaN if missing."""
+    if _is_missing(value):
+        return (math.nan, math.nan, math.nan)
+    try:
+        d = date.fromisoformat(str(value)[:10])
+    except ValueError:
+        d = pd.Timestamp(value)  # same parser the pandas path uses
+    return (d.year, (d.month - 1) // 3 + 1, d.month)
+
+
+def _compile_frequency(freq_map: Any) -> _LookupTable:
+    freq = pd.Series(freq_map)
+    # Series.map(...).fillna(0): unknown and missing both encode to 0
+    return _LookupTable(freq.index, freq.to_numpy(), 0.0, 0.0)
+
+
+def _compile_target(encoder: Any, col: str) -> Optional[_LookupTable]:
+    """Flatten a fitted category_encoders.TargetEncoder into one lookup."""
+    if encoder.handle_unknown != "value" or encoder.handle_missing != "value":
+        return None  # let the encoder handle exotic policies itself
+    ordinal = next(m["mapping"] for m in encoder.ordinal_encoder.mapping)
+    target = encoder.mapping[col]
+    return _LookupTable(
+        ordinal.index,
+        target.reindex(ordinal.to_numpy()).to_numpy(),
+        float(target.loc[-1]),
+        float(target.loc[-2]),
+    )
+
+
+class InferencePlan:
+    """Precompiled preprocessing + encoding + alignment for one model."""
+
+    def __init__(
+        self,
+        model: Any,
+        feature_columns: Sequence[str],
+        freq_encoder: Any = None,
+        target_encoder: Any = None,
+        metros: Optional[MetrosIndex] = None,
+    ) -> None:
+        self.model = model
+        self.feature_columns = list(feature_columns)
+        self.freq_encoder = freq_encoder
+        self.target_encoder = target_encoder
+        self.metros = metros
+
+        self._freq_lookup = (
+            _compile_frequency(freq_encoder) if freq_encoder is not None else None
+        )
+        self._target_lookup = (
+            _compile_target(target_encoder, "city_full")
+            if target_encoder is not None
+            else None
+        )
+        # Dict-backed tables for the pandas-free record path
+        self._freq_scalar = (
+            self._freq_lookup.as_scalar_lookup() if self._freq_lookup else None
+        )
+        self._target_scalar = (
+            self._target_lookup.as_scalar_lookup() if self._target_lookup else None
+        )
+        self._metros_scalar = metros.as_dict() if metros is not None else None
+        self.supports_records = (
+            target_encoder is None or self._target_scalar is not None
+        )
+        self._booster, self._iteration_range = _booster_of(model)
+        self._missing = getattr(model, "missing", np.nan)
+        self.generation = next(_generations)
+
+    # ------------------------------------------------------------------
+    # execution
+    # ------------------------------------------------------------------
+    def transform(self, df: pd.DataFrame, keep_features: bool = False) -> FeatureBatch:
+        """
+        Build the aligned feature matrix for `df` without mutating it.
+
+        Args:
+            df: Raw input rows (same shape `predict()` accepts)
+            keep_features: Also return each feature column in its own dtype
+                (`FeatureBatch.features`), not just as float32 in `X`
+
+        Returns:
+            FeatureBatch with one float32 row per surviving input row
+
+        Raises:
+            InvalidInputError: If a value is not a scalar
+            PredictionError: If a feature value is not numeric
+        """
+        sw = stage_stopwatch(len(df))
+        cols: Dict[str, Any] = {c: df[c] for c in df.columns}
+        for c, values in cols.items():
+            if values.dtype == object:
+                for v in values.to_numpy():
+                    _check_scalar(v, c)
+
+        # City normalization + lat/lng enrichment (clean_and_merge)
+        if "city_full" in cols:
+            city = normalize_city_series(cols["city_full"])
+            cols["city_full"] = city
+            if not {"lat", "lng"}.issubset(cols) and self.metros is not None:
+                lat, lng = self.metros.lookup(city)
+                cols["lat"] = pd.Series(lat, index=df.index, name="lat")
+                cols["lng"] = pd.Series(lng, index=df.index, name="lng")
+
+        # Row filters as one boolean mask (drop_duplicates + remove_outliers)
+        keep = np.ones(len(df), dtype=bool)
+        subset = [c for c in cols if c not in DEDUP_EXCLUDE]
+        if subset:
+            keys = pd.DataFrame({c: cols[c] for c in subset}, copy=False)
+            keep &= ~keys.duplicated(keep=False).to_numpy()
+        if OUTLIER_COLUMN in cols:
+            keep &= _as_float(cols[OUTLIER_COLUMN], OUTLIER_COLUMN) <= OUTLIER_MAX
+        rows = None if keep.all() else np.flatnonzero(keep)
+        n = len(df) if rows is None else len(rows)
+
+        def take(values: Any) -> Any:
+            values = values.to_numpy() if isinstance(values, pd.Series) else values
+            return values if rows is None else values[rows]
+
+        sw.lap("preprocess", n)
+
+        # Derived features, computed on surviving rows only
+        derived: Dict[str, Any] = {}
+        if "date" in cols:
+            dates = pd.DatetimeIndex(pd.to_datetime(take(cols["date"])))
+            derived.update(year=dates.year, quarter=dates.quarter, month=dates.month)
+        sw.lap("date_features", n)
+        if "zipcode" in cols and self.freq_encoder is not None:
+            derived["zipcode_freq"] = self._freq_lookup(
+                pd.Series(take(cols["zipcode"]))
+            )
+        if "city_full" in cols and self.target_encoder is not None:
+            city = pd.Series(take(cols["city_full"]), name="city_full")
+            if self._target_lookup is not None:
+                derived["city_full_encoded"] = self._target_lookup(city)
+            else:
+                derived["city_full_encoded"] = (
+                    self.target_encoder.transform(city).iloc[:, 0].to_numpy()
+                )
+        sw.lap("encoding", n)
+
+        # Single allocation: write every schema column into X
+        X = np.empty((n, len(self.feature_columns)), dtype=np.float32)
+        features: Optional[Dict[str, np.ndarray]] = {} if keep_features else None
+        try:
+            for j, name in enumerate(self.feature_columns):
+                if name in derived:
+                    values = np.asarray(derived[name])
+                elif name in cols and name not in DROP_COLUMNS and name != "price":
+                    values = _as_float(take(cols[name]), name)
+                else:
+                    X[:, j] = 0
+                    continue
+                X[:, j] = values
+                if features is not None:
+                    features[name] = values
+        except (TypeError, ValueError) as e:
+            raise PredictionError(f"Non-numeric feature column {name!r}: {e}")
+
+        y_true = _as_float(take(cols["price"]), "price") if "price" in cols else None
+        index = df.index if rows is None else df.index[rows]
+        sw.lap("alignment", n)
+        return FeatureBatch(
+            X=X,
+            columns=self.feature_columns,
+            y_true=y_true,
+            index=index,
+            features=features,
+        )
+
+    def transform_records(self, records: Sequence[Dict[str, Any]]) -> FeatureBatch:
+        """
+        Pandas-free equivalent of `transform` for a handful of JSON records.
+
+        Missing keys behave like the NaN cells `pd.DataFrame(records)` would
+        create, so the surviving rows and their features match `transform`.
+
+        Args:
+            records: Raw input rows as dicts (the `/predict` payload)
+
+        Returns:
+            FeatureBatch; `index` holds the positions of surviving records
+
+        Raises:
+            InvalidInputError: If a value is not a scalar
+            PredictionError: If a feature value is not numeric
+        """
+        sw = stage_stopwatch(len(records))
+        columns = list(dict.fromkeys(k for r in records for k in r))
+        present = set(columns)
+        has_city = "city_full" in present
+        enrich = (
+            has_city
+            and not {"lat", "lng"}.issubset(present)
+            and self._metros_scalar is not None
+        )
+        if enrich:
+            columns += [c for c in ("lat", "lng") if c not in present]
+
+        rows = []
+        for r in records:
+            for c, v in r.items():
+                _check_scalar(v, c)
+            row = dict.fromkeys(columns)
+            row.update(r)
+            if has_city:
+                city = row["city_full"] = canonical_city(row["city_full"])
+                if enrich:
+                    row["lat"], row["lng"] = self._metros_scalar.get(
+                        city, (math.nan, math.nan)
+                    )
+            rows.append(row)
+
+        # Row filters: duplicates (keep=False) and median_list_price outliers
+        keep = [True] * len(rows)
+        if len(rows) > 1:
+            subset = [c for c in columns if c not in DEDUP_EXCLUDE]
+            seen: Dict[tuple, List[int]] = {}
+            for i, row in enumerate(rows):
+                key = tuple(None if _is_missing(row[c]) else row[c] for c in subset)
+                seen.setdefault(key, []).append(i)
+            for idx in seen.values():
+                if len(idx) > 1:
+                    for i in idx:
+                        keep[i] = False
+        if OUTLIER_COLUMN in present:
+            for i, row in enumerate(rows):
+                v = _to_float(row[OUTLIER_COLUMN], OUTLIER_COLUMN)
+                keep[i] = keep[i] and v <= OUTLIER_MAX  # NaN compares False
+        positions = [i for i, k in enumerate(keep) if k]
+        sw.lap("preprocess", len(positions))
+
+        # Date features, encodings and alignment are fused per row here, so
+        # they are reported together as "alignment"
+        X = np.empty((len(positions), len(self.feature_columns)), dtype=np.float32)
+        y_true = [] if "price" in present else None
+        for out_i, i in enumerate(positions):
+            row = rows[i]
+            derived: Dict[str, float] = {}
+            if "date" in present:
+                derived["year"], derived["quarter"], derived["month"] = _date_parts(
+                    row["date"]
+                )
+            if "zipcode" in present and self._freq_scalar is not None:
+                derived["zipcode_freq"] = self._freq_scalar(row["zipcode"])
+            if has_city and self._target_scalar is not None:
+                derived["city_full_encoded"] = self._target_scalar(row["city_full"])
+
+            xi = X[out_i]
+            for j, name in enumerate(self.feature_columns):
+                if name in derived:
+                    xi[j] = derived[name]
+                elif name in row and name not in DROP_COLUMNS and name != "price":
+                    xi[j] = _to_float(row[name], name)
+                else:
+                    xi[j] = 0
+            if y_true is not None:
+                y_true.append(_to_float(row["price"], "price"))
+        sw.lap("alignment", len(positions))
+
+        return FeatureBatch(
+            X=X,
+            columns=self.feature_columns,
+            y_true=None if y_true is None else np.asarray(y_true),
+            index=pd.RangeIndex(len(records))[positions] if positions else None,
+        )
+
+    def predict_matrix(self, X: np.ndarray, record: bool = True) -> np.ndarray:
+        """
+        Run the model on an already aligned feature matrix.
+
+        With PREDICTION_CACHE_SIZE set, rows scored before (by this plan)
+        come from the prediction cache and only the rest reach the model.
+        `record=False` (warm-up traffic) bypasses the cache and the
+        rows-per-model-call metric.
+        """
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float32)
+        sw = stage_stopwatch(len(X))
+        if not record:
+            preds = self._run_model(X, record=False)
+        elif prediction_cache.enabled:
+            preds = prediction_cache.predict(self.generation, X, self._run_model)
+        else:
+            preds = self._run_model(X)
+        sw.lap("model_predict", len(preds))
+        return preds
+
+    def _run_model(self, X: np.ndarray, record: bool = True) -> np.ndarray:
+        try:
+            if self._booster is not None:
+                preds = self._booster.inplace_predict(
+                    X, iteration_range=self._iteration_range, missing=self._missing
+                )
+            else:
+                preds = self.model.predict(X)
+        except Exception as e:
+            raise PredictionError(f"Prediction failed: {str(e)}")
+        if record and REGISTRY.enabled:
+            PREDICT_BATCH_ROWS.observe(len(X))
+        return preds
+
+    def predict_records(self, records: Sequence[Dict[str, Any]]) -> tuple:
+        """
+        Fast path for tiny payloads: records → float32 rows → booster.
+
+        Returns:
+            Tuple of (predictions array, actual prices array or None)
+        """
+        batch = self.transform_records(records)
+        return self.predict_matrix(batch.X), batch.y_true
+
+    def predict(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Transform `df` and predict.
+
+        Returns:
+            DataFrame of aligned features plus `predicted_price` and, when the
+            input carried a `price` column, `actual_price`. Features keep the
+            dtypes `predict_stepwise` gives them; float32 is only the model's
+            input matrix.
+        """
+        batch = self.transform(df, keep_features=True)
+        preds = self.predict_matrix(batch.X)
+        zeros = np.zeros(len(batch.X), dtype=np.int64)  # reindex(fill_value=0)
+        out = pd.DataFrame(
+            {c: batch.features.get(c, zeros) for c in batch.columns},
+            index=batch.index,
+        )
+        out["predicted_price"] = preds
+        if batch.y_true is not None:
+            out["actual_price"] = batch.y_true
+        return out
+
+
+# ----------------------------
+# Plan cache
+# ----------------------------
+_plans: Dict[tuple, InferencePlan] = {}
+_plans_lock = threading.Lock()
+_MAX_PLANS = 8
+
+
+def _booster_of(model: Any) -> tuple:
+    """Booster + iteration range that XGBModel.predict would use."""
+    if not hasattr(model, "get_booster"):
+        return None, (0, 0)
+    try:
+        iteration_range = (0, model.best_iteration + 1)
+    except AttributeError:  # no early stopping → use all trees
+        iteration_range = (0, 0)
+    return model.get_booster(), iteration_range
+
+
+def _feature_columns_from_model(model: Any) -> Optional[List[str]]:
+    names = getattr(model, "feature_names_in_", None)
+    if names is None and hasattr(model, "get_booster"):
+        names = model.get_booster().feature_names
+    return list(names) if names is not None else None
+
+
+def get_inference_plan(
+    model_path: Path | str,
+    freq_encoder_path: Path | str,
+    target_encoder_path: Path | str,
+    feature_columns: Optional[Sequence[str]] = None,
+    metros_path: Path | str | None = DEFAULT_METROS_PATH,
+) -> InferencePlan:
+    """
+    Return a compiled plan for the given artifacts, reusing a cached one
+    while none of the underlying artifact files changed.
+
+    Raises:
+        ModelNotFoundError: If the model file does not exist
+        PredictionError: If no training schema can be determined
+    """
+    try:
+        model = artifact_cache.get(model_path)
+    except FileNotFoundError:
+        logger.error("Model file not found", model_path=str(model_path))
+        raise ModelNotFoundError(f"Model not found at {model_path}")
+    freq = (
+        artifact_cache.get(freq_encoder_path)
+        if Path(freq_encoder_path).exists()
+        else None
+    )
+    target = (
+        artifact_cache.get(target_encoder_path)
+        if Path(target_encoder_path).exists()
+        else None
+    )
+    metros = load_metros_index(metros_path)
+    if feature_columns is None:
+        feature_columns = _feature_columns_from_model(model)
+    if feature_columns is None:
+        raise PredictionError("No training feature schema available")
+
+    # Artifact objects are stable while their files are unchanged
+    key = (id(model), id(freq), id(target), id(metros), tuple(feature_columns))
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is None:
+            plan = InferencePlan(
+                model,
+                feature_columns,
+                freq_encoder=freq,
+                target_encoder=target,
+                metros=metros,
+            )
+            if len(_plans) >= _MAX_PLANS:
+                _plans.pop(next(iter(_plans)))  # drop the oldest generation
+            _plans[key] = plan
+            logger.info("Inference plan compiled", num_features=len(feature_columns))
+    return plan
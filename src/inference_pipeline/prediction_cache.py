@@ -0,0 +1,165 @@
+"""
+Cross-request cache of model outputs, keyed by the aligned feature row.
+
+The key is the exact float32 bytes of a row of the feature matrix the
+model sees, so it is canonical by construction: cities are already
+normalized, encodings applied and columns in schema order. Raw rows that
+map to the same features share one entry, and row filtering (duplicates,
+outliers) still runs per request before the cache is consulted.
+
+Entries are scoped to a plan *generation*: every compiled `InferencePlan`
+gets a new one, and plans are recompiled whenever the model or an encoder
+file changes, so stale predictions are never served after an artifact
+update (they simply age out of the LRU).
+
+The cache lives in the process that runs the model (each pool worker has
+its own with EXECUTION_BACKEND=process).
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.metrics import PREDICTION_CACHE_ROWS, REGISTRY
+
+# Rough per-entry overhead beyond the key bytes: OrderedDict node, key tuple,
+# value tuple and numpy scalar
+_ENTRY_OVERHEAD = 200
+
+
+def row_keys(X: np.ndarray) -> List[bytes]:
+    """One bytes key per row of a 2-D feature matrix."""
+    X = np.ascontiguousarray(X)
+    row = X.dtype.itemsize * X.shape[1]
+    buf = X.tobytes()
+    return [buf[i : i + row] for i in range(0, len(buf), row)]
+
+
+class PredictionCache:
+    """Thread-safe LRU (+ optional TTL) of feature row → prediction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float = 0.0) -> None:
+        """
+        Args:
+            max_entries: Maximum cached rows; 0 disables the cache
+            ttl_seconds: Entry lifetime; 0 keeps entries until evicted
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Tuple[int, bytes], Tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._key_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def predict(
+        self,
+        generation: int,
+        X: np.ndarray,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+    ) -> np.ndarray:
+        """
+        Predictions for `X`, running only uncached rows through `predict_fn`.
+
+        Args:
+            generation: Plan generation the rows were built by
+            X: Aligned feature matrix
+            predict_fn: Scores a feature matrix (the uncached rows)
+
+        Returns:
+            One prediction per row of `X`, identical to `predict_fn(X)`
+        """
+        keys = row_keys(X)
+        cached: Dict[int, Any] = {}
+        missing: Dict[bytes, List[int]] = {}
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get((generation, key))
+                if entry is not None and self.ttl_seconds and entry[1] <= now:
+                    self._drop((generation, key))
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._entries.move_to_end((generation, key))
+                    cached[i] = entry[0]
+            n_missing = len(keys) - len(cached)
+            self.hits += len(cached)
+            self.misses += n_missing
+        if REGISTRY.enabled:
+            PREDICTION_CACHE_ROWS.inc("hit", amount=len(cached))
+            PREDICTION_CACHE_ROWS.inc("miss", amount=n_missing)
+
+        if not missing:  # values are numpy scalars, so the dtype is kept
+            return np.asarray([cached[i] for i in range(len(keys))])
+
+        # Identical rows within the request are scored once
+        first = [idx[0] for idx in missing.values()]
+        preds = np.asarray(predict_fn(X[first]))
+        out = np.empty(len(keys), dtype=preds.dtype)
+        for (key, idx), value in zip(missing.items(), preds):
+            out[idx] = value
+        for i, value in cached.items():
+            out[i] = value
+
+        expires = now + self.ttl_seconds
+        with self._lock:
+            for key, value in zip(missing, preds):
+                full = (generation, key)
+                if full not in self._entries:
+                    self._key_bytes += len(key)
+                self._entries[full] = (value, expires)
+                self._entries.move_to_end(full)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return out
+
+    def _drop(self, full_key: Tuple[int, bytes]) -> None:
+        del self._entries[full_key]
+        self._key_bytes -= len(full_key[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._key_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, size and approximate memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            entries = len(self._entries)
+            return {
+                "enabled": self.enabled,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "approx_bytes": self._key_bytes
+                + entries * (_ENTRY_OVERHEAD + sys.getsizeof(b"")),
+            }
+
+
+# Process-wide cache used by every InferencePlan
+prediction_cache = PredictionCache(
+    settings.prediction_cache_size, settings.prediction_cache_ttl_seconds
+)
@@ -12,7 +12,10 @@ import pandas as pd
 from joblib import load
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
-DEFAULT_EVAL = Path("data/processed/feature_engineered_eval.csv")
+from src.utils.feature_schema import SCHEMA_FILENAME, read_with_schema
+from src.utils.storage import table_path
+
+DEFAULT_EVAL = table_path("data/processed/feature_engineered_eval")
 DEFAULT_MODEL = Path("models/xgb_model.pkl")
 
 
@@ -33,7 +36,8 @@ def evaluate_model(
     sample_frac: Optional[float] = None,
     random_state: int = 42,
 ) -> Dict[str, float]:
-    eval_df = pd.read_csv(eval_path)
+    # The manifest next to the model lists the columns it was trained on
+    eval_df = read_with_schema(eval_path, Path(model_path).parent / SCHEMA_FILENAME)
     eval_df = _maybe_sample(eval_df, sample_frac, random_state)
 
     target = "price"
@@ -3,7 +3,8 @@ Train a baseline XGBoost model.
 
 - Reads feature-engineered train/eval CSVs.
 - Trains XGBRegressor.
-- Returns metrics and saves model to `model_output`.
+- Returns metrics and saves model to `model_output`, recording it in the
+  feature-schema manifest next to it.
 """
 
 from __future__ import annotations
@@ -17,8 +18,11 @@ from joblib import dump
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from xgboost import XGBRegressor
 
-DEFAULT_TRAIN = Path("data/processed/feature_engineered_train.csv")
-DEFAULT_EVAL = Path("data/processed/feature_engineered_eval.csv")
+from src.utils.feature_schema import SCHEMA_FILENAME, read_with_schema, record_model
+from src.utils.storage import table_path
+
+DEFAULT_TRAIN = table_path("data/processed/feature_engineered_train")
+DEFAULT_EVAL = table_path("data/processed/feature_engineered_eval")
 DEFAULT_OUT = Path("models/xgb_model.pkl")
 
 
@@ -48,8 +52,10 @@ def train_model(
     model : XGBRegressor
     metrics : dict[str, float]
     """
-    train_df = pd.read_csv(train_path)
-    eval_df = pd.read_csv(eval_path)
+    # Only the manifest's features + target, written next to the model
+    schema_path = Path(model_output).parent / SCHEMA_FILENAME
+    train_df = read_with_schema(train_path, schema_path)
+    eval_df = read_with_schema(eval_path, schema_path)
 
     train_df = _maybe_sample(train_df, sample_frac, random_state)
     eval_df = _maybe_sample(eval_df, sample_frac, random_state)
@@ -83,6 +89,7 @@ def train_model(
     out = Path(model_output)
     out.parent.mkdir(parents=True, exist_ok=True)
     dump(model, out)
+    record_model(out.parent / SCHEMA_FILENAME, out, model, X_train)
     print(f"✅ Model trained. Saved to {out}")
     print(f"   MAE={mae:.2f}  RMSE={rmse:.2f}  R²={r2:.4f}")
 
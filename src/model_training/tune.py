@@ -19,8 +19,11 @@ from joblib import dump
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from xgboost import XGBRegressor
 
-DEFAULT_TRAIN = Path("data/processed/feature_engineered_train.csv")
-DEFAULT_EVAL = Path("data/processed/feature_engineered_eval.csv")
+from src.utils.feature_schema import SCHEMA_FILENAME, read_with_schema, record_model
+from src.utils.storage import table_path
+
+DEFAULT_TRAIN = table_path("data/processed/feature_engineered_train")
+DEFAULT_EVAL = table_path("data/processed/feature_engineered_eval")
 DEFAULT_OUT = Path("models/xgb_best_model.pkl")
 
 
@@ -40,9 +43,10 @@ def _load_data(
     eval_path: Path | str,
     sample_frac: Optional[float],
     random_state: int,
+    schema_path: Path | str,
 ):
-    train_df = pd.read_csv(train_path)
-    eval_df = pd.read_csv(eval_path)
+    train_df = read_with_schema(train_path, schema_path)
+    eval_df = read_with_schema(eval_path, schema_path)
     train_df = _maybe_sample(train_df, sample_frac, random_state)
     eval_df = _maybe_sample(eval_df, sample_frac, random_state)
 
@@ -68,7 +72,11 @@ def tune_model(
     mlflow.set_experiment(experiment_name)
 
     X_train, y_train, X_eval, y_eval = _load_data(
-        train_path, eval_path, sample_frac, random_state
+        train_path,
+        eval_path,
+        sample_frac,
+        random_state,
+        Path(model_output).parent / SCHEMA_FILENAME,
     )
 
     def objective(trial: optuna.Trial):
@@ -129,6 +137,7 @@ def tune_model(
     out = Path(model_output)
     out.parent.mkdir(parents=True, exist_ok=True)
     dump(best_model, out)
+    record_model(out.parent / SCHEMA_FILENAME, out, best_model, X_train)
     print(f"✅ Best model saved to {out}")
 
     # Log final best model to MLflow
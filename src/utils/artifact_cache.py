@@ -0,0 +1,157 @@
+"""
+Process-wide cache for deserialized model artifacts.
+
+Artifacts (model, encoders, lookup tables) are loaded once per process and
+kept in memory, keyed by their resolved path. Every lookup re-checks the
+file fingerprint (mtime + size, optionally a content hash) so a replaced
+artifact is reloaded transparently on the next access.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from joblib import load
+
+from src.config.settings import settings
+from src.utils.logging_config import get_logger
+from src.utils.metrics import ARTIFACT_LOAD_SECONDS, REGISTRY
+
+logger = get_logger(__name__)
+
+Fingerprint = Tuple[int, int, Optional[str]]
+
+
+def file_fingerprint(path: Path | str, hash_contents: bool = False) -> Fingerprint:
+    """
+    Return a cheap identity for the file at `path`.
+
+    Args:
+        path: File to fingerprint
+        hash_contents: Also include a SHA-256 of the file contents
+
+    Returns:
+        Tuple of (mtime_ns, size, sha256 or None)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    st = os.stat(path)
+    digest = None
+    if hash_contents:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+    return (st.st_mtime_ns, st.st_size, digest)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fingerprint: Fingerprint
+    load_seconds: float
+
+
+class ArtifactCache:
+    """Thread-safe cache of loaded artifacts, invalidated on file change."""
+
+    def __init__(self, hash_contents: bool = False) -> None:
+        self.hash_contents = hash_contents
+        self._entries: Dict[Tuple[str, Callable], _Entry] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.load_seconds = 0.0
+
+    def get(self, path: Path | str, loader: Callable[[str], Any] = load) -> Any:
+        """
+        Return the artifact at `path`, loading it only if needed.
+
+        Args:
+            path: Artifact file path
+            loader: Callable that deserializes the file (default: joblib.load)
+
+        Returns:
+            The loaded artifact
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        key = (str(Path(path).resolve()), loader)
+        fp = file_fingerprint(key[0], self.hash_contents)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint == fp:
+                self.hits += 1
+                return entry.value
+
+            start = time.perf_counter()
+            value = loader(key[0])
+            elapsed = time.perf_counter() - start
+
+            self.misses += 1
+            if entry is not None:
+                self.reloads += 1
+            self.load_seconds += elapsed
+            self._entries[key] = _Entry(value, fp, elapsed)
+
+        if REGISTRY.enabled:
+            ARTIFACT_LOAD_SECONDS.observe(elapsed, Path(key[0]).name)
+
+        logger.info(
+            "Artifact loaded",
+            path=key[0],
+            reloaded=entry is not None,
+            load_seconds=round(elapsed, 6),
+        )
+        return value
+
+    def evict(self, path: Path | str | None = None) -> int:
+        """
+        Drop cached artifacts.
+
+        Args:
+            path: Evict only entries for this file; evict everything if None
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if path is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            target = str(Path(path).resolve())
+            keys = [k for k in self._entries if k[0] == target]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and per-artifact load times."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "entries": len(self._entries),
+                "load_seconds_total": self.load_seconds,
+                "artifacts": {
+                    k[0]: {"load_seconds": e.load_seconds}
+                    for k, e in self._entries.items()
+                },
+            }
+
+
+# Global cache instance shared by inference, batch and API code
+artifact_cache = ArtifactCache(hash_contents=settings.artifact_hash_contents)
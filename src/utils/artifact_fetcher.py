@@ -0,0 +1,217 @@
+"""
+Concurrent, verified S3 artifact fetcher with a content-addressed cache.
+
+Every fetch HEADs the object first. The file is downloaded only if its
+ETag changed since the last fetch or the cached copy is missing. Downloads
+are streamed through MD5 + SHA-256, checked against the ETag (single-part
+uploads) and stored once under ``<cache>/objects/<sha256>``. The target
+path (e.g. models/xgb_best_model.pkl) is then swapped in atomically, so
+readers never see a partial file.
+
+Works with any client exposing boto3's ``head_object`` and
+``download_fileobj`` (a boto3 S3 client, or a local stand-in in tests).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from src.utils.artifact_cache import file_fingerprint
+from src.utils.exceptions import ArtifactFetchError
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class FetchResult:
+    key: str
+    path: str
+    sha256: str
+    etag: str
+    downloaded: bool
+    bytes: int
+    seconds: float
+
+
+class _HashingWriter:
+    """Write-only file wrapper that hashes everything passing through it.
+
+    It has no seek(), so boto3 writes parts strictly in order.
+    """
+
+    def __init__(self, f) -> None:
+        self.f = f
+        self.md5 = hashlib.md5(usedforsecurity=False)
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.md5.update(data)
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+
+def _atomic_copy(src: Path, dst: Path) -> None:
+    """Copy `src` to `dst` via a temp file + rename in dst's directory."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        # A copy, not a hard link: writers that rewrite the target in place
+        # (e.g. joblib.dump during local training) must not corrupt the cache
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class ArtifactFetcher:
+    """Fetch S3 objects into a local content-addressed cache."""
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        cache_dir: Path | str,
+        max_workers: int = 4,
+    ) -> None:
+        """
+        Args:
+            client: boto3-compatible S3 client (thread-safe)
+            bucket: Source bucket
+            cache_dir: Local cache root (objects/, tmp/ and index.json)
+            max_workers: Concurrent downloads
+        """
+        self.client = client
+        self.bucket = bucket
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        (self.cache_dir / "objects").mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / "tmp").mkdir(parents=True, exist_ok=True)
+        self._index_path = self.cache_dir / "index.json"
+        self._index: Dict[str, Dict[str, Any]] = (
+            json.loads(self._index_path.read_text())
+            if self._index_path.exists()
+            else {}
+        )
+
+    def object_path(self, sha256: str) -> Path:
+        return self.cache_dir / "objects" / sha256
+
+    def fetch(self, key: str, path: Path | str) -> FetchResult:
+        """
+        Make `path` hold the current content of s3://bucket/key.
+
+        Raises:
+            ArtifactFetchError: If the download does not match its ETag
+        """
+        start = time.perf_counter()
+        path = Path(path)
+        etag = self.client.head_object(Bucket=self.bucket, Key=key)["ETag"].strip('"')
+
+        with self._lock:
+            entry = dict(self._index.get(key, {}))
+        cached = (
+            entry.get("etag") == etag and self.object_path(entry["sha256"]).exists()
+        )
+        if cached:
+            sha256, size = entry["sha256"], entry["bytes"]
+        else:
+            sha256, size = self._download(key, etag)
+
+        # Re-materialize only if the target is missing or was changed locally
+        if not (
+            path.exists()
+            and entry.get("path") == str(path)
+            and entry.get("sha256") == sha256
+            and list(file_fingerprint(path)[:2]) == entry.get("target_fingerprint")
+        ):
+            _atomic_copy(self.object_path(sha256), path)
+
+        with self._lock:
+            self._index[key] = {
+                "etag": etag,
+                "sha256": sha256,
+                "bytes": size,
+                "path": str(path),
+                "target_fingerprint": list(file_fingerprint(path)[:2]),
+            }
+            self._save_index()
+
+        result = FetchResult(
+            key=key,
+            path=str(path),
+            sha256=sha256,
+            etag=etag,
+            downloaded=not cached,
+            bytes=size,
+            seconds=time.perf_counter() - start,
+        )
+        logger.info("Artifact fetched", **asdict(result))
+        return result
+
+    def fetch_all(self, specs: Dict[str, Path | str]) -> Dict[str, FetchResult]:
+        """
+        Fetch several objects concurrently.
+
+        Args:
+            specs: S3 key → local target path
+
+        Returns:
+            S3 key → FetchResult
+
+        Raises:
+            ArtifactFetchError: If any object could not be fetched (after
+                all others have finished)
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {k: pool.submit(self.fetch, k, p) for k, p in specs.items()}
+        results, errors = {}, {}
+        for key, fut in futures.items():
+            try:
+                results[key] = fut.result()
+            except Exception as e:
+                errors[key] = e
+        if errors:
+            logger.error(
+                "Artifact fetch failed", errors={k: str(e) for k, e in errors.items()}
+            )
+            raise ArtifactFetchError(
+                "Failed to fetch " + ", ".join(f"{k}: {e}" for k, e in errors.items())
+            )
+        return results
+
+    def _download(self, key: str, etag: str) -> Tuple[str, int]:
+        tmp = self.cache_dir / "tmp" / uuid.uuid4().hex
+        try:
+            with open(tmp, "wb") as f:
+                writer = _HashingWriter(f)
+                self.client.download_fileobj(self.bucket, key, writer)
+            # Multipart ETags ("<md5>-<parts>") are not a content MD5
+            if "-" not in etag and writer.md5.hexdigest() != etag:
+                raise ArtifactFetchError(
+                    f"Checksum mismatch for {key}: etag {etag}, "
+                    f"got {writer.md5.hexdigest()}"
+                )
+            sha256 = writer.sha256.hexdigest()
+            os.replace(tmp, self.object_path(sha256))
+            return sha256, writer.size
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _save_index(self) -> None:
+        tmp = self._index_path.with_name(f".index.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(self._index, indent=2))
+        os.replace(tmp, self._index_path)
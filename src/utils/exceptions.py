@@ -31,3 +31,15 @@ class ConfigurationError(HousingMLError):
     """Raised when configuration is invalid."""
 
     pass
+
+
+class ArtifactFetchError(HousingMLError):
+    """Raised when artifacts cannot be fetched or fail verification."""
+
+    pass
+
+
+class JobCancelledError(HousingMLError):
+    """Raised inside a batch job once it has been cancelled."""
+
+    pass
@@ -0,0 +1,206 @@
+"""
+Feature-schema manifest written next to the model artifacts.
+
+Feature engineering records the ordered feature columns, their dtypes and
+the fitted encoders; training and tuning add each model they produce. Serving reads
+this small JSON file instead of the engineered training table, so the
+training data is not needed at inference time. Training, evaluation and the
+batch runner read their tables through it (`read_with_schema`).
+
+Example (models/feature_schema.json)::
+
+    {
+      "version": 1,
+      "target": "price",
+      "columns": ["median_list_price", ..., "city_full_encoded"],
+      "dtypes": {"median_list_price": "float64", ...},
+      "encoders": {"freq_encoder": {"file": "freq_encoder.pkl", "sha256": ...}},
+      "models": {"xgb_best_model.pkl": {"sha256": ..., "type": ...}}
+    }
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from src.config.settings import settings
+from src.utils.artifact_cache import artifact_cache, file_fingerprint
+from src.utils.exceptions import ConfigurationError
+from src.utils.logging_config import get_logger
+from src.utils.storage import read_columns, read_table
+
+logger = get_logger(__name__)
+
+SCHEMA_VERSION = 1
+SCHEMA_FILENAME = settings.feature_schema_name  # lives next to the model
+
+
+def artifact_info(path: Path | str, obj: Any) -> Dict[str, Any]:
+    """File name, content hash, type and library version of a saved artifact."""
+    cls = type(obj)
+    top = cls.__module__.split(".")[0]
+    return {
+        "file": Path(path).name,
+        "sha256": file_fingerprint(path, hash_contents=True)[2],
+        "type": f"{cls.__module__}.{cls.__qualname__}",
+        "library_version": getattr(sys.modules.get(top), "__version__", None),
+    }
+
+
+@dataclass
+class FeatureSchema:
+    """Ordered model inputs plus the artifacts they were produced with."""
+
+    columns: List[str]
+    dtypes: Dict[str, str]
+    target: str = "price"
+    encoders: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    models: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    version: int = SCHEMA_VERSION
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, target: str = "price") -> "FeatureSchema":
+        """Schema of `df`'s feature columns (everything except `target`)."""
+        X = df.drop(columns=[target], errors="ignore")
+        return cls(
+            columns=list(X.columns),
+            dtypes={c: str(t) for c, t in X.dtypes.items()},
+            target=target,
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "FeatureSchema":
+        """
+        Read a manifest from disk.
+
+        Raises:
+            ConfigurationError: If the manifest version is not supported
+        """
+        data = json.loads(Path(path).read_text())
+        if data.get("version") != SCHEMA_VERSION:
+            raise ConfigurationError(
+                f"Unsupported feature schema version {data.get('version')!r} "
+                f"in {path}"
+            )
+        return cls(**data)
+
+    def save(self, path: Path | str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2))
+        tmp.replace(path)  # readers never see a half-written manifest
+        return path
+
+
+def record_features(
+    path: Path | str,
+    df: pd.DataFrame,
+    encoders: Dict[str, tuple],
+    target: str = "price",
+) -> FeatureSchema:
+    """
+    Write a fresh manifest after feature engineering.
+
+    Previous model entries are dropped: they were trained on older features.
+
+    Args:
+        path: Manifest file
+        df: Engineered training frame (features + target)
+        encoders: name → (saved path, fitted object)
+        target: Target column excluded from the features
+    """
+    schema = FeatureSchema.from_frame(df, target)
+    schema.encoders = {
+        name: artifact_info(p, obj) for name, (p, obj) in encoders.items()
+    }
+    schema.save(path)
+    logger.info("Feature schema written", path=str(path), columns=len(schema.columns))
+    return schema
+
+
+def record_model(
+    path: Path | str, model_path: Path | str, model: Any, X: pd.DataFrame
+) -> FeatureSchema:
+    """
+    Add the trained model to the manifest (creating it if needed).
+
+    The columns the model was fitted on (`X`) are authoritative.
+    """
+    path = Path(path)
+    schema = FeatureSchema.load(path) if path.exists() else None
+    fitted = FeatureSchema.from_frame(X)
+    if schema is None:
+        schema = fitted
+    elif schema.columns != fitted.columns:
+        logger.warning(
+            "Model features differ from engineered schema; using model's",
+            path=str(path),
+        )
+        schema.columns, schema.dtypes = fitted.columns, fitted.dtypes
+    schema.models[Path(model_path).name] = artifact_info(model_path, model)
+    schema.save(path)
+    logger.info("Feature schema updated with model", path=str(path))
+    return schema
+
+
+def load_feature_schema(path: Path | str) -> Optional[FeatureSchema]:
+    """Cached manifest at `path` (reloaded when it changes), None if absent."""
+    if not Path(path).exists():
+        return None
+    return artifact_cache.get(path, loader=FeatureSchema.load)
+
+
+def read_with_schema(
+    path: Path | str, schema_path: Path | str, project: bool = True
+) -> pd.DataFrame:
+    """
+    Read a table using the manifest at `schema_path`; all of it if absent.
+
+    With `project`, only the manifest's features and target are read, in
+    manifest order, and the table must hold exactly those columns. Float
+    features are declared, so CSV reads skip type inference for them;
+    integer ones are left to inference, because eval/holdout tables hold
+    them as floats where an unseen value was filled (``zipcode_freq``).
+
+    Args:
+        path: Table file
+        schema_path: Feature-schema manifest
+        project: Read only the feature and target columns
+
+    Raises:
+        ConfigurationError: If projecting and the table's columns differ
+            from the manifest's (a stale or foreign manifest)
+    """
+    schema = load_feature_schema(schema_path)
+    if schema is None:
+        if project:
+            logger.warning(
+                "No feature schema; reading all columns",
+                path=str(path),
+                schema_path=str(schema_path),
+            )
+        return read_table(path)
+    present = read_columns(path)
+    dtypes = {
+        c: t for c, t in schema.dtypes.items() if c in present and t.startswith("float")
+    }
+    columns = None
+    if project:
+        columns = [*schema.columns, schema.target]
+        missing = [c for c in columns if c not in present]
+        unlisted = [c for c in present if c not in columns]
+        if missing or unlisted:
+            raise ConfigurationError(
+                f"{path} does not match the feature schema {schema_path}: "
+                f"missing {missing}, not in the schema {unlisted}; "
+                "re-run feature engineering into the model directory"
+            )
+    df = read_table(path, columns=columns, dtypes=dtypes)
+    return df if columns is None else df[columns]  # manifest column order
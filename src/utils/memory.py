@@ -0,0 +1,77 @@
+"""
+Per-process memory accounting.
+
+RSS counts every resident page a process maps, so N forked workers that
+share read-only artifact pages each report the full size and RSS sums
+overstate the real footprint. PSS (proportional set size) splits every
+shared page between the processes mapping it, so the PSS of all workers
+adds up to the memory they actually use. Both come from
+``/proc/<pid>/smaps_rollup`` (Linux ≥ 4.14); elsewhere only the peak RSS
+of the current process is available.
+"""
+
+from __future__ import annotations
+
+import os
+import resource
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# smaps_rollup field → report key (values are in kB)
+_FIELDS = {
+    "Rss": "rss_bytes",
+    "Pss": "pss_bytes",
+    "Shared_Clean": "shared_clean_bytes",
+    "Shared_Dirty": "shared_dirty_bytes",
+    "Private_Clean": "private_clean_bytes",
+    "Private_Dirty": "private_dirty_bytes",
+}
+
+
+def memory_report(pid: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Resident memory of one process, split into shared and private pages.
+
+    Args:
+        pid: Process to inspect; None for the current process
+
+    Returns:
+        ``pid``, ``rss_bytes``, ``pss_bytes``, ``shared_bytes`` and
+        ``private_bytes`` (plus the raw clean/dirty split); without
+        smaps_rollup only ``pid`` and ``max_rss_bytes`` of this process
+    """
+    pid = os.getpid() if pid is None else pid
+    path = Path(f"/proc/{pid}/smaps_rollup")
+    try:
+        text = path.read_text()
+    except OSError:
+        if pid != os.getpid():
+            return {"pid": pid, "available": False}
+        # ru_maxrss is kB on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        return {"pid": pid, "available": False, "max_rss_bytes": peak}
+
+    report: Dict[str, Any] = {"pid": pid, "available": True}
+    for line in text.splitlines():
+        name, _, value = line.partition(":")
+        if name in _FIELDS:
+            report[_FIELDS[name]] = int(value.split()[0]) * 1024
+    report["shared_bytes"] = report.get("shared_clean_bytes", 0) + report.get(
+        "shared_dirty_bytes", 0
+    )
+    report["private_bytes"] = report.get("private_clean_bytes", 0) + report.get(
+        "private_dirty_bytes", 0
+    )
+    return report
+
+
+def total_memory(pids: Iterable[int]) -> Dict[str, Any]:
+    """Per-process reports for `pids` plus their summed RSS and PSS."""
+    reports: List[Dict[str, Any]] = [memory_report(pid) for pid in pids]
+    return {
+        "processes": reports,
+        "rss_bytes": sum(r.get("rss_bytes", 0) for r in reports),
+        "pss_bytes": sum(r.get("pss_bytes", 0) for r in reports),
+    }
@@ -0,0 +1,246 @@
+"""
+In-process Prometheus-style metrics (text exposition format 0.0.4).
+
+A deliberately small registry: counters and histograms with labels,
+rendered as plain text at /metrics, so no Prometheus client library or
+external service is needed. Everything is gated by
+``settings.enable_metrics``; when disabled, instrumentation points get
+shared no-op objects and cost a single attribute check.
+
+Note: with EXECUTION_BACKEND=process, metrics recorded inside pool workers
+(predict stages, artifact loads) stay in those workers; request-level
+metrics are always recorded in the API process.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.config.settings import settings
+from src.utils.tracing import TraceStopwatch, current_trace
+
+# Default latency buckets (seconds): 0.1 ms … 10 s
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Row-count buckets for batch sizes
+ROW_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+# Long-running jobs (seconds)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+# Artifact deserialization (seconds): 1 ms … 60 s
+ARTIFACT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> None:
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, v in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_format_labels(self.labelnames, labels)} "
+                    f"{_format_value(v)}"
+                )
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """
+        Raises:
+            ValueError: If `buckets` is not strictly increasing
+        """
+        if any(a >= b for a, b in zip(buckets, buckets[1:])):
+            raise ValueError(
+                f"Histogram {name} buckets must be strictly increasing: {buckets}"
+            )
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels → [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class Stopwatch:
+    """
+    Lap timer for consecutive pipeline stages.
+
+    Each `lap(stage, rows)` observes the time since the previous lap (or
+    since creation) under that stage label, so stages can be timed without
+    restructuring the code into nested blocks. `rows` (rows out of the
+    stage) is only used by the tracer (see `src.utils.tracing`).
+    """
+
+    __slots__ = ("hist", "last")
+
+    def __init__(self, hist: Histogram) -> None:
+        self.hist = hist
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str, rows: Optional[int] = None) -> None:
+        now = time.perf_counter()
+        self.hist.observe(now - self.last, stage)
+        self.last = now
+
+
+class _NullStopwatch:
+    __slots__ = ()
+
+    def lap(self, stage: str, rows: Optional[int] = None) -> None:
+        pass
+
+
+_NULL_STOPWATCH = _NullStopwatch()
+
+
+class Registry:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._metrics: List[Counter | Histogram] = []
+
+    def counter(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, doc, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        doc: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, doc, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(enabled=settings.enable_metrics)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests", ("method", "path", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "path")
+)
+PREDICT_STAGE_SECONDS = REGISTRY.histogram(
+    "predict_stage_duration_seconds",
+    "Time spent in each inference pipeline stage",
+    ("stage",),
+)
+PREDICT_BATCH_ROWS = REGISTRY.histogram(
+    "predict_batch_rows", "Rows per model call", buckets=ROW_BUCKETS
+)
+REQUEST_ROWS = REGISTRY.histogram(
+    "predict_request_rows", "Records per /predict request", buckets=ROW_BUCKETS
+)
+ARTIFACT_LOAD_SECONDS = REGISTRY.histogram(
+    "artifact_load_duration_seconds",
+    "Time to deserialize an artifact",
+    ("artifact",),
+    buckets=ARTIFACT_BUCKETS,
+)
+PREDICTION_CACHE_ROWS = REGISTRY.counter(
+    "prediction_cache_rows_total", "Prediction cache lookups", ("result",)
+)
+BATCH_JOB_SECONDS = REGISTRY.histogram(
+    "batch_job_duration_seconds", "Monthly batch job wall time", buckets=JOB_BUCKETS
+)
+
+
+def stage_stopwatch(
+    rows_in: Optional[int] = None,
+) -> Stopwatch | TraceStopwatch | _NullStopwatch:
+    """
+    Stopwatch feeding predict_stage_duration_seconds (no-op if disabled).
+
+    Inside a `tracing()` block the stages are also recorded in the trace,
+    whether or not metrics are enabled.
+    """
+    trace = current_trace()
+    if trace is not None:
+        hist = PREDICT_STAGE_SECONDS if REGISTRY.enabled else None
+        return trace.stopwatch(rows_in, hist)
+    if not REGISTRY.enabled:
+        return _NULL_STOPWATCH
+    return Stopwatch(PREDICT_STAGE_SECONDS)
@@ -0,0 +1,180 @@
+"""
+Table storage for pipeline intermediates.
+
+Every stage reads and writes its tables through `read_table` / `write_table`
+so the on-disk format is a single setting (STORAGE_FORMAT):
+
+- ``csv``:     human-readable, re-parsed (and type-inferred) on every read
+- ``parquet``: columnar, compressed, typed; supports column projection
+- ``feather``: Arrow IPC, uncompressed and the fastest to read back
+
+The format of an existing file is taken from its suffix, so raw CSV inputs
+keep working whatever the configured format is.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from src.config.settings import STORAGE_SUFFIXES, settings
+from src.utils.exceptions import ConfigurationError
+
+FORMATS = tuple(STORAGE_SUFFIXES)
+
+
+def table_format(path: Path | str) -> str:
+    """Storage format of a table file, from its suffix."""
+    suffix = Path(path).suffix.lower()
+    for fmt, ext in STORAGE_SUFFIXES.items():
+        if suffix == ext:
+            return fmt
+    raise ConfigurationError(f"Unsupported table format for {path}")
+
+
+def table_path(stem: Path | str, fmt: Optional[str] = None) -> Path:
+    """
+    Path for a table named `stem` in the given (default: configured) format.
+
+    Example: ``table_path("data/processed/cleaning_train")`` →
+    ``data/processed/cleaning_train.parquet`` when STORAGE_FORMAT=parquet.
+    Any existing suffix on `stem` is replaced.
+    """
+    fmt = fmt or settings.storage_format
+    if fmt not in STORAGE_SUFFIXES:
+        raise ConfigurationError(
+            f"Unknown storage format {fmt!r}; expected one of {FORMATS}"
+        )
+    return Path(stem).with_suffix(STORAGE_SUFFIXES[fmt])
+
+
+def read_table(
+    path: Path | str,
+    columns: Optional[Sequence[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Read a table, dispatching on the file suffix.
+
+    Args:
+        path: Table file (.csv, .parquet or .feather)
+        columns: Only read these columns (projection pushed to the reader)
+        dtypes: Explicit column dtypes; skips CSV type inference for them
+
+    Returns:
+        The table as a DataFrame
+    """
+    fmt = table_format(path)
+    cols = list(columns) if columns is not None else None
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=cols, dtype=dtypes)
+    if fmt == "parquet":
+        df = pd.read_parquet(path, columns=cols)
+    else:
+        df = pd.read_feather(path, columns=cols)
+    if dtypes:
+        df = df.astype({c: t for c, t in dtypes.items() if c in df.columns})
+    return df
+
+
+def read_columns(path: Path | str) -> List[str]:
+    """Column names of a table without reading its rows."""
+    fmt = table_format(path)
+    if fmt == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    if fmt == "parquet":
+        return list(pq.read_schema(path).names)
+    with ipc.open_file(path) as reader:
+        return list(reader.schema.names)
+
+
+def write_table(df: pd.DataFrame, path: Path | str) -> Path:
+    """
+    Write `df` (without its index) in the format implied by `path`.
+
+    Returns:
+        The path written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fmt = table_format(path)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(path)
+    return path
+
+
+class TableWriter:
+    """
+    Append DataFrames to one table file, chunk by chunk.
+
+    Produces the same file contents as one `write_table` of the
+    concatenated chunks, provided every chunk has the same columns and
+    dtypes. Parquet gets one row group per chunk.
+
+    Example::
+
+        with TableWriter(table_path("data/raw/train")) as out:
+            for chunk in chunks:
+                out.write(chunk)
+    """
+
+    def __init__(self, path: Path | str, date_format: Optional[str] = None) -> None:
+        """
+        Args:
+            path: Table file to (over)write; format from its suffix
+            date_format: strftime format for datetime columns (CSV only)
+        """
+        self.path = Path(path)
+        self.format = table_format(self.path)
+        self.date_format = date_format
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append `df` (without its index)."""
+        if self.format == "csv":
+            header = self._writer is None
+            if header:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._writer = open(self.path, "w", newline="")
+            df.to_csv(
+                self._writer, header=header, index=False, date_format=self.date_format
+            )
+        else:
+            import pyarrow as pa
+            import pyarrow.ipc as ipc
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._schema = table.schema
+                if self.format == "parquet":
+                    self._writer = pq.ParquetWriter(self.path, self._schema)
+                else:
+                    self._writer = ipc.new_file(self.path, self._schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self) -> Path:
+        """Finish the file; returns its path (nothing is written if no chunk was)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.path
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
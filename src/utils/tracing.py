@@ -0,0 +1,179 @@
+"""
+Opt-in per-call stage tracing for the inference pipeline.
+
+While a `tracing()` block is active (in the current thread / task), every
+pipeline stage timed through `metrics.stage_stopwatch` is also recorded in
+the active `Trace`: wall time, CPU time, rows in/out and the bytes
+allocated during the stage (via tracemalloc). Outside such a block the only
+cost is one ContextVar lookup per stopwatch.
+
+Notes:
+- CPU time is process-wide (`time.process_time`), so it includes the
+  booster's native threads but also any concurrent request in the process.
+- tracemalloc slows allocation-heavy code while it is on; traced wall times
+  are therefore an upper bound.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+_active: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+# tracemalloc is process-global: keep it on while any trace needs it
+_tracemalloc_users = 0
+_tracemalloc_owned = False  # started by us, so ours to stop
+_tracemalloc_lock = threading.Lock()
+
+_FIELDS = ("wall_ms", "cpu_ms", "rows_in", "rows_out", "alloc_bytes", "net_bytes")
+
+
+class Trace:
+    """Per-stage totals for one traced call."""
+
+    def __init__(self, memory: bool = True) -> None:
+        self.memory = memory
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self.total_ms: Optional[float] = None
+        self.cpu_ms: Optional[float] = None
+
+    def stopwatch(self, rows_in: Optional[int], hist: Any = None) -> "TraceStopwatch":
+        return TraceStopwatch(self, rows_in, hist)
+
+    def record(self, stage: str, **values: float) -> None:
+        entry = self.stages.setdefault(stage, {"calls": 0, **dict.fromkeys(_FIELDS, 0)})
+        entry["calls"] += 1
+        for k, v in values.items():
+            entry[k] += v
+
+    def finish(self) -> None:
+        self.total_ms = 1000.0 * (time.perf_counter() - self._start)
+        self.cpu_ms = 1000.0 * (time.process_time() - self._cpu_start)
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-ready summary; stages in first-seen order."""
+        if self.total_ms is None:
+            self.finish()
+        stages = [{"stage": name, **values} for name, values in self.stages.items()]
+        return {
+            "total_ms": self.total_ms,
+            "cpu_ms": self.cpu_ms,
+            "untracked_ms": self.total_ms - sum(s["wall_ms"] for s in stages),
+            "memory_tracked": self.memory,
+            "stages": stages,
+        }
+
+
+class TraceStopwatch:
+    """`metrics.Stopwatch` counterpart that also records into a Trace."""
+
+    __slots__ = ("trace", "hist", "rows", "last", "cpu", "mem")
+
+    def __init__(self, trace: Trace, rows_in: Optional[int], hist: Any) -> None:
+        self.trace = trace
+        self.hist = hist
+        self.rows = rows_in or 0
+        self._reset()
+
+    def _reset(self) -> None:
+        if self.trace.memory:
+            tracemalloc.reset_peak()
+            self.mem = tracemalloc.get_traced_memory()[0]
+        self.cpu = time.process_time()
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str, rows: Optional[int] = None) -> None:
+        now = time.perf_counter()
+        cpu = time.process_time()
+        alloc = net = 0
+        if self.trace.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            alloc, net = max(peak - self.mem, 0), current - self.mem
+        rows_out = self.rows if rows is None else rows
+        self.trace.record(
+            stage,
+            wall_ms=1000.0 * (now - self.last),
+            cpu_ms=1000.0 * (cpu - self.cpu),
+            rows_in=self.rows,
+            rows_out=rows_out,
+            alloc_bytes=alloc,
+            net_bytes=net,
+        )
+        if self.hist is not None:
+            self.hist.observe(now - self.last, stage)
+        self.rows = rows_out
+        self._reset()
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace active in this context, if any."""
+    return _active.get()
+
+
+@contextmanager
+def tracing(memory: bool = True) -> Iterator[Trace]:
+    """
+    Record pipeline stages run inside the block.
+
+    Args:
+        memory: Track allocated bytes per stage (turns tracemalloc on)
+
+    Yields:
+        The Trace being filled; call `report()` after the block
+    """
+    global _tracemalloc_users, _tracemalloc_owned
+    if memory:
+        with _tracemalloc_lock:
+            if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracemalloc_owned = True
+            _tracemalloc_users += 1
+    trace = Trace(memory=memory)
+    token = _active.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        _active.reset(token)
+        if memory:
+            with _tracemalloc_lock:
+                _tracemalloc_users -= 1
+                if _tracemalloc_users == 0 and _tracemalloc_owned:
+                    tracemalloc.stop()
+                    _tracemalloc_owned = False
+
+
+def run_traced(
+    fn: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Call `fn` under `tracing()` and return ``(result, trace report)``.
+
+    Module-level and returning plain data, so it can be shipped to thread
+    or process pools in place of `fn`.
+    """
+    with tracing() as trace:
+        result = fn(*args, **kwargs)
+    return result, trace.report()
+
+
+def merge_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum several trace reports (e.g. one per chunk) stage by stage."""
+    merged = Trace(memory=all(r["memory_tracked"] for r in reports))
+    merged.total_ms = sum(r["total_ms"] for r in reports)
+    merged.cpu_ms = sum(r["cpu_ms"] for r in reports)
+    for r in reports:
+        for s in r["stages"]:
+            entry = merged.stages.setdefault(
+                s["stage"], {"calls": 0, **dict.fromkeys(_FIELDS, 0)}
+            )
+            for k in ("calls", *_FIELDS):
+                entry[k] += s[k]
+    return merged.report()
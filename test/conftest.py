@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from joblib import dump
+from xgboost import XGBRegressor
+
+from src.feature_pipeline.feature_engineering import (
+    add_date_features,
+    drop_unused_columns,
+    frequency_encode,
+    target_encode,
+)
+
+CITIES = ["Austin-Round Rock-Georgetown", "Denver–Aurora–Lakewood", "Boise City"]
+
+
+def make_raw_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic raw rows shaped like the Redfin holdout data."""
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime("2022-01-01") + pd.to_timedelta(
+        rng.integers(0, 700, n), unit="D"
+    )
+    return pd.DataFrame(
+        {
+            "date": dates.strftime("%Y-%m-%d"),
+            "city_full": rng.choice(CITIES + ["Unknown Metro"], n),
+            "zipcode": rng.choice([1000, 2000, 3000, 4000], n),
+            "median_list_price": rng.uniform(1e5, 1e6, n).round(2),
+            "median_sale_price": rng.uniform(1e5, 1e6, n).round(2),
+            "homes_sold": rng.integers(1, 200, n),
+            "median_dom": rng.uniform(5, 90, n).round(1),
+            "lat": rng.uniform(30, 45, n).round(4),
+            "lng": rng.uniform(-120, -90, n).round(4),
+            "price": rng.uniform(1e5, 1e6, n).round(2),
+        }
+    )
+
+
+@pytest.fixture(scope="session")
+def raw_frame():
+    """Factory fixture for synthetic raw input frames."""
+    return make_raw_frame
+
+
+@pytest.fixture(scope="session")
+def artifacts(tmp_path_factory):
+    """Train a tiny model + encoders and save them like the real pipeline."""
+    out = tmp_path_factory.mktemp("models")
+    train = make_raw_frame(400, seed=1)
+    train["city_full"] = train["city_full"].str.lower()
+    train = add_date_features(train)
+    train, _, freq_map = frequency_encode(train, train.copy(), "zipcode")
+    train, _, te = target_encode(train, train.copy(), "city_full", "price")
+    train, _ = drop_unused_columns(train, train.copy())
+
+    X, y = train.drop(columns=["price"]), train["price"]
+    model = XGBRegressor(n_estimators=20, max_depth=3, random_state=0)
+    model.fit(X, y)
+
+    paths = {
+        "model_path": out / "xgb_model.pkl",
+        "freq_encoder_path": out / "freq_encoder.pkl",
+        "target_encoder_path": out / "target_encoder.pkl",
+    }
+    dump(model, paths["model_path"])
+    dump(freq_map, paths["freq_encoder_path"])
+    dump(te, paths["target_encoder_path"])
+    return {"paths": paths, "feature_columns": list(X.columns)}
@@ -0,0 +1,644 @@
+import hashlib
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.api.readiness import Readiness
+from src.utils.artifact_fetcher import ArtifactFetcher
+from src.utils.exceptions import ArtifactFetchError
+from src.utils.feature_schema import record_features
+
+
+class DirectoryS3:
+    """Directory-backed stand-in for the boto3 S3 client calls we use."""
+
+    def __init__(self, root, gate=None):
+        self.root = root
+        self.gate = gate  # optional Event that downloads wait on
+        self.downloads = []
+        self.bad_etag = set()
+
+    def put(self, key, data: bytes):
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def head_object(self, Bucket, Key):
+        data = (self.root / Key).read_bytes()
+        etag = "0" * 32 if Key in self.bad_etag else hashlib.md5(data).hexdigest()
+        return {"ETag": f'"{etag}"', "ContentLength": len(data)}
+
+    def download_fileobj(self, Bucket, Key, Fileobj):
+        if self.gate is not None:
+            self.gate.wait(timeout=10)
+        self.downloads.append(Key)
+        data = (self.root / Key).read_bytes()
+        for i in range(0, len(data), 4):
+            Fileobj.write(data[i : i + 4])
+
+
+@pytest.fixture
+def s3(tmp_path):
+    fake = DirectoryS3(tmp_path / "bucket")
+    fake.put("models/model.pkl", b"model-v1")
+    fake.put("models/encoder.pkl", b"encoder-v1")
+    return fake
+
+
+def test_fetcher_downloads_once_and_refreshes_on_etag_change(s3, tmp_path):
+    specs = {
+        "models/model.pkl": tmp_path / "models/model.pkl",
+        "models/encoder.pkl": tmp_path / "models/encoder.pkl",
+    }
+    fetcher = ArtifactFetcher(s3, "bucket", tmp_path / "cache")
+
+    results = fetcher.fetch_all(specs)
+    assert sorted(s3.downloads) == sorted(specs)
+    assert specs["models/model.pkl"].read_bytes() == b"model-v1"
+    sha = hashlib.sha256(b"model-v1").hexdigest()
+    assert results["models/model.pkl"].sha256 == sha
+    assert fetcher.object_path(sha).exists()
+
+    # Unchanged objects are not downloaded again (even by a new process)
+    fetcher = ArtifactFetcher(s3, "bucket", tmp_path / "cache")
+    results = fetcher.fetch_all(specs)
+    assert len(s3.downloads) == 2
+    assert not any(r.downloaded for r in results.values())
+
+    # A locally clobbered target is restored from the cache, not S3
+    specs["models/encoder.pkl"].write_bytes(b"garbage!")
+    fetcher.fetch_all(specs)
+    assert specs["models/encoder.pkl"].read_bytes() == b"encoder-v1"
+    assert len(s3.downloads) == 2
+
+    # A new object version is fetched and swapped in
+    s3.put("models/model.pkl", b"model-v2")
+    fetcher.fetch_all(specs)
+    assert s3.downloads[-1] == "models/model.pkl"
+    assert specs["models/model.pkl"].read_bytes() == b"model-v2"
+    print("✅ Artifact fetcher cache test passed")
+
+
+def test_fetcher_rejects_checksum_mismatch(s3, tmp_path):
+    s3.bad_etag.add("models/model.pkl")
+    target = tmp_path / "models/model.pkl"
+    fetcher = ArtifactFetcher(s3, "bucket", tmp_path / "cache")
+
+    with pytest.raises(ArtifactFetchError, match="models/model.pkl"):
+        fetcher.fetch_all({"models/model.pkl": target})
+    assert not target.exists()
+    assert not any((tmp_path / "cache/objects").iterdir())
+    print("✅ Artifact fetcher checksum test passed")
+
+
+def test_api_not_ready_until_background_fetch_completes(s3, tmp_path, monkeypatch):
+    gate = threading.Event()
+    s3.gate = gate
+    specs = {
+        "models/model.pkl": tmp_path / "models/model.pkl",
+        "models/encoder.pkl": tmp_path / "models/encoder.pkl",
+    }
+    monkeypatch.setattr(main, "ARTIFACT_SPECS", specs)
+    monkeypatch.setattr(main, "make_s3_client", lambda: s3)
+    monkeypatch.setattr(main, "readiness", Readiness())
+    monkeypatch.setattr(main.settings, "artifact_source", "s3")
+    monkeypatch.setattr(main.settings, "artifact_cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(main.settings, "api_key", "test-key")
+    monkeypatch.setattr(main.settings, "warmup_requests", 0)
+
+    with TestClient(main.app) as client:
+        assert client.get("/ready").status_code == 503
+        resp = client.post(
+            "/predict", json=[{"zipcode": 1}], headers={"X-API-Key": "test-key"}
+        )
+        assert resp.status_code == 503
+
+        gate.set()
+        for _ in range(100):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.05)
+        report = client.get("/ready").json()
+
+    assert report["ready"] and report["artifacts"] == "ready"
+    assert report["warmup"] == "skipped"
+    assert set(report["fetched"]) == set(specs)
+    assert (tmp_path / "models/model.pkl").read_bytes() == b"model-v1"
+    print("✅ Background fetch readiness test passed")
+
+
+def _row_counts():
+    """Sample counts of the request-rows and rows-per-model-call histograms."""
+    from src.utils.metrics import PREDICT_BATCH_ROWS, REQUEST_ROWS
+
+    return [
+        sum(s[2] for s in m._series.values())
+        for m in (REQUEST_ROWS, PREDICT_BATCH_ROWS)
+    ]
+
+
+def test_ready_after_warmup_through_predict_path(
+    artifacts, raw_frame, tmp_path, monkeypatch
+):
+    from src.inference_pipeline import plan
+    from src.inference_pipeline.prediction_cache import PredictionCache
+
+    paths = artifacts["paths"]
+    schema_path = tmp_path / "feature_schema.json"
+    record_features(schema_path, pd.DataFrame(columns=artifacts["feature_columns"]), {})
+    monkeypatch.setattr(main, "ARTIFACT_SPECS", dict(paths))
+    monkeypatch.setattr(main, "ARTIFACT_PATHS", paths)
+    monkeypatch.setattr(main, "SCHEMA_PATH", schema_path)
+    monkeypatch.setattr(main, "readiness", Readiness())
+    monkeypatch.setattr(main.settings, "artifact_source", "local")
+    monkeypatch.setattr(main, "MODEL_PATH", paths["model_path"])
+    monkeypatch.setattr(main.settings, "warmup_requests", 6)
+    monkeypatch.setattr(main.settings, "api_key", "test-key")
+    cache = PredictionCache(1000)
+    monkeypatch.setattr(plan, "prediction_cache", cache)
+    before = _row_counts()
+
+    with TestClient(main.app) as client:
+        for _ in range(200):
+            resp = client.get("/ready")
+            if resp.status_code == 200 or resp.json()["warmup"] == "failed":
+                break
+            time.sleep(0.05)
+        report = resp.json()
+        warm = _row_counts()
+        records = raw_frame(3, seed=12).to_dict(orient="records")
+        client.post("/predict", json=records, headers={"X-API-Key": "test-key"})
+
+    assert resp.status_code == 200, report
+    assert report["warmup"] == "done" and report["warmup_attempts"] == 1
+    stats = report["warmup_latency"]
+    assert stats["requests"] == 6
+    assert 0 < stats["p50_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+    # Synthetic traffic leaves no cache entries and no row samples; real does
+    assert warm == before
+    assert _row_counts() == [before[0] + 1, before[1] + 1]
+    assert cache.stats()["entries"] > 0
+    print("✅ Warm-up readiness test passed")
+
+
+def test_metrics_exposition_covers_requests_and_predict_stages(
+    artifacts, raw_frame, tmp_path, monkeypatch
+):
+    paths = artifacts["paths"]
+    schema_path = tmp_path / "feature_schema.json"
+    record_features(schema_path, pd.DataFrame(columns=artifacts["feature_columns"]), {})
+    monkeypatch.setattr(main, "ARTIFACT_SPECS", dict(paths))
+    monkeypatch.setattr(main, "ARTIFACT_PATHS", paths)
+    monkeypatch.setattr(main, "SCHEMA_PATH", schema_path)
+    monkeypatch.setattr(main, "readiness", Readiness())
+    monkeypatch.setattr(main.settings, "artifact_source", "local")
+    # One single-record payload (record path) and one large one (frame path)
+    monkeypatch.setattr(main.settings, "warmup_requests", 2)
+    monkeypatch.setattr(main, "MODEL_PATH", paths["model_path"])
+    monkeypatch.setattr(main.settings, "api_key", "test-key")
+    records = raw_frame(3, seed=13).to_dict(orient="records")
+
+    with TestClient(main.app) as client:
+        for _ in range(200):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.05)
+        client.post("/predict", json=records, headers={"X-API-Key": "test-key"})
+        resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert "# TYPE http_requests_total counter" in text
+    assert 'http_requests_total{method="GET",path="/ready",status="200"}' in text
+    assert 'http_request_duration_seconds_count{method="GET",path="/ready"}' in text
+    for stage in ("preprocess", "date_features", "encoding", "alignment"):
+        assert f'predict_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'predict_stage_duration_seconds_bucket{stage="model_predict",le="+Inf"}' in (
+        text
+    )
+    assert "predict_batch_rows_count" in text and "predict_request_rows_count" in text
+    print("✅ Metrics exposition test passed")
+
+
+def test_metrics_disabled_is_a_no_op(monkeypatch):
+    from src.utils import metrics
+
+    monkeypatch.setattr(metrics.REGISTRY, "enabled", False)
+    sw = metrics.stage_stopwatch()
+    sw.lap("preprocess")
+    assert sw is metrics.stage_stopwatch()  # shared null object
+
+    with TestClient(main.app) as client:
+        assert client.get("/metrics").status_code == 404
+    print("✅ Metrics disabled test passed")
+
+
+def test_histogram_renders_cumulative_buckets():
+    from src.utils.metrics import REGISTRY, Registry
+
+    registry = Registry()
+    hist = registry.histogram("job_seconds", "Job time", ("kind",), buckets=(1, 5))
+    for v in (0.5, 2, 3, 10):
+        hist.observe(v, "a")
+    lines = registry.render().splitlines()
+
+    assert 'job_seconds_bucket{kind="a",le="1"} 1' in lines
+    assert 'job_seconds_bucket{kind="a",le="5"} 3' in lines
+    assert 'job_seconds_bucket{kind="a",le="+Inf"} 4' in lines
+    assert 'job_seconds_sum{kind="a"} 15.5' in lines
+    assert 'job_seconds_count{kind="a"} 4' in lines
+
+    for bad in ((1, 5, 1, 10), (1, 1, 5)):
+        with pytest.raises(ValueError):
+            registry.histogram("bad_seconds", "Bad", buckets=bad)
+    for metric in REGISTRY._metrics:  # every built-in histogram is well-formed
+        buckets = getattr(metric, "buckets", ())
+        assert list(buckets) == sorted(set(buckets)), metric.name
+    print("✅ Histogram exposition test passed")
+
+
+def test_predict_returns_trace_with_profile_header(artifacts, raw_frame, monkeypatch):
+    paths = artifacts["paths"]
+    monkeypatch.setattr(main, "ARTIFACT_PATHS", paths)
+    monkeypatch.setattr(main, "MODEL_PATH", paths["model_path"])
+    monkeypatch.setattr(main, "readiness", Readiness())
+    monkeypatch.setattr(main, "sync_artifacts", _mark_ready)
+    monkeypatch.setattr(main.settings, "api_key", "test-key")
+    records = raw_frame(3, seed=16).to_dict(orient="records")
+
+    with TestClient(main.app) as client:
+        headers = {"X-API-Key": "test-key"}
+        plain = client.post("/predict", json=records, headers=headers).json()
+        disabled = client.post(
+            "/predict", json=records, headers={**headers, "X-Profile": "1"}
+        )
+        monkeypatch.setattr(main.settings, "enable_profiling", True)
+        traced = client.post(
+            "/predict", json=records, headers={**headers, "X-Profile": "1"}
+        ).json()
+
+    assert disabled.status_code == 403
+    assert "trace" not in plain
+    assert traced["predictions"] == plain["predictions"]
+    stages = [s["stage"] for s in traced["trace"]["stages"]]
+    assert stages[0] == "preprocess" and stages[-1] == "model_predict"
+    assert traced["trace"]["stages"][0]["rows_in"] == 3
+    print("✅ Profile header test passed")
+
+
+def test_micro_batched_predict_resolves_plan_once(artifacts, raw_frame, monkeypatch):
+    from src.api.batching import MicroBatcher
+    from src.inference_pipeline import inference
+
+    paths = artifacts["paths"]
+    monkeypatch.setattr(main, "ARTIFACT_PATHS", paths)
+    monkeypatch.setattr(main, "MODEL_PATH", paths["model_path"])
+    monkeypatch.setattr(main, "readiness", Readiness())
+    monkeypatch.setattr(main, "sync_artifacts", _mark_ready)
+    monkeypatch.setattr(main.settings, "api_key", "test-key")
+    records = raw_frame(20, seed=18).to_dict(orient="records")
+    headers = {"X-API-Key": "test-key"}
+
+    with TestClient(main.app) as client:
+        plain = client.post("/predict", json=records, headers=headers).json()
+        monkeypatch.setattr(
+            main, "batcher", MicroBatcher(window_ms=1, runner=main.backend.run)
+        )
+        lookups = []
+        get_plan = inference.get_inference_plan
+        monkeypatch.setattr(
+            inference,
+            "get_inference_plan",
+            lambda *a, **kw: lookups.append(a) or get_plan(*a, **kw),
+        )
+        batched = client.post("/predict", json=records, headers=headers).json()
+
+    assert len(lookups) == 1
+    assert batched["predictions"] == plain["predictions"]
+    assert main.batcher.stats()["requests"] == 1
+    print("✅ Micro-batched plan lookup test passed")
+
+
+def test_warmup_retries_with_backoff_before_failing(monkeypatch):
+    import asyncio
+
+    from src.api import readiness as readiness_module
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(readiness_module.asyncio, "sleep", fake_sleep)
+    calls = []
+
+    async def flaky(payload):
+        calls.append(payload)
+        if len(calls) == 2:  # the first pass fails on its second payload
+            raise RuntimeError("backend not up yet")
+
+    r = Readiness()
+    r.artifacts = "ready"
+    asyncio.run(r.warm_up(flaky, [[{}], [{}]], retries=2, backoff_seconds=0.5))
+    assert r.ready and r.warmup == "done" and r.error is None
+    assert r.warmup_attempts == 2 and sleeps == [0.5]
+    assert r.warmup_stats()["requests"] == 2  # latencies of the passing pass
+
+    async def broken(payload):
+        raise RuntimeError("model is corrupt")
+
+    sleeps.clear()
+    r = Readiness()
+    r.artifacts = "ready"
+    asyncio.run(r.warm_up(broken, [[{}]], retries=2, backoff_seconds=0.5))
+    assert not r.ready and r.warmup == "failed"
+    assert r.warmup_attempts == 3 and sleeps == [0.5, 1.0]
+    assert "model is corrupt" in r.report()["error"]
+    print("✅ Warm-up retry test passed")
+
+
+async def _mark_ready():
+    main.readiness.artifacts = "ready"
+    main.readiness.warmup = "skipped"
+
+
+def test_predict_content_negotiation(artifacts, raw_frame, monkeypatch):
+    import msgpack
+    import pyarrow as pa
+
+    from src.api import codecs
+
+    paths = artifacts["paths"]
+    monkeypatch.setattr(main, "ARTIFACT_PATHS", paths)
+    monkeypatch.setattr(main, "MODEL_PATH", paths["model_path"])
+    monkeypatch.setattr(main, "readiness", Readiness())
+    monkeypatch.setattr(main, "sync_artifacts", _mark_ready)
+    monkeypatch.setattr(main.settings, "api_key", "test-key")
+    monkeypatch.setattr(main.settings, "fast_path_max_rows", 4)
+    df = raw_frame(30, seed=17)
+    auth = {"X-API-Key": "test-key"}
+
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    with TestClient(main.app) as client:
+        records = client.post(
+            "/predict", json=df.to_dict(orient="records"), headers=auth
+        )
+        columns = client.post("/predict", json=df.to_dict(orient="list"), headers=auth)
+        small = client.post(
+            "/predict", json=df.head(2).to_dict(orient="list"), headers=auth
+        )
+        arrow = client.post(
+            "/predict",
+            content=sink.getvalue().to_pybytes(),
+            headers={
+                **auth,
+                "Content-Type": codecs.ARROW,
+                "Accept": f"{codecs.ARROW}, {codecs.JSON}",
+            },
+        )
+        unsupported = client.post(
+            "/predict",
+            content=b"a,b\n1,2",
+            headers={**auth, "Content-Type": "text/csv"},
+        )
+        packed = client.post(
+            "/predict",
+            content=msgpack.packb(df.to_dict(orient="list")),
+            headers={**auth, "Content-Type": codecs.MSGPACK, "Accept": codecs.MSGPACK},
+        )
+        packed_records = client.post(
+            "/predict",
+            content=msgpack.packb(df.head(2).to_dict(orient="records")),
+            headers={**auth, "Content-Type": codecs.MSGPACK},
+        )
+        bad_shape = client.post("/predict", json={"a": 1}, headers=auth)
+
+    assert records.status_code == 200
+    expected = records.json()["predictions"]
+    assert len(expected) == 30
+    np.testing.assert_allclose(columns.json()["predictions"], expected, rtol=1e-6)
+    np.testing.assert_allclose(small.json()["predictions"], expected[:2], rtol=1e-6)
+
+    assert arrow.headers["content-type"] == codecs.ARROW
+    result = pa.ipc.open_stream(arrow.content).read_all()
+    np.testing.assert_allclose(result["predictions"].to_numpy(), expected, rtol=1e-6)
+    np.testing.assert_allclose(
+        result["actuals"].to_numpy(), records.json()["actuals"], rtol=1e-6
+    )
+
+    assert packed.headers["content-type"] == codecs.MSGPACK
+    result = msgpack.unpackb(packed.content)
+    np.testing.assert_allclose(result["predictions"], expected, rtol=1e-6)
+    np.testing.assert_allclose(result["actuals"], records.json()["actuals"], rtol=1e-6)
+    assert packed_records.headers["content-type"] == codecs.JSON
+    np.testing.assert_allclose(
+        packed_records.json()["predictions"], expected[:2], rtol=1e-6
+    )
+
+    assert unsupported.status_code == 415
+    assert bad_shape.status_code == 422
+    print("✅ Content negotiation test passed")
+
+
+def test_predict_rejects_nested_field_values(artifacts, raw_frame, monkeypatch):
+    paths = artifacts["paths"]
+    monkeypatch.setattr(main, "ARTIFACT_PATHS", paths)
+    monkeypatch.setattr(main, "MODEL_PATH", paths["model_path"])
+    monkeypatch.setattr(main, "readiness", Readiness())
+    monkeypatch.setattr(main, "sync_artifacts", _mark_ready)
+    monkeypatch.setattr(main.settings, "api_key", "test-key")
+    monkeypatch.setattr(main.settings, "fast_path_max_rows", 4)
+    auth = {"X-API-Key": "test-key"}
+
+    with TestClient(main.app) as client:
+        # Record path (2 rows) and DataFrame path (20 rows), list and object
+        for n, field, value in ((2, "homes_sold", [1, 2]), (20, "city_full", {})):
+            records = raw_frame(n, seed=19).to_dict(orient="records")
+            records[-1][field] = value
+            resp = client.post("/predict", json=records, headers=auth)
+            assert resp.status_code == 422, resp.text
+            assert field in resp.json()["detail"]
+
+    print("✅ Nested field value rejection test passed")
+
+
+def test_latest_predictions_pages_through_catalog(tmp_path, monkeypatch):
+    from src.batch.catalog import record_output, write_indexed
+
+    monkeypatch.setattr(main.settings, "predictions_dir", str(tmp_path))
+    monkeypatch.setattr(main, "sync_artifacts", _mark_ready)
+    for period, n in (("2024-01", 30), ("2024-02", 12)):
+        df = pd.DataFrame({"predicted_price": [float(i) for i in range(n)]})
+        path = tmp_path / f"preds_{period.replace('-', '_')}.csv"
+        record_output(tmp_path, path, period, df, write_indexed(df, path, stride=4))
+
+    with TestClient(main.app) as client:
+        latest = client.get("/latest_predictions").json()
+        page = client.get(
+            "/latest_predictions", params={"month": "2024-01", "offset": 9, "limit": 3}
+        ).json()
+        missing = client.get("/latest_predictions", params={"month": "1999-01"})
+        invalid = client.get("/latest_predictions", params={"month": "January"})
+
+    assert latest["period"] == "2024-02" and latest["rows"] == 12
+    assert len(latest["preview"]) == 5
+    assert page["rows"] == 30
+    assert [r["predicted_price"] for r in page["preview"]] == [9.0, 10.0, 11.0]
+    assert missing.status_code == 404
+    assert invalid.status_code == 422
+    print("✅ Latest predictions catalog test passed")
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_batch_jobs_run_in_background_with_progress_and_cancel(tmp_path, monkeypatch):
+    from src.api.jobs import JobManager
+    from src.utils.exceptions import JobCancelledError
+
+    step = threading.Semaphore(0)
+
+    def fake_batch(progress, cancelled, force=False):
+        months = ["2024-01", "2024-02", "2024-03"]
+        progress({"type": "plan", "months": months})
+        for period in months:
+            assert step.acquire(timeout=10)
+            if cancelled():
+                raise JobCancelledError(period)
+            progress({"type": "month", "period": period, "rows": 10, "seconds": 0.01})
+        return {"rows_predicted": 30}
+
+    manager = JobManager(fake_batch, mode="thread", jobs_dir=tmp_path)
+    monkeypatch.setattr(main, "jobs", manager)
+    monkeypatch.setattr(main, "sync_artifacts", _mark_ready)
+
+    with TestClient(main.app) as client:
+        first = client.post("/run_batch")
+        second = client.post("/run_batch").json()
+        a, b = first.json()["job_id"], second["job_id"]
+
+        # One job at a time: the second waits in the queue
+        _wait_for(lambda: manager.get(a)["status"] == "running")
+        assert manager.get(b)["status"] == "queued"
+
+        step.release()
+        _wait_for(lambda: manager.get(a)["months_done"] == 1)
+        job = client.get(f"/jobs/{a}").json()
+        assert job["months_total"] == 3 and job["rows_processed"] == 10
+        assert job["months"][0]["period"] == "2024-01"
+        assert job["throughput_rows_per_s"] > 0
+
+        assert client.post(f"/jobs/{b}/cancel").json()["status"] == "cancelled"
+        # Another worker sees the saved progress and can cancel the job
+        sibling = JobManager(fake_batch, mode="thread", jobs_dir=tmp_path)
+        assert sibling.get(a)["months_done"] == 1
+        assert sibling.cancel(a)["status"] == "running"
+        step.release()
+        _wait_for(lambda: manager.get(a)["status"] == "cancelled")
+        assert manager.get(a)["months_done"] == 1
+
+        c = client.post("/run_batch").json()["job_id"]
+        for _ in range(3):
+            step.release()
+        _wait_for(lambda: manager.get(c)["status"] == "succeeded")
+        done = client.get(f"/jobs/{c}").json()
+        listed = client.get("/jobs").json()
+        missing = client.get("/jobs/nope")
+
+    assert first.status_code == 202 and first.json()["url"] == f"/jobs/{a}"
+    assert done["result"] == {"rows_predicted": 30} and done["finished_at"]
+    assert {j["id"] for j in listed["jobs"]} == {a, b, c}
+    assert missing.status_code == 404
+
+    # Records survive a restart; jobs that were mid-run are marked interrupted
+    (tmp_path / "stale.json").write_text(
+        '{"id": "stale", "status": "running", "created_at": "2024-01-01", '
+        '"months": []}'
+    )
+    restarted = JobManager(fake_batch, mode="thread", jobs_dir=tmp_path)
+    restarted.start()
+    assert restarted.get(c)["status"] == "succeeded"
+    assert restarted.get("stale")["status"] == "interrupted"
+    print("✅ Background batch job test passed")
+
+
+def _child_batch(progress, cancelled, force=False):
+    progress({"type": "plan", "months": ["2024-01"]})
+    progress({"type": "month", "period": "2024-01", "rows": 7, "seconds": 0.0})
+    return {"rows_predicted": 7}
+
+
+def test_batch_job_process_mode_reports_child_progress():
+    from src.api.jobs import JobManager
+
+    manager = JobManager(_child_batch, mode="process")
+    job_id = manager.submit()["id"]
+    _wait_for(lambda: manager.get(job_id)["status"] == "succeeded", timeout=60)
+    job = manager.get(job_id)
+
+    # A child that exited right after its last put: events still queued win
+    events = queue.Queue()
+    events.put({"type": "month", "period": "2024-02", "rows": 3, "seconds": 0.0})
+    events.put({"type": "done", "result": {"rows_predicted": 3}})
+    late = manager._drain_exited(job_id, events, time.perf_counter(), 0)
+    silent = manager._drain_exited(job_id, queue.Queue(), time.perf_counter(), 0)
+    crashed = manager._drain_exited(job_id, queue.Queue(), time.perf_counter(), -9)
+    manager.shutdown()
+
+    assert job["months_done"] == job["months_total"] == 1
+    assert job["rows_processed"] == 7
+    assert job["result"] == {"rows_predicted": 7}
+    assert late == {"type": "done", "result": {"rows_predicted": 3}}
+    assert manager.get(job_id)["rows_processed"] == 10
+    assert silent["type"] == "error" and "without reporting" in silent["error"]
+    assert crashed["error"] == "Job process exited with code -9"
+    print("✅ Process-mode batch job test passed")
+
+
+def test_load_test_harness_reports_and_checks_baseline(artifacts, monkeypatch):
+    import asyncio
+
+    from benchmarks.load_test import (
+        compare,
+        run_in_process,
+        summarize,
+        synthetic_requests,
+    )
+
+    paths = artifacts["paths"]
+    monkeypatch.setattr(main, "ARTIFACT_PATHS", paths)
+    monkeypatch.setattr(main, "MODEL_PATH", paths["model_path"])
+    monkeypatch.setattr(main, "readiness", Readiness())
+    monkeypatch.setattr(main, "sync_artifacts", _mark_ready)
+    monkeypatch.setattr(main.settings, "api_key", "test-key")
+    requests = synthetic_requests(12, api_key="test-key", sizes=(1, 5))
+    requests.append({"method": "GET", "path": "/nope"})
+
+    run = asyncio.run(run_in_process(requests, concurrency=4, rate=400))
+    report = summarize(run, concurrency=4)
+
+    assert report["requests"] == 13
+    assert report["status_counts"] == {"200": 12, "404": 1}
+    assert report["paths"]["/predict"]["error_rate"] == 0.0
+    assert report["error_rate"] == pytest.approx(1 / 13)
+    assert 0 < report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"]
+    assert compare(report, report) == []
+    faster = {**report, "p99_ms": report["p99_ms"] / 2, "error_rate": 0.0}
+    problems = compare(report, faster, tolerance=0.2)
+    assert [p.split()[0] for p in problems] == ["p99_ms", "error"]
+    print("✅ Load test harness test passed")
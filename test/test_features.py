@@ -1,4 +1,8 @@
+import os
+
+import numpy as np
 import pandas as pd
+import pytest
 
 from src.feature_pipeline.feature_engineering import (
     add_date_features,
@@ -9,8 +13,12 @@ from src.feature_pipeline.feature_engineering import (
 )
 from src.feature_pipeline.load import load_and_split_data
 from src.feature_pipeline.preprocess import (
+    CITY_MAPPING,
     clean_and_merge,
     drop_duplicates,
+    load_metros_index,
+    normalize_city,
+    normalize_city_series,
     preprocess_split,
     remove_outliers,
 )
@@ -44,6 +52,51 @@ def test_load_and_split_data_creates_splits(tmp_path):
     print("✅ Data splitting test passed")
 
 
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_streaming_split_matches_in_memory_split(fmt, tmp_path, monkeypatch):
+    from src.utils import storage
+    from src.utils.storage import read_table
+
+    monkeypatch.setattr(storage.settings, "storage_format", fmt)
+    rng = np.random.default_rng(3)
+    n = 120
+    raw = pd.DataFrame(
+        {
+            "date": (
+                pd.to_datetime("2018-06-01")
+                + pd.to_timedelta(rng.integers(0, 5 * 365, n), unit="D")
+            ).strftime("%Y-%m-%d"),
+            "price": rng.uniform(1e5, 1e6, n).round(2),
+            # ints in early chunks, NaN in a later one → float when read whole
+            "homes_sold": [*range(100), *[None] * 20],
+            "city_full": rng.choice(["A", "B", "C"], n),
+        }
+    )
+    raw.loc[5, "date"] = None  # NaT: in no split
+    raw.loc[10:30, "date"] = raw.loc[10, "date"]  # ties keep file order
+    unsorted_path = tmp_path / "raw.csv"
+    raw.to_csv(unsorted_path, index=False)
+    sorted_path = tmp_path / "raw_sorted.csv"
+    raw.sort_values("date", kind="stable").to_csv(sorted_path, index=False)
+
+    load_and_split_data(str(unsorted_path), tmp_path / "memory")
+    for raw_path, needs_sort in ((unsorted_path, True), (sorted_path, False)):
+        out = tmp_path / raw_path.stem
+        summary = load_and_split_data(str(raw_path), out, chunksize=7)
+
+        assert summary["rows_in"] == n and summary["chunks"] == -(-n // 7)
+        assert summary["sorted"] is needs_sort
+        assert sum(summary["rows"].values()) == n - 1
+        for split in ("train", "eval", "holdout"):
+            want = tmp_path / "memory" / f"{split}.{fmt}"
+            got = out / f"{split}.{fmt}"
+            if fmt == "csv":
+                assert got.read_bytes() == want.read_bytes()
+            pd.testing.assert_frame_equal(read_table(got), read_table(want))
+        assert [p.name for p in out.iterdir() if p.name.startswith(".")] == []
+    print(f"✅ Streaming {fmt} split matches in-memory split")
+
+
 # =========================
 # preprocess.py – unit tests
 # =========================
@@ -75,6 +128,51 @@ def test_clean_and_merge_skips_when_city_missing():
     print("✅ Clean-and-merge (no city_full) passed")
 
 
+def test_normalize_city_series_matches_rowwise():
+    s = pd.Series(
+        list(CITY_MAPPING) + ["  Boise   City ", "Denver—Aurora", None, float("nan")]
+    ).repeat(3)
+    mapping = {normalize_city(k): normalize_city(v) for k, v in CITY_MAPPING.items()}
+    expected = s.apply(normalize_city).replace(mapping)
+
+    result = normalize_city_series(s)
+    pd.testing.assert_series_equal(result, expected)
+    assert result.isna().sum() == 6
+    print("✅ Vectorized city normalization matches row-wise")
+
+
+def test_clean_and_merge_uses_cached_metros_index(tmp_path):
+    metros_path = tmp_path / "usmetros.csv"
+    pd.DataFrame(
+        {
+            "metro_full": ["Boise City", "Austin–Round Rock–San Marcos"],
+            "lat": [43.6, 30.3],
+            "lng": [-116.2, -97.7],
+        }
+    ).to_csv(metros_path, index=False)
+    df = pd.DataFrame(
+        {"city_full": ["Austin-Round Rock-Georgetown", "Nowhere", "boise city"]},
+        index=[10, 11, 12],
+    )
+
+    result = clean_and_merge(df.copy(), metros_path=str(metros_path))
+    assert list(result.index) == [10, 11, 12]
+    assert result["lat"].tolist()[::2] == [30.3, 43.6]
+    assert result["lat"].isna().tolist() == [False, True, False]
+
+    index = load_metros_index(metros_path)
+    clean_and_merge(df.copy(), metros_path=str(metros_path))
+    assert load_metros_index(metros_path) is index  # loaded once
+
+    pd.DataFrame({"metro_full": ["Nowhere"], "lat": [1.0], "lng": [2.0]}).to_csv(
+        metros_path, index=False
+    )
+    os.utime(metros_path, ns=(0, 0))  # force a new fingerprint
+    result = clean_and_merge(df.copy(), metros_path=str(metros_path))
+    assert result["lat"].isna().tolist() == [True, False, True]
+    print("✅ Metros index cached, vectorized and reloaded on change")
+
+
 # =========================
 # feature_engineering – unit tests
 # =========================
@@ -165,6 +263,7 @@ def test_full_pipeline_integration(tmp_path):
         in_train_path=processed_dir / "cleaning_train.csv",
         in_eval_path=processed_dir / "cleaning_eval.csv",
         output_dir=processed_dir,
+        models_dir=tmp_path / "models",
     )
 
     assert {"year", "zipcode_freq", "city_full_encoded"}.issubset(out_train.columns)
@@ -172,3 +271,78 @@ def test_full_pipeline_integration(tmp_path):
     assert freq_map is not None
     assert te is not None
     print("✅ Full pipeline integration test passed")
+
+
+# =========================
+# polars engine – parity test
+# =========================
+# Confirms PIPELINE_ENGINE=polars writes the same splits and features as pandas.
+@pytest.mark.filterwarnings("error::FutureWarning")  # None vs NaN nulls
+def test_polars_engine_matches_pandas(tmp_path):
+    rng = np.random.default_rng(7)
+    n = 400
+    cities = list(CITY_MAPPING) + ["  Boise   City ", "Denver—Aurora", None]
+    raw = pd.DataFrame(
+        {
+            "date": (
+                pd.to_datetime("2018-01-01")
+                + pd.to_timedelta(rng.integers(0, 6 * 365, n), unit="D")
+            ).strftime("%Y-%m-%d"),
+            "city_full": rng.choice(np.array(cities, dtype=object), n),
+            "zipcode": rng.choice([1000, 2000, 3000, 4000, 5000], n),
+            "median_list_price": rng.choice([2e5, 5e5, 25e6], n),
+            "median_sale_price": rng.uniform(1e5, 1e6, n).round(2),
+            "price": rng.uniform(1e5, 1e6, n).round(2),
+        }
+    )
+    raw.loc[pd.to_datetime(raw["date"]) >= "2022-06-01", "zipcode"] = 9999  # unseen
+    raw = pd.concat([raw, raw.iloc[:20]], ignore_index=True)  # duplicates
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+    metros_path = tmp_path / "usmetros.csv"
+    pd.DataFrame(
+        {
+            "metro_full": ["Boise City", "Denver-Aurora"],
+            "lat": [43.6, 39.7],
+            "lng": [-116.2, -105.0],
+        }
+    ).to_csv(metros_path, index=False)
+
+    splits = ("train", "eval", "holdout")
+    outputs = {}
+    for engine in ("pandas", "polars"):
+        work = tmp_path / engine
+        frames = list(load_and_split_data(str(raw_path), work, engine=engine))
+        files = [work / f"{s}.csv" for s in splits]
+        for s in splits:
+            frames.append(
+                preprocess_split(
+                    s,
+                    raw_dir=work,
+                    processed_dir=work / "processed",
+                    metros_path=str(metros_path),
+                    engine=engine,
+                )
+            )
+        *engineered, freq_map, _ = run_feature_engineering(
+            *(work / "processed" / f"cleaning_{s}.csv" for s in splits),
+            output_dir=work / "processed",
+            engine=engine,
+            models_dir=work / "models",
+        )
+        assert (work / "models" / "feature_schema.json").exists()
+        files += [work / "processed" / f"feature_engineered_{s}.csv" for s in splits]
+        outputs[engine] = (frames + engineered, files, freq_map)
+
+    (want, want_files, want_freq), (got, got_files, got_freq) = outputs.values()
+    for g, w in zip(got_files, want_files):  # byte-identical split/feature files
+        assert g.read_bytes() == w.read_bytes(), g.name
+    for g, w in zip(got, want):
+        pd.testing.assert_frame_equal(
+            g.reset_index(drop=True), w.reset_index(drop=True)
+        )
+    # eval saw only known zipcodes (int, like pandas), holdout an unseen one
+    assert got[7]["zipcode_freq"].dtype == "int64"
+    assert got[8]["zipcode_freq"].dtype == "float64"
+    pd.testing.assert_series_equal(got_freq.sort_index(), want_freq.sort_index())
+    print("✅ Polars engine parity test passed")
@@ -1,11 +1,25 @@
 # tests/test_inference.py
+import os
 import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
+from joblib import dump, load
 
-from src.inference_pipeline.inference import predict
+from src.inference_pipeline import inference
+from src.inference_pipeline.inference import predict, predict_stepwise
+from src.inference_pipeline.plan import get_inference_plan
+from src.utils.artifact_cache import ArtifactCache, artifact_cache
+from src.utils.exceptions import PredictionError
+from src.utils.feature_schema import (
+    SCHEMA_FILENAME,
+    FeatureSchema,
+    record_features,
+    record_model,
+)
+from src.utils.tracing import current_trace, run_traced, tracing
 
 # Add project root to sys.path
 ROOT = Path(__file__).resolve().parents[1]
@@ -36,3 +50,538 @@ def test_inference_runs_and_returns_predictions(sample_df):
 
     print("✅ Inference pipeline test passed. Predictions:")
     print(preds_df[["predicted_price"]].head())
+
+
+# =========================
+# artifact cache
+# =========================
+def test_artifact_cache_loads_once_and_reloads_on_change(tmp_path):
+    path = tmp_path / "freq.pkl"
+    dump({"a": 1}, path)
+    cache = ArtifactCache()
+
+    assert cache.get(path) == {"a": 1}
+    assert cache.get(path) == {"a": 1}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    dump({"a": 1, "b": 2}, path)
+    os.utime(path, ns=(0, 123))  # force a new mtime even on coarse clocks
+    assert cache.get(path) == {"a": 1, "b": 2}
+    assert cache.reloads == 1
+
+    assert cache.evict(path) == 1
+    cache.get(path)
+    assert cache.stats()["misses"] == 3
+    print("✅ Artifact cache test passed")
+
+
+def test_predict_reuses_cached_artifacts(artifacts, raw_frame, monkeypatch):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    artifact_cache.evict()
+    before = artifact_cache.stats()
+
+    raw = raw_frame(20, seed=7)
+    first = predict(raw.copy(), **artifacts["paths"])
+    second = predict(raw.copy(), **artifacts["paths"])
+
+    after = artifact_cache.stats()
+    assert after["misses"] - before["misses"] == 3  # model + two encoders
+    assert after["hits"] - before["hits"] == 3
+    pd.testing.assert_frame_equal(first, second)
+    print("✅ Cached predict test passed")
+
+
+# =========================
+# compiled inference plan
+# =========================
+def test_inference_plan_matches_stepwise(artifacts, raw_frame, monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    monkeypatch.chdir(tmp_path)  # default metros path is relative to cwd
+    (tmp_path / "data/raw").mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "metro_full": ["Austin-Round Rock-San Marcos", "Boise City"],
+            "lat": [30.27, 43.61],
+            "lng": [-97.74, -116.2],
+        }
+    ).to_csv(tmp_path / "data/raw/usmetros.csv", index=False)
+
+    raw = raw_frame(300, seed=3).drop(columns=["lat", "lng"])
+    dupes = raw.iloc[:5].assign(date="2023-06-01")  # same row, other date
+    raw = pd.concat([raw, dupes], ignore_index=True)
+    raw.loc[10, "median_list_price"] = 25_000_000
+    raw.loc[11, "city_full"] = None
+    raw.loc[12, "zipcode"] = 99999
+
+    expected = predict_stepwise(raw.copy(), **artifacts["paths"])
+    expected = expected.reset_index(drop=True)
+    got = predict(raw.copy(), **artifacts["paths"]).reset_index(drop=True)
+
+    assert len(got) == len(expected) == len(raw) - 11
+    np.testing.assert_array_equal(got["predicted_price"], expected["predicted_price"])
+    np.testing.assert_array_equal(got["actual_price"], expected["actual_price"])
+    pd.testing.assert_frame_equal(
+        got.drop(columns=["predicted_price"]),
+        expected.drop(columns=["predicted_price"]),
+    )
+    print("✅ Inference plan parity test passed")
+
+
+# =========================
+# pandas-free fast path
+# =========================
+def test_fast_path_matches_dataframe_pipeline(artifacts, raw_frame, monkeypatch):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    records = raw_frame(6, seed=11).to_dict(orient="records")
+    records[1]["city_full"] = "Denver—Aurora—Lakewood "  # needs normalization
+    records[2]["median_list_price"] = 30_000_000  # outlier, dropped
+    records[3] = dict(records[4], date="2023-02-01")  # duplicates, both dropped
+    del records[5]["zipcode"]  # missing key → NaN cell
+
+    plan = get_inference_plan(
+        feature_columns=artifacts["feature_columns"], **artifacts["paths"]
+    )
+    for payload in (records[:1], records):
+        preds, actuals = plan.predict_records(payload)
+        expected = predict(pd.DataFrame(payload), **artifacts["paths"])
+        np.testing.assert_array_equal(preds, expected["predicted_price"])
+        np.testing.assert_array_equal(actuals, expected["actual_price"])
+    assert len(preds) == 3
+    print("✅ Fast path parity test passed")
+
+
+def test_predict_records_dispatches_on_threshold(artifacts, raw_frame, monkeypatch):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    records = raw_frame(3, seed=12).to_dict(orient="records")
+    plan = get_inference_plan(
+        feature_columns=artifacts["feature_columns"], **artifacts["paths"]
+    )
+    calls = []
+    monkeypatch.setattr(
+        plan, "transform", lambda df: calls.append(df) or type(plan).transform(plan, df)
+    )
+
+    monkeypatch.setattr(inference.settings, "fast_path_max_rows", 5)
+    fast, _ = inference.predict_records(records, **artifacts["paths"])
+    monkeypatch.setattr(inference.settings, "fast_path_max_rows", 0)
+    slow, _ = inference.predict_records(records, **artifacts["paths"])
+
+    assert len(calls) == 1
+    np.testing.assert_array_equal(fast, slow)
+    print("✅ Fast path dispatch test passed")
+
+
+def test_numeric_strings_convert_the_same_on_both_paths(
+    artifacts, raw_frame, monkeypatch
+):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    records = raw_frame(4, seed=14).to_dict(orient="records")
+    expected, _ = inference.predict_records(records, **artifacts["paths"])
+    as_text = ("median_list_price", "lat", "price")
+    strings = [
+        {k: str(v) if k in as_text else v for k, v in r.items()} for r in records
+    ]
+    bad = [dict(r, homes_sold="n/a") for r in strings]
+
+    for max_rows in (50, 0):  # fast path, then DataFrame path
+        monkeypatch.setattr(inference.settings, "fast_path_max_rows", max_rows)
+        preds, actuals = inference.predict_records(strings, **artifacts["paths"])
+        np.testing.assert_array_equal(preds, expected)
+        np.testing.assert_array_equal(actuals, [r["price"] for r in records])
+        with pytest.raises(PredictionError, match="homes_sold"):
+            inference.predict_records(bad, **artifacts["paths"])
+    print("✅ Numeric string conversion test passed")
+
+
+def test_predict_records_resolves_plan_once(artifacts, raw_frame, monkeypatch):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    lookups = []
+    monkeypatch.setattr(
+        inference,
+        "get_inference_plan",
+        lambda *a, **kw: lookups.append(a) or get_inference_plan(*a, **kw),
+    )
+    records = raw_frame(20, seed=13).to_dict(orient="records")
+
+    for max_rows in (50, 0):  # fast path, then DataFrame path
+        monkeypatch.setattr(inference.settings, "fast_path_max_rows", max_rows)
+        lookups.clear()
+        inference.predict_records(records, **artifacts["paths"])
+        assert len(lookups) == 1
+    print("✅ Single plan lookup test passed")
+
+
+def test_predict_csv_stream_matches_full_frame(
+    artifacts, raw_frame, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    df = raw_frame(60, seed=13)
+    df = pd.concat([df, df.iloc[[2, 45]]], ignore_index=True)  # cross-chunk dupes
+    df.to_csv(tmp_path / "raw.csv", index=False)
+    expected = predict(df, **artifacts["paths"]).reset_index(drop=True)
+
+    outputs = {}
+    for dedup, workers in (("global", 1), ("global", 2), ("chunk", 1)):
+        out = tmp_path / f"preds_{dedup}_{workers}.csv"
+        summary = inference.predict_csv_stream(
+            tmp_path / "raw.csv",
+            out,
+            chunksize=16,
+            workers=workers,
+            dedup=dedup,
+            **artifacts["paths"],
+        )
+        assert summary["rows_in"] == len(df) and summary["chunks"] == 4
+        outputs[(dedup, workers)] = pd.read_csv(out)
+
+    pd.testing.assert_frame_equal(
+        outputs[("global", 1)], expected, check_dtype=False, atol=1e-3
+    )
+    pd.testing.assert_frame_equal(outputs[("global", 2)], outputs[("global", 1)])
+    # Per-chunk scope keeps rows whose duplicate lives in another chunk
+    assert len(outputs[("chunk", 1)]) == len(expected) + 4
+    print("✅ Streaming inference test passed")
+
+
+def test_feature_schema_manifest_drives_column_order(artifacts, tmp_path):
+    model_dir = tmp_path / "models"
+    model_dir.mkdir()
+    paths = {k: model_dir / Path(p).name for k, p in artifacts["paths"].items()}
+    for k, p in artifacts["paths"].items():
+        paths[k].write_bytes(Path(p).read_bytes())
+    model = artifact_cache.get(paths["model_path"])
+    columns = artifacts["feature_columns"]
+    manifest = model_dir / SCHEMA_FILENAME
+
+    assert inference._feature_columns(paths["model_path"]) is None
+    record_features(
+        manifest,
+        pd.DataFrame(columns=columns + ["price"], dtype=float),
+        {"freq_encoder": (paths["freq_encoder_path"], None)},
+    )
+    schema = record_model(
+        manifest, paths["model_path"], model, pd.DataFrame(columns=columns)
+    )
+
+    assert schema.columns == columns
+    assert schema.encoders["freq_encoder"]["sha256"]
+    assert schema.models[paths["model_path"].name]["type"].endswith("XGBRegressor")
+    assert FeatureSchema.load(manifest) == schema
+    assert inference._feature_columns(paths["model_path"]) == columns
+    print("✅ Feature schema manifest test passed")
+
+
+def test_stage_trace_records_each_pipeline_step(artifacts, raw_frame, monkeypatch):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    df = raw_frame(50, seed=14)
+    df.loc[3, "median_list_price"] = 20_000_000  # one outlier dropped
+
+    with tracing() as trace:
+        out = predict(df, **artifacts["paths"])
+    report = trace.report()
+    stages = {s["stage"]: s for s in report["stages"]}
+
+    assert list(stages) == [
+        "preprocess",
+        "date_features",
+        "encoding",
+        "alignment",
+        "model_predict",
+    ]
+    assert stages["preprocess"]["rows_in"] == 50
+    assert stages["preprocess"]["rows_out"] == len(out) == 49
+    assert stages["model_predict"]["rows_out"] == 49
+    assert stages["alignment"]["alloc_bytes"] > 0
+    assert all(s["wall_ms"] >= 0 and s["calls"] == 1 for s in stages.values())
+    assert report["total_ms"] >= sum(s["wall_ms"] for s in stages.values())
+    assert current_trace() is None
+
+    # Record fast path, run the way the API does for X-Profile requests
+    records = df.head(2).to_dict(orient="records")
+    (preds, _), report = run_traced(
+        inference.predict_records, records, **artifacts["paths"]
+    )
+    assert [s["stage"] for s in report["stages"]] == [
+        "preprocess",
+        "alignment",
+        "model_predict",
+    ]
+    assert len(preds) == 2
+    print("✅ Stage trace test passed")
+
+
+def test_predict_csv_stream_profile_sums_chunk_traces(
+    artifacts, raw_frame, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    raw_frame(40, seed=15).to_csv(tmp_path / "raw.csv", index=False)
+
+    summary = inference.predict_csv_stream(
+        tmp_path / "raw.csv",
+        tmp_path / "preds.csv",
+        chunksize=16,
+        profile=True,
+        **artifacts["paths"],
+    )
+    stages = {s["stage"]: s for s in summary["trace"]["stages"]}
+
+    assert stages["preprocess"]["calls"] == summary["chunks"] == 3
+    assert stages["preprocess"]["rows_in"] == 40
+    assert stages["model_predict"]["rows_out"] == summary["rows_out"]
+    print("✅ Streaming profile test passed")
+
+
+def test_cli_rejects_empty_profile_path(tmp_path):
+    import subprocess
+
+    raw = tmp_path / "raw.csv"
+    raw.write_text("date\n")
+    cmd = [sys.executable, "-m", "src.inference_pipeline.inference", "--input"]
+    result = subprocess.run(
+        [*cmd, str(raw), "--profile", ""], capture_output=True, text=True
+    )
+
+    assert result.returncode == 2  # argparse usage error, before any work
+    assert "trace path must not be empty" in result.stderr
+    print("✅ Empty --profile path test passed")
+
+
+def test_prediction_cache_partial_hits_and_invalidation(
+    artifacts, raw_frame, monkeypatch, tmp_path
+):
+    from src.inference_pipeline import plan as plan_module
+    from src.inference_pipeline.prediction_cache import PredictionCache
+
+    cache = PredictionCache(max_entries=1000)
+    monkeypatch.setattr(plan_module, "prediction_cache", cache)
+    monkeypatch.setattr(
+        inference, "TRAIN_FEATURE_COLUMNS", artifacts["feature_columns"]
+    )
+    paths = dict(artifacts["paths"])
+    paths["model_path"] = tmp_path / "model.pkl"
+    paths["model_path"].write_bytes(Path(artifacts["paths"]["model_path"]).read_bytes())
+    scored = []
+    original = plan_module.InferencePlan._run_model
+    monkeypatch.setattr(
+        plan_module.InferencePlan,
+        "_run_model",
+        lambda self, X: scored.append(len(X)) or original(self, X),
+    )
+    df = raw_frame(40, seed=18)
+    more = pd.concat([df, raw_frame(10, seed=19)], ignore_index=True)
+
+    first = predict(df, **paths)
+    again = predict(df, **paths)
+    partial = predict(more, **paths)
+    uncached = predict_stepwise(more, **paths)
+
+    assert scored == [40, 10]  # second call fully cached, third only new rows
+    np.testing.assert_array_equal(first["predicted_price"], again["predicted_price"])
+    np.testing.assert_allclose(
+        partial["predicted_price"], uncached["predicted_price"], rtol=1e-6
+    )
+    stats = cache.stats()
+    assert stats["hits"] == 80 and stats["misses"] == 50
+    assert stats["entries"] == 50 and stats["approx_bytes"] > 0
+
+    # A replaced model file compiles a new plan: nothing is served stale
+    os.utime(paths["model_path"], ns=(1, 1))
+    predict(df, **paths)
+    assert scored[-1] == 40
+    print("✅ Prediction cache test passed")
+
+
+def test_prediction_cache_lru_and_ttl(monkeypatch):
+    from src.inference_pipeline import prediction_cache as pc
+
+    clock = [100.0]
+    monkeypatch.setattr(pc.time, "monotonic", lambda: clock[0])
+    cache = pc.PredictionCache(max_entries=2, ttl_seconds=10)
+    X = np.arange(6, dtype=np.float32).reshape(3, 2)
+
+    def double(rows):
+        return rows.sum(axis=1) * 2
+
+    np.testing.assert_array_equal(cache.predict(0, X, double), [2, 10, 18])
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+
+    assert cache.predict(0, X[2:], double)[0] == 18  # most recent: still cached
+    assert cache.predict(1, X[2:], double)[0] == 18  # other generation: miss
+    clock[0] += 11
+    cache.predict(1, X[2:], double)
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 5
+    assert stats["expirations"] == 1
+    print("✅ Prediction cache LRU/TTL test passed")
+
+
+def test_parallel_month_partitions_match_serial_run(
+    artifacts, raw_frame, monkeypatch, tmp_path
+):
+    from src.batch import run_batch
+
+    holdout = tmp_path / "holdout.csv"
+    raw_frame(240, seed=21).to_csv(holdout, index=False)
+    monkeypatch.setattr(run_batch, "HOLDOUT_PATH", holdout)
+
+    outputs, summaries = {}, {}
+    for workers in (1, 2):
+        out_dir = tmp_path / f"preds_{workers}"
+        monkeypatch.setattr(run_batch, "OUTPUT_DIR", out_dir)
+        monkeypatch.setattr(run_batch.settings, "batch_workers", workers)
+        monkeypatch.setattr(
+            run_batch, "default_artifact_paths", lambda: artifacts["paths"]
+        )
+        summaries[workers] = run_batch.run_batch_job()
+        outputs[workers] = {
+            p.relative_to(out_dir).as_posix(): p.read_bytes()
+            for p in sorted(out_dir.glob("year=*/month=*/preds.*"))
+        }
+
+    serial, parallel = summaries[1], summaries[2]
+    assert outputs[1] == outputs[2] and len(outputs[1]) > 1
+    assert parallel["rows_predicted"] == serial["rows_predicted"] == 240
+    periods = [p["period"] for p in parallel["partitions"]]
+    assert periods == sorted(periods) == [p["period"] for p in serial["partitions"]]
+    assert all(p["seconds"] > 0 for p in parallel["partitions"])
+    assert {p["pid"] for p in parallel["partitions"]}.isdisjoint({os.getpid()})
+    assert {p["pid"] for p in serial["partitions"]} == {os.getpid()}
+    print("✅ Parallel month partitions test passed")
+
+
+def test_batch_run_skips_unchanged_months_and_resumes(
+    artifacts, raw_frame, monkeypatch, tmp_path
+):
+    from shutil import copytree
+
+    from src.batch import run_batch
+
+    holdout = tmp_path / "holdout.csv"
+    df = raw_frame(200, seed=22)
+    df.to_csv(holdout, index=False)
+    models = copytree(Path(artifacts["paths"]["model_path"]).parent, tmp_path / "m")
+    paths = {k: models / Path(v).name for k, v in artifacts["paths"].items()}
+    monkeypatch.setattr(run_batch, "HOLDOUT_PATH", holdout)
+    monkeypatch.setattr(run_batch, "OUTPUT_DIR", tmp_path / "preds")
+    monkeypatch.setattr(run_batch, "default_artifact_paths", lambda: paths)
+    monkeypatch.setattr(run_batch.settings, "batch_workers", 1)
+
+    def skipped(summary):
+        return {p["period"] for p in summary["partitions"] if p["skipped"]}
+
+    first = run_batch.run_batch_job()
+    months = [p["period"] for p in first["partitions"]]
+    assert first["partitions_skipped"] == 0
+
+    again = run_batch.run_batch_job()
+    assert skipped(again) == set(months)
+    assert again["rows_predicted"] == first["rows_predicted"]
+
+    # One month's input changed, another's output lost (crashed run)
+    dates = pd.to_datetime(df["date"]).dt.strftime("%Y-%m")
+    df.loc[dates == months[0], "median_list_price"] += 1.0
+    df.to_csv(holdout, index=False)
+    run_batch.partition_path(tmp_path / "preds", months[1]).unlink()
+    resumed = run_batch.run_batch_job()
+    assert skipped(resumed) == set(months) - {months[0], months[1]}
+
+    assert run_batch.run_batch_job(force=True)["partitions_skipped"] == 0
+    paths["target_encoder_path"].write_bytes(
+        paths["target_encoder_path"].read_bytes()
+    )  # touched, same bytes: still unchanged
+    assert skipped(run_batch.run_batch_job()) == set(months)
+
+    freq_map = load(paths["freq_encoder_path"])
+    dump({**freq_map, -1: 0.0}, paths["freq_encoder_path"])  # new artifact
+    assert run_batch.run_batch_job()["partitions_skipped"] == 0
+    print("✅ Incremental batch run test passed")
+
+
+def test_batch_run_prunes_months_no_longer_in_holdout(
+    artifacts, raw_frame, monkeypatch, tmp_path
+):
+    from src.batch import run_batch
+    from src.batch.catalog import find_entry, load_catalog
+
+    holdout, out_dir = tmp_path / "holdout.csv", tmp_path / "preds"
+    df = raw_frame(200, seed=23)
+    df.to_csv(holdout, index=False)
+    monkeypatch.setattr(run_batch, "HOLDOUT_PATH", holdout)
+    monkeypatch.setattr(run_batch, "OUTPUT_DIR", out_dir)
+    monkeypatch.setattr(run_batch, "default_artifact_paths", lambda: artifacts["paths"])
+    monkeypatch.setattr(run_batch.settings, "batch_workers", 1)
+
+    first = run_batch.run_batch_job()
+    months = [p["period"] for p in first["partitions"]]
+    assert len(months) >= 2 and first["partitions_pruned"] == 0
+
+    # The latest month leaves the holdout (e.g. its data was withdrawn)
+    dates = pd.to_datetime(df["date"]).dt.strftime("%Y-%m")
+    df[dates != months[-1]].to_csv(holdout, index=False)
+    second = run_batch.run_batch_job()
+    assert second["partitions_pruned"] == 1
+
+    catalog = load_catalog(out_dir)
+    assert sorted(e["period"] for e in catalog.values()) == months[:-1]
+    assert find_entry(catalog)["period"] == months[-2]
+    assert find_entry(catalog, months[-1]) is None
+    gone = run_batch.partition_path(out_dir, months[-1])
+    assert not gone.exists() and not gone.parent.exists()
+    assert run_batch.partition_path(out_dir, months[0]).exists()
+    print("✅ Stale month pruning test passed")
+
+
+def test_batch_output_is_streamed_to_partitions(
+    artifacts, raw_frame, monkeypatch, tmp_path
+):
+    from src.batch import run_batch
+    from src.batch.catalog import load_catalog
+    from src.utils.storage import read_table
+
+    holdout = tmp_path / "holdout.csv"
+    raw_frame(150, seed=23).to_csv(holdout, index=False)
+    out_dir = tmp_path / "preds"
+    monkeypatch.setattr(run_batch, "HOLDOUT_PATH", holdout)
+    monkeypatch.setattr(run_batch, "OUTPUT_DIR", out_dir)
+    monkeypatch.setattr(run_batch, "default_artifact_paths", lambda: artifacts["paths"])
+    monkeypatch.setattr(run_batch.settings, "batch_workers", 1)
+
+    events = []
+    summary = run_batch.run_monthly_predictions(progress=events.append)
+    assert isinstance(summary, dict) and summary["rows_predicted"] == 150
+    catalog = load_catalog(out_dir)
+    for part in summary["partitions"]:
+        year, month = part["period"].split("-")
+        path = Path(part["file"])
+        assert path.parent == out_dir / f"year={year}" / f"month={month}"
+        entry = catalog[path.relative_to(out_dir).as_posix()]
+        assert entry["rows"] == part["rows"] == len(read_table(path))
+        assert "predicted_price" in entry["columns"]
+    assert [e["period"] for e in events if e["type"] == "month"] == [
+        p["period"] for p in summary["partitions"]
+    ]
+
+    # Opt-in: the concatenated frame, fresh months and reused ones alike
+    full = run_batch.run_monthly_predictions(keep_outputs=True)
+    forced = run_batch.run_monthly_predictions(keep_outputs=True, force=True)
+    assert isinstance(full, pd.DataFrame) and len(full) == 150
+    pd.testing.assert_frame_equal(full, forced, check_dtype=False)
+    print("✅ Streamed partitioned batch output test passed")
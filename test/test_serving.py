@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.api.batching import MicroBatcher
+from src.api.executor import ExecutionBackend
+from src.utils.exceptions import ConfigurationError
+
+
+# =========================
+# micro-batching
+# =========================
+def _recording_model(calls):
+    def predict_fn(X):
+        calls.append(len(X))
+        return X[:, 0] * 10
+
+    return predict_fn
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+    predict_fn = _recording_model(calls)
+    batcher = MicroBatcher(window_ms=50, max_batch_size=1000)
+
+    async def run():
+        inputs = [np.full((n, 3), i, dtype=np.float32) for i, n in enumerate([1, 4, 2])]
+        return inputs, await asyncio.gather(
+            *(batcher.submit(X, predict_fn) for X in inputs)
+        )
+
+    inputs, results = asyncio.run(run())
+
+    assert calls == [7]  # one vectorized call for all three requests
+    for X, preds in zip(inputs, results):
+        np.testing.assert_array_equal(preds, X[:, 0] * 10)
+    stats = batcher.stats()
+    assert stats["batches"] == 1 and stats["requests"] == 3
+    assert stats["batch_rows_histogram"]["8"] == 1
+    print("✅ Micro-batch coalescing test passed")
+
+
+def test_micro_batcher_flushes_at_max_batch_size():
+    calls = []
+    predict_fn = _recording_model(calls)
+    batcher = MicroBatcher(window_ms=10_000, max_batch_size=4)
+
+    async def run():
+        X = np.ones((2, 3), dtype=np.float32)
+        return await asyncio.wait_for(
+            asyncio.gather(
+                batcher.submit(X, predict_fn), batcher.submit(X, predict_fn)
+            ),
+            timeout=5,
+        )
+
+    asyncio.run(run())  # would time out if it waited for the 10s window
+    assert calls == [4]
+    print("✅ Micro-batch size flush test passed")
+
+
+def test_micro_batcher_propagates_errors():
+    def failing(X):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(window_ms=1)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit(np.ones((1, 2)), failing), return_exceptions=True
+        )
+
+    (err,) = asyncio.run(run())
+    assert isinstance(err, RuntimeError)
+    print("✅ Micro-batch error propagation test passed")
+
+
+# =========================
+# execution backends
+# =========================
+_preloaded = {}
+
+
+def _preload(tag):
+    _preloaded["tag"] = tag
+
+
+def _worker_info(x):
+    return x * 2, os.getpid(), _preloaded.get("tag")
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_execution_backend_runs_work(mode):
+    backend = ExecutionBackend(
+        mode=mode, max_workers=2, initializer=_preload, initargs=("warm",)
+    )
+    backend.start()
+    try:
+        result, pid, tag = asyncio.run(backend.run(_worker_info, 21))
+    finally:
+        backend.shutdown()
+
+    assert result == 42
+    if mode == "process":
+        assert pid != os.getpid() and tag == "warm"  # initializer ran in worker
+    else:
+        assert pid == os.getpid()
+    assert backend.stats()["completed"] == 1
+    print(f"✅ {mode} execution backend test passed")
+
+
+def test_execution_backend_rejects_unknown_mode():
+    with pytest.raises(ConfigurationError):
+        ExecutionBackend(mode="gpu")
+
+
+# =========================
+# worker memory
+# =========================
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux smaps_rollup"
+)
+def test_memory_report_counts_pages_shared_with_forked_worker():
+    from src.utils.memory import memory_report, total_memory
+
+    shared = np.ones(64 * 2**20 // 8)  # 64 MB, touched, then inherited
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - child
+        os.close(read_end)
+        float(shared.sum())  # read-only access keeps the pages shared
+        os.write(write_end, b"x")
+        time.sleep(30)
+        os._exit(0)
+    os.close(write_end)
+    try:
+        os.read(read_end, 1)
+        child = memory_report(pid)
+        both = total_memory([os.getpid(), pid])
+    finally:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+
+    assert child["shared_bytes"] >= shared.nbytes
+    assert child["pss_bytes"] < child["rss_bytes"] - shared.nbytes // 3
+    assert both["pss_bytes"] < both["rss_bytes"]
+    print("✅ Worker memory report test passed")
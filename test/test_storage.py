@@ -0,0 +1,166 @@
+import pandas as pd
+import pytest
+
+from src.batch.catalog import (
+    find_entry,
+    load_catalog,
+    read_rows,
+    record_output,
+    write_indexed,
+)
+from src.feature_pipeline.load import load_and_split_data
+from src.utils import storage
+from src.utils.exceptions import ConfigurationError
+from src.utils.storage import read_columns, read_table, table_path, write_table
+
+
+@pytest.mark.parametrize("fmt", storage.FORMATS)
+def test_write_read_roundtrip(fmt, tmp_path):
+    df = pd.DataFrame(
+        {"zipcode": [1000, 2000, 3000], "price": [1.5, 2.5, 3.5], "city": list("abc")},
+        index=[7, 8, 9],
+    )
+    path = write_table(df, table_path(tmp_path / "table", fmt))
+    assert path.suffix == storage.STORAGE_SUFFIXES[fmt]
+
+    assert read_columns(path) == ["zipcode", "price", "city"]
+    pd.testing.assert_frame_equal(read_table(path), df.reset_index(drop=True))
+
+    projected = read_table(path, columns=["price"], dtypes={"price": "float32"})
+    assert list(projected.columns) == ["price"]
+    assert projected["price"].dtype == "float32"
+    print(f"✅ {fmt} storage roundtrip passed")
+
+
+def test_pipeline_follows_storage_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage.settings, "storage_format", "parquet")
+    raw = pd.DataFrame(
+        {
+            "date": pd.date_range("2018-01-01", periods=6, freq="365D"),
+            "price": [100, 200, 300, 400, 500, 600],
+        }
+    )
+    raw.to_csv(tmp_path / "raw.csv", index=False)  # raw input stays CSV
+
+    load_and_split_data(raw_path=str(tmp_path / "raw.csv"), output_dir=tmp_path)
+
+    assert (tmp_path / "train.parquet").exists()
+    assert not (tmp_path / "train.csv").exists()
+    assert read_table(tmp_path / "holdout.parquet")["date"].dtype.kind == "M"
+
+    with pytest.raises(ConfigurationError):
+        table_path(tmp_path / "x", "xlsx")
+    print("✅ Pipeline storage format test passed")
+
+
+@pytest.mark.parametrize("fmt", storage.FORMATS)
+def test_catalog_reads_only_requested_rows(fmt, tmp_path):
+    df = pd.DataFrame(
+        {
+            "median_list_price": [float(i) for i in range(50)],
+            "predicted_price": [i * 1.5 for i in range(50)],
+        },
+        index=range(100, 150),
+    )
+    for period in ("2024-01", "2024-02"):
+        path = table_path(tmp_path / f"preds_{period.replace('-', '_')}", fmt)
+        index = write_indexed(df, path, stride=7)
+        record_output(tmp_path, path, period, df, index, stride=7)
+
+    catalog = load_catalog(tmp_path)
+    latest = find_entry(catalog)
+    assert latest["period"] == "2024-02" and latest["rows"] == 50
+    assert find_entry(catalog, "2023-12") is None
+    assert len(latest["index"]) == 8  # ceil(50 / 7) blocks
+
+    expected = df.reset_index(drop=True)
+    for offset, limit in ((0, 5), (6, 3), (13, 20), (48, 10), (60, 5)):
+        page = read_rows(tmp_path, latest, offset, limit)
+        pd.testing.assert_frame_equal(
+            page.reset_index(drop=True),
+            expected.iloc[offset : offset + limit].reset_index(drop=True),
+            check_index_type=False,
+            check_dtype=len(page) > 0,
+        )
+    print(f"✅ {fmt} prediction catalog test passed")
+
+
+def _record_many(output_dir, worker, n):
+    df = pd.DataFrame({"predicted_price": [1.0]})
+    for i in range(n):
+        path = output_dir / f"preds_{worker}_{i}.csv"
+        record_output(output_dir, path, "2024-01", df, write_indexed(df, path))
+
+
+def test_record_output_from_concurrent_processes_keeps_every_entry(tmp_path):
+    import multiprocessing as mp
+
+    procs = [
+        mp.get_context("spawn").Process(target=_record_many, args=(tmp_path, w, 25))
+        for w in range(4)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    assert all(p.exitcode == 0 for p in procs)
+    assert len(load_catalog(tmp_path)) == 100  # no read-modify-write lost
+    print("✅ Cross-process catalog update test passed")
+
+
+def test_write_indexed_replaces_file_atomically(tmp_path, monkeypatch):
+    from src.batch import catalog
+
+    path = tmp_path / "preds.csv"
+    old = pd.DataFrame({"predicted_price": [1.0, 2.0]})
+    write_indexed(old, path)
+    before = path.read_bytes()
+
+    def fail_midway(df, tmp, fmt, stride):
+        tmp.write_text("predicted_price\n3.0\n")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(catalog, "_write_blocks", fail_midway)
+    with pytest.raises(OSError, match="disk full"):
+        write_indexed(pd.DataFrame({"predicted_price": [3.0, 4.0]}), path)
+
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["preds.csv"]
+    print("✅ Atomic indexed write test passed")
+
+
+def test_read_with_schema_projects_and_declares_float_dtypes(tmp_path):
+    from src.utils.feature_schema import read_with_schema, record_features
+
+    train = pd.DataFrame(
+        {"median_list_price": [1.5, 2.5], "zipcode_freq": [3, 4], "price": [9.0, 8.0]}
+    )
+    schema_path = tmp_path / "models/feature_schema.json"
+    record_features(schema_path, train, {})
+
+    # Floats written without decimals, an unseen zipcode filled as a float,
+    # columns in a different order from the manifest
+    path = tmp_path / "eval.csv"
+    path.write_text("price,zipcode_freq,median_list_price\n9.0,3.0,1\n8.0,0.0,2\n")
+
+    df = read_with_schema(path, schema_path)
+    assert list(df.columns) == ["median_list_price", "zipcode_freq", "price"]
+    assert df["median_list_price"].dtype == "float64"
+    assert df["zipcode_freq"].tolist() == [3.0, 0.0]
+
+    # A column the manifest does not list, or a manifest column the table
+    # lacks, means the manifest is stale: fail instead of dropping features
+    extra = tmp_path / "extra.csv"
+    extra.write_text("median_list_price,zipcode_freq,junk,price\n1,3,a,9\n")
+    with pytest.raises(ConfigurationError, match="junk"):
+        read_with_schema(extra, schema_path)
+    short = tmp_path / "short.csv"
+    short.write_text("median_list_price,price\n1,9\n")
+    with pytest.raises(ConfigurationError, match="zipcode_freq"):
+        read_with_schema(short, schema_path)
+
+    # Unprojected reads (raw holdout) and reads without a manifest keep all
+    assert "junk" in read_with_schema(extra, schema_path, project=False)
+    assert "junk" in read_with_schema(extra, tmp_path / "missing.json")
+    print("✅ Schema-driven read test passed")